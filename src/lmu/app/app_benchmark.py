@@ -18,8 +18,13 @@ def get_benchmark_results():
 
 
 @eel.expose
-def get_benchmark_result_details(result_file_name: str):
-    return app_benchmark_fn.get_benchmark_result_details(result_file_name)
+def get_benchmark_result_details(result_file_name: str, max_points: int = 0):
+    return app_benchmark_fn.get_benchmark_result_details(result_file_name, max_points)
+
+
+@eel.expose
+def compare_benchmark_results(result_file_names: list, baseline_name: str = None):
+    return app_benchmark_fn.compare_benchmark_results(result_file_names, baseline_name)
 
 
 @eel.expose
@@ -2,12 +2,19 @@ import json
 import logging
 from subprocess import Popen
 
+import eel
+
 from lmu.app_settings import AppSettings
 from lmu.preset.preset import GraphicsPreset, SessionPreset
 from lmu.preset.preset_base import PRESET_TYPES
 from lmu.preset.settings_model import BenchmarkSettings
 from lmu.benchmark.benchmark_utils import BenchmarkRun, BenchmarkQueue
-from lmu.benchmark.result import read_results, read_preset_result, read_result_settings
+from lmu.benchmark.compare import compare_results
+from lmu.benchmark.result import read_results, read_preset_result
+from lmu.benchmark.result_cache import BenchmarkResultCache
+from lmu.benchmark.result_pool import BenchmarkResultPool
+from lmu.benchmark.result_sidecar import get_result_sidecar_file
+from lmu.benchmark.telemetry import get_telemetry_file
 from lmu.benchmark.fpsvr import FpsVR
 from lmu.rf2events import StartBenchmarkEvent
 from lmu.utils import capture_app_exceptions
@@ -19,26 +26,59 @@ def start_benchmark():
     StartBenchmarkEvent.set(True)
 
 
+def _push_benchmark_result(result: dict):
+    """Send a single result summary to the front end as soon as it is available"""
+    try:
+        eel.benchmark_result(json.dumps(result))
+    except Exception as e:
+        # -- Front end not connected, results are still returned as a whole
+        logging.debug("Could not push Benchmark Result %s: %s", result.get("name"), e)
+
+
 @capture_app_exceptions
 def get_benchmark_results():
+    """Result summaries, pushed one by one to the front end while new results are parsed
+
+    The returned list of all summaries replaces the pushed summaries in the front end.
+    """
     p = AppSettings.present_mon_result_dir
     logging.debug("Looking up Benchmark Results: %s", p)
-    results = list()
+    results, result_files, result_ids, missing_files = list(), list(), dict(), list()
 
     for idx, f in enumerate(p.glob("*.csv")):
         if f.stem.startswith(FpsVR.FRAMETIMES_FILE_PREFIX):
             continue
+        result_files.append(f)
+        result_ids[f] = idx
+
+        # -- Use cached summary if the result file did not change
+        summary = BenchmarkResultCache.get(f)
+        if summary is None:
+            missing_files.append(f)
+            continue
+
+        results.append({"id": idx, "name": f.name, **summary})
+
+    # -- Show the cached results while the others are parsed
+    if missing_files:
+        for result in results:
+            _push_benchmark_result(result)
 
-        logging.debug("Preparing Benchmark Result: %s", f)
-        r = {"id": idx, "name": f.name, "data": read_results(f, details=False), "settings": read_result_settings(f)}
+    # -- Parse new or changed results in worker processes, push every summary as its worker finished
+    for f, summary in BenchmarkResultPool.summarize(missing_files):
+        logging.debug("Prepared Benchmark Result: %s", f)
+        BenchmarkResultCache.put(f, summary)
+        results.append({"id": result_ids[f], "name": f.name, **summary})
+        _push_benchmark_result(results[-1])
 
-        results.append(r)
+    BenchmarkResultCache.prune(result_files)
+    BenchmarkResultCache.save()
 
     return json.dumps(sorted(results, key=lambda x: x.get("name"), reverse=True))
 
 
 @capture_app_exceptions
-def get_benchmark_result_details(result_file_name: str):
+def get_benchmark_result_details(result_file_name: str, max_points: int = 0):
     logging.debug("Looking up detailed Benchmark Results for: %s", result_file_name)
 
     p, data, presets = AppSettings.present_mon_result_dir, dict(), dict()
@@ -46,7 +86,7 @@ def get_benchmark_result_details(result_file_name: str):
         if f.name != result_file_name:
             continue
         logging.debug("Reading detailed Benchmark Result: %s", f)
-        data = read_results(f, details=True)
+        data = read_results(f, details=True, max_points=int(max_points or 0))
         presets = read_preset_result(f)
 
     if data:
@@ -63,6 +103,15 @@ def get_benchmark_result_details(result_file_name: str):
     return json.dumps({"result": False, "data": data, "gfxPreset": None, "sesPreset": None})
 
 
+@capture_app_exceptions
+def compare_benchmark_results(result_file_names: list, baseline_name: str = None):
+    p = AppSettings.present_mon_result_dir
+    files = [p / name for name in result_file_names if (p / name).exists()]
+    logging.debug("Comparing Benchmark Results: %s", [f.name for f in files])
+
+    return json.dumps({"result": True, "data": compare_results(files, baseline_name)})
+
+
 @capture_app_exceptions
 def open_result_folder():
     result_path = AppSettings.present_mon_result_dir
@@ -81,10 +130,19 @@ def delete_benchmark_result(name: str):
     for f in p.glob(f"{result_path.stem}*.json"):
         f.unlink()
 
+    # -- Remove binary frame and telemetry data
+    for binary_file in (get_result_sidecar_file(result_path), get_telemetry_file(result_path)):
+        if binary_file.exists():
+            binary_file.unlink()
+
     # -- Remove Result CSV
     if result_path.exists():
         result_path.unlink()
 
+    # -- Remove cached result summary
+    BenchmarkResultCache.evict(result_path)
+    BenchmarkResultCache.save()
+
 
 @capture_app_exceptions
 def save_benchmark_settings(settings):
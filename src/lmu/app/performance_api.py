@@ -3,6 +3,7 @@ from typing import Optional
 
 import eel
 import logging
+from lmu.benchmark.metrics_history import PerformanceMetricHistory
 from lmu.benchmark.present_mon_wrapper import MetricData
 from lmu.rf2events import PerformanceMetricsEvent, HardwareStatusEvent, PresentMonVersionEvent
 
@@ -43,6 +44,22 @@ def get_performance_metrics():
     return _get_performance_metrics()
 
 
+@capture_app_exceptions
+def _get_performance_metrics_history(cursor: int = 0):
+    """
+    Liefert alle Metrik-Samples seit dem übergebenen Cursor.
+
+    Returns:
+        str: JSON-String mit neuem Cursor, Zeitstempeln und einer Liste pro Metrik
+    """
+    return json.dumps({"result": True, "data": PerformanceMetricHistory.since(cursor)})
+
+
+@eel.expose
+def get_performance_metrics_history(cursor: int = 0):
+    return _get_performance_metrics_history(cursor)
+
+
 @capture_app_exceptions
 def _get_hardware_status():
     hardware_stats = HardwareStatusEvent.get_nowait()
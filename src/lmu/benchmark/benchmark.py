@@ -18,6 +18,9 @@ from lmu.preset.settings_model import BenchmarkControllerJsonSettings, VideoSett
 from lmu.process import RunProcess
 from lmu.benchmark.benchmark_utils import create_benchmark_commands, create_quit_commands, BenchmarkRun, BenchmarkQueue
 from lmu.benchmark.fpsvr import FpsVR
+from lmu.benchmark.present_mon_recorder import PresentMonApiRecorder
+from lmu.benchmark.telemetry import TELEMETRY_DEFAULT_RATE, TelemetrySampler, get_telemetry_file
+from lmu.benchmark.result import create_present_mon_sidecar
 from lmu.rf2connect import RfactorConnect, RfactorState
 from lmu.rf2events import StartBenchmarkEvent, RecordBenchmarkEvent, RfactorQuitEvent
 from lmu.rf2events import RfactorStatusEvent, BenchmarkProgressEvent
@@ -62,7 +65,13 @@ class RfactorBenchmark:
         self.recording_timeout = self.default_timeout
         self.replay: Optional[str] = None
         self.use_fps_vr = False
+        self.use_present_mon_api = False
+        self.api_recorder: Optional[PresentMonApiRecorder] = None
+        self.telemetry_sampler: Optional[TelemetrySampler] = None
+        self.telemetry_rate = TELEMETRY_DEFAULT_RATE
         self.start_time = 0.0
+        # -- time.perf_counter() when the frame capture started, time base of the telemetry samples
+        self.capture_start = 0.0
         self.launch_method = 1
 
         self._timestamp = 0
@@ -81,11 +90,22 @@ class RfactorBenchmark:
                 logging.info("Starting to record benchmark with FpsVR")
                 if not self.start_fpsvr_logging():
                     self.finish()
+            elif self.use_present_mon_api:
+                logging.info("Starting to record benchmark with the PresentMon API")
+                if not self.start_present_mon_api_logging():
+                    self.finish()
             else:
                 logging.info("Starting to record benchmark with PresentMon")
                 if not self.start_present_mon_logging():
                     self.finish()
 
+            if self.recording:
+                self.start_telemetry_sampler()
+
+        # -- Record PresentMon API sample
+        if self.recording and self.api_recorder is not None and RfactorConnect.present_mon is not None:
+            self.api_recorder.add(RfactorConnect.present_mon.poll())
+
         # -- End Benchmark after benchmark length
         if self.recording and self.start_time > 0.0:
             remaining = self.benchmark_length - (time.time() - self.start_time)
@@ -134,6 +154,11 @@ class RfactorBenchmark:
         if self.use_fps_vr:
             self.fps_vr.stop()
             self._collect_fps_vr_result()
+        if self.api_recorder is not None:
+            self.api_recorder.stop()
+            self.api_recorder = None
+        if self.telemetry_sampler is not None:
+            self.telemetry_sampler.stop()
 
         # -- Kill Running related processes
         create_quit_commands()
@@ -143,6 +168,7 @@ class RfactorBenchmark:
         # -- Write Session and Graphics Settings to file
         if self.recording and self.result_file is not None:
             self._create_result()
+        self.telemetry_sampler = None
 
         logging.info("rF2 Benchmark Run finished.")
         self.running = False
@@ -197,6 +223,9 @@ class RfactorBenchmark:
         timeout = getattr(self.current_run.settings.get_option("TimeOut"), "value", None)
         self.replay = getattr(self.current_run.settings.get_option("Replay"), "value", None)
         self.use_fps_vr = getattr(self.current_run.settings.get_option("use_fps_vr"), "value", False)
+        self.use_present_mon_api = getattr(self.current_run.settings.get_option("use_present_mon_api"), "value", False)
+        telemetry_rate = getattr(self.current_run.settings.get_option("telemetry_rate"), "value", None)
+        self.telemetry_rate = TELEMETRY_DEFAULT_RATE if telemetry_rate is None else float(telemetry_rate)
         self.benchmark_length = int(length or self.default_benchmark_length)
         self.recording_timeout = int(timeout or self.default_timeout)
         video_options: VideoSettings = getattr(self.get_current_gfx_preset(), VideoSettings.app_key, VideoSettings())
@@ -298,13 +327,56 @@ class RfactorBenchmark:
         except Exception as e:
             logging.error("Could not write benchmark result settings: %s", e)
 
+        # -- Write binary frame data for fast detail views
+        create_present_mon_sidecar(self.result_file)
+
+        # -- Write telemetry lap traces recorded alongside the frame data
+        if self.telemetry_sampler is not None:
+            self.telemetry_sampler.save(get_telemetry_file(self.result_file))
+            self.telemetry_sampler = None
+
     def start_fpsvr_logging(self):
         if self.fps_vr.start():
-            self.start_time = time.time()
+            self.start_time, self.capture_start = time.time(), time.perf_counter()
             self.recording = True
             return True
         return False
 
+    def start_telemetry_sampler(self):
+        """Sample player telemetry while recording to match frame times with the track position"""
+        if self.telemetry_rate <= 0:
+            logging.info("Telemetry sampling disabled in the benchmark settings.")
+            return
+        self.telemetry_sampler = TelemetrySampler(self.telemetry_rate)
+        if not self.telemetry_sampler.start(self.capture_start):
+            logging.error("Could not start telemetry sampler. Benchmark will be recorded without telemetry.")
+            self.telemetry_sampler = None
+
+    def start_present_mon_api_logging(self) -> bool:
+        """Record the metrics of the PresentMon API session instead of starting the PresentMon process"""
+        present_mon = RfactorConnect.present_mon
+        if present_mon is None:
+            logging.error("PresentMon API is not available. Can not start Benchmark Recording.")
+            return False
+
+        if not present_mon.is_tracking_process:
+            pid = RfactorConnect.get_pid()
+            if pid is None or not present_mon.start(pid):
+                logging.error("Could not start PresentMon API session for %s", GAME_EXECUTABLE)
+                present_mon.stop()
+                return False
+
+        self.result_file = AppSettings.present_mon_result_dir / f"{self.current_run.name}.csv"
+        self.api_recorder = PresentMonApiRecorder(self.result_file)
+        if not self.api_recorder.start():
+            self.api_recorder = None
+            return False
+
+        # -- Recorded rows are timed from the recorder start
+        self.start_time, self.capture_start = time.time(), self.api_recorder.start_time
+        self.recording = True
+        return True
+
     def start_present_mon_logging(self) -> bool:
         self.result_file = AppSettings.present_mon_result_dir / f"{self.current_run.name}.csv"
         cmd = [
@@ -328,7 +400,7 @@ class RfactorBenchmark:
             self.kill_pm_event.clear()
             self.present_mon_process = RunProcess(cmd, cwd, self.kill_pm_event)
             self.present_mon_process.start()
-            self.start_time = time.time()
+            self.start_time, self.capture_start = time.time(), time.perf_counter()
             self.recording = True
             return True
 
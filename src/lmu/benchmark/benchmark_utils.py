@@ -52,15 +52,19 @@ class BenchmarkQueue:
 
 def create_benchmark_commands(ai_key: str, fps_key: str, recording_timeout: int, replay: Optional[str] = None):
     # Wait for UI
-    CommandQueue.append(Command(Command.wait_for_state, data=RfactorState.api_available, timeout=120.0))
+    wait_api = CommandQueue.append(Command(Command.wait_for_state, data=RfactorState.api_available, timeout=120.0))
 
     if replay is None:
-        # -- Set session settings
-        CommandQueue.append(Command(Command.set_session_settings, data=AppSettings.session_selection, timeout=10.0))
         # -- Set Content
-        CommandQueue.append(Command(Command.set_content, data=AppSettings.content_selected, timeout=10.0))
+        content = CommandQueue.append(
+            Command(Command.set_content, data=AppSettings.content_selected, timeout=10.0, after=(wait_api,))
+        )
+        # -- Set session settings, selecting content may reset them
+        session = CommandQueue.append(
+            Command(Command.set_session_settings, data=AppSettings.session_selection, timeout=10.0, after=(content,))
+        )
         # Start Race Session
-        CommandQueue.append(Command(Command.start_race, timeout=10.0))
+        CommandQueue.append(Command(Command.start_race, timeout=10.0, after=(session,)))
 
     # -- Reset Session Settings
     AppSettings.session_selection = dict()
@@ -0,0 +1,281 @@
+"""Compare benchmark runs of a batch against a baseline run
+
+Frame time means get confidence intervals from a block bootstrap: every capture is cut into
+BOOTSTRAP_BLOCKS contiguous blocks which are resampled instead of single frames. This respects
+that consecutive frame times are correlated and keeps the resampling cheap for long captures.
+
+Results of the PresentMon API recorder hold window averages instead of single frames and are
+left out of the comparison.
+
+The frame time delta of every run against the baseline is attributed to the preset options the run
+changed. Options are ranked by their attributed frame time cost.
+
+Usage:
+    python -m lmu.benchmark.compare RESULT_DIR_OR_CSV [RESULT_CSV ...] [--baseline NAME]
+"""
+
+import argparse
+import math
+import random
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lmu.benchmark.frametime_stats import sorted_median, sorted_percentile
+from lmu.benchmark.fpsvr import FpsVR
+from lmu.benchmark.result import RESULT_SOURCE_PRESENT_MON_API, read_frametimes, read_preset_result, read_result_source
+from lmu.utils import get_widest, pad_string
+
+BOOTSTRAP_SAMPLES = 1000
+BOOTSTRAP_BLOCKS = 200
+BOOTSTRAP_CONFIDENCE = 95.0
+# -- Fixed seed so the same results always produce the same report
+BOOTSTRAP_SEED = 287
+
+Blocks = List[Tuple[float, int]]
+
+
+def _blocks(frametimes: Sequence[float], num_blocks: int = BOOTSTRAP_BLOCKS) -> Blocks:
+    """Sum and frame count of num_blocks contiguous blocks"""
+    size = len(frametimes)
+    num_blocks = max(1, min(num_blocks, size))
+    bounds = [size * i // num_blocks for i in range(num_blocks + 1)]
+    return [(math.fsum(frametimes[a:b]), b - a) for a, b in zip(bounds, bounds[1:])]
+
+
+def _resampled_mean(blocks: Blocks, rnd: random.Random) -> float:
+    total, count = 0.0, 0
+    for block_sum, block_count in rnd.choices(blocks, k=len(blocks)):
+        total += block_sum
+        count += block_count
+    return total / count if count else 0.0
+
+
+def bootstrap_interval(
+    frametimes: Sequence[float],
+    other: Optional[Sequence[float]] = None,
+    samples: int = BOOTSTRAP_SAMPLES,
+    confidence: float = BOOTSTRAP_CONFIDENCE,
+    seed: int = BOOTSTRAP_SEED,
+) -> Tuple[float, float]:
+    """Confidence interval of the mean of frametimes or, if other is given, of mean(other) - mean(frametimes)
+
+    :return: lower and upper bound in ms
+    """
+    if not len(frametimes) or (other is not None and not len(other)):
+        return 0.0, 0.0
+
+    rnd, blocks = random.Random(seed), _blocks(frametimes)
+    other_blocks = _blocks(other) if other is not None else None
+
+    estimates = list()
+    for _ in range(samples):
+        estimate = _resampled_mean(blocks, rnd)
+        if other_blocks is not None:
+            estimate = _resampled_mean(other_blocks, rnd) - estimate
+        estimates.append(estimate)
+    estimates.sort()
+
+    tail = (100.0 - confidence) / 2
+    return sorted_percentile(estimates, tail), sorted_percentile(estimates, 100.0 - tail)
+
+
+def read_result_options(file: Path) -> Dict[str, dict]:
+    """Flatten the presets exported next to a result to {option key: {name, value}}"""
+    options = dict()
+    for preset in read_preset_result(file).values():
+        for options_dict in (preset or dict()).values():
+            if not isinstance(options_dict, dict):
+                continue
+            for option in options_dict.get("options", list()):
+                key = option.get("key")
+                options[key] = {"name": option.get("name") or key, "value": option.get("value")}
+    return options
+
+
+def _changed_options(baseline: Dict[str, dict], options: Dict[str, dict]) -> List[dict]:
+    changed = list()
+    for key, option in options.items():
+        baseline_value = baseline.get(key, dict()).get("value")
+        if option["value"] != baseline_value:
+            changed.append({"key": key, "name": option["name"], "baseline": baseline_value, "value": option["value"]})
+    return changed
+
+
+def rank_option_changes(comparisons: Sequence[dict]) -> List[dict]:
+    """Attribute the frame time deltas of comparisons to their changed options, most expensive first
+
+    The delta of a comparison is split evenly between the options it changed and the cost of an
+    option change is the mean of its attributed deltas. Only costs of options changed alone in a
+    run are isolated, options always changed together can not be told apart.
+    """
+    changes: Dict[Tuple[str, str], dict] = dict()
+    for c in comparisons:
+        changed = c["changedOptions"]
+        for option in changed:
+            change = changes.setdefault(
+                (option["key"], repr(option["value"])),
+                {
+                    "key": option["key"],
+                    "name": option["name"],
+                    "baseline": option["baseline"],
+                    "value": option["value"],
+                    "runs": list(),
+                    "deltas": list(),
+                    "isolated": False,
+                    "significant": True,
+                },
+            )
+            change["runs"].append(c["name"])
+            change["deltas"].append(c["deltaMs"] / len(changed))
+            change["isolated"] |= len(changed) == 1
+            change["significant"] &= c["significant"]
+
+    ranking = list()
+    for change in changes.values():
+        deltas = change.pop("deltas")
+        ranking.append({**change, "deltaMs": math.fsum(deltas) / len(deltas)})
+    return sorted(ranking, key=lambda change: change["deltaMs"], reverse=True)
+
+
+def _summarize_run(file: Path, frametimes: array) -> dict:
+    sorted_frametimes = sorted(frametimes)
+    mean = math.fsum(sorted_frametimes) / len(sorted_frametimes) if sorted_frametimes else 0.0
+    return {
+        "name": file.name,
+        "frames": len(sorted_frametimes),
+        "frametimeMean": mean,
+        "frametimeMedian": sorted_median(sorted_frametimes),
+        "frametime99": sorted_percentile(sorted_frametimes, 99),
+        "fpsmean": 1000.0 / mean if mean else 0.0,
+        "ci": bootstrap_interval(frametimes),
+    }
+
+
+def compare_results(files: Sequence[Path], baseline_name: Optional[str] = None) -> dict:
+    """Compare result files against a baseline result
+
+    :param files: PresentMon or fpsVR result CSV files
+    :param baseline_name: file name of the baseline result, defaults to the oldest result
+    :return: JSON serializable report with runs, comparisons against the baseline, a ranking of the
+             changed options by frame time cost, a ranking of the runs and the excluded PresentMon API results
+    """
+    excluded = sorted(f.name for f in files if read_result_source(f) == RESULT_SOURCE_PRESENT_MON_API)
+    files = sorted((f for f in files if f.name not in excluded), key=lambda f: f.name)
+    if not files:
+        return {
+            "baseline": None,
+            "runs": list(),
+            "comparisons": list(),
+            "ranking": list(),
+            "runRanking": list(),
+            "excluded": excluded,
+        }
+
+    baseline_file = next((f for f in files if f.name == baseline_name), files[0])
+    frametimes = {f: read_frametimes(f) for f in files}
+    options = {f: read_result_options(f) for f in files}
+
+    runs = [_summarize_run(f, frametimes[f]) for f in files]
+    baseline_run = runs[files.index(baseline_file)]
+
+    comparisons = list()
+    for f, run in zip(files, runs):
+        if f == baseline_file:
+            continue
+        delta = run["frametimeMean"] - baseline_run["frametimeMean"]
+        low, high = bootstrap_interval(frametimes[baseline_file], frametimes[f])
+        comparisons.append(
+            {
+                "name": run["name"],
+                "deltaMs": delta,
+                "deltaPercent": delta * 100 / baseline_run["frametimeMean"] if baseline_run["frametimeMean"] else 0.0,
+                "ci": (low, high),
+                # -- The interval does not include zero
+                "significant": low > 0.0 or high < 0.0,
+                "changedOptions": _changed_options(options[baseline_file], options[f]),
+            }
+        )
+
+    run_ranking = [c["name"] for c in sorted(comparisons, key=lambda c: c["deltaMs"], reverse=True)]
+    return {
+        "baseline": baseline_run["name"],
+        "runs": runs,
+        "comparisons": comparisons,
+        "ranking": rank_option_changes(comparisons),
+        "runRanking": run_ranking,
+        "excluded": excluded,
+    }
+
+
+def _collect_result_files(paths: Sequence[Path]) -> List[Path]:
+    files = list()
+    for path in paths:
+        if path.is_dir():
+            files += [f for f in path.glob("*.csv") if not f.stem.startswith(FpsVR.FRAMETIMES_FILE_PREFIX)]
+        elif path.suffix == ".csv":
+            files.append(path)
+    return files
+
+
+def format_report(report: dict) -> str:
+    """Plain text table of a compare_results report"""
+    comparisons = {c["name"]: c for c in report["comparisons"]}
+    header = ["Result", "Mean", "Median", "99%", f"{BOOTSTRAP_CONFIDENCE:.0f}% CI", "Change", "Change CI"]
+    rows = list()
+
+    for run in report["runs"]:
+        c, change, change_ci = comparisons.get(run["name"]), "-", "-"
+        if c is not None:
+            change = f'{c["deltaPercent"]:+.2f} %'
+            change_ci = f'{c["ci"][0]:+.2f} - {c["ci"][1]:+.2f} ms{"" if c["significant"] else " (n.s.)"}'
+        rows.append(
+            [
+                f'{run["name"]}{" *" if run["name"] == report["baseline"] else ""}',
+                f'{run["frametimeMean"]:.2f} ms',
+                f'{run["frametimeMedian"]:.2f} ms',
+                f'{run["frametime99"]:.2f} ms',
+                f'{run["ci"][0]:.2f} - {run["ci"][1]:.2f}',
+                change,
+                change_ci,
+            ]
+        )
+
+    widths = [get_widest([row[i] for row in rows] + [header[i]]) for i in range(len(header))]
+    lines = ["".join(pad_string(v, w, align_right=i > 0) for i, (v, w) in enumerate(zip(line, widths)))
+             for line in [header] + rows]
+    lines.append("* baseline, frame times in ms, n.s. = change not significant")
+    if report.get("excluded"):
+        lines.append(f'Not compared, PresentMon API window averages: {", ".join(report["excluded"])}')
+
+    if report["ranking"]:
+        lines.append("\nFrame time cost ranking of settings:")
+    for idx, o in enumerate(report["ranking"], start=1):
+        notes = ("" if o["isolated"] else "changed with other settings, ") + ("" if o["significant"] else "n.s., ")
+        lines.append(
+            f'{idx:>3}. {o["deltaMs"]:+.2f} ms  {o["name"]}: {o["baseline"]} -> {o["value"]}  '
+            f'({notes}{", ".join(o["runs"])})'
+        )
+
+    unchanged = [name for name in report["runRanking"] if not comparisons[name]["changedOptions"]]
+    if unchanged:
+        lines.append(f'Runs without setting changes: {", ".join(unchanged)}')
+
+    return "\n".join(lines)
+
+
+def main(args: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare LMU benchmark results against a baseline result.")
+    parser.add_argument("paths", nargs="+", type=Path, help="Result directories or result CSV files")
+    parser.add_argument("--baseline", help="File name of the baseline result, defaults to the oldest result")
+    parsed = parser.parse_args(args)
+
+    files = _collect_result_files(parsed.paths)
+    if len(files) < 2:
+        parser.error("At least two result files are required for a comparison.")
+
+    print(format_report(compare_results(files, parsed.baseline)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Point budget downsampling of benchmark frame series for the FrontEnd chart
+
+Every bucket of the reference series keeps its minimum and maximum sample so frame time spikes stay
+visible regardless of the capture length. All other columns are sampled at the same indices.
+"""
+
+from array import array
+from typing import Callable, Dict, List, Sequence, Union
+
+Column = Union[array, list]
+
+
+def _extreme_index(bucket: Sequence[float], extreme: Callable) -> int:
+    try:
+        return bucket.index(extreme(bucket))
+    except ValueError:
+        # -- NaN extremes can not be looked up
+        return 0
+
+
+def minmax_indices(values: Sequence[float], max_points: int) -> List[int]:
+    """Indices of the minimum and maximum sample of every bucket, first and last sample are always kept
+
+    :param values: reference series eg. frame times
+    :param max_points: maximum number of indices to return, values <= 0 return all indices
+    :return: ascending list of at most max_points indices
+    """
+    size = len(values)
+    if max_points <= 0 or size <= max(max_points, 4):
+        return list(range(size))
+
+    num_buckets = max(1, (max_points - 2) // 2)
+    bucket_size = (size - 2) / num_buckets
+
+    indices = [0]
+    for b in range(num_buckets):
+        start, end = 1 + int(b * bucket_size), 1 + int((b + 1) * bucket_size)
+        if start >= end:
+            continue
+        bucket = values[start:end]
+        low, high = start + _extreme_index(bucket, min), start + _extreme_index(bucket, max)
+        indices.extend(sorted({low, high}))
+    indices.append(size - 1)
+
+    return indices
+
+
+def take(values: Column, indices: Sequence[int]) -> Column:
+    if isinstance(values, array):
+        return array(values.typecode, map(values.__getitem__, indices))
+    return [values[i] for i in indices]
+
+
+def downsample_columns(columns: Dict[str, Column], max_points: int, key: str) -> Dict[str, Column]:
+    """Reduce all columns of the same length as columns[key] to at most max_points samples
+
+    :param columns: result data, entries that are not columns eg. statistics are left untouched
+    :param max_points: point budget
+    :param key: name of the reference column whose extremes are preserved
+    :return: columns, downsampled in place
+    """
+    reference = columns.get(key)
+    if reference is None or len(reference) <= max_points:
+        return columns
+
+    size, indices = len(reference), minmax_indices(reference, max_points)
+    for name, values in columns.items():
+        if isinstance(values, (array, list)) and len(values) == size:
+            columns[name] = take(values, indices)
+
+    return columns
@@ -1,7 +1,8 @@
+import argparse
 import csv
 import statistics
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 
 from lmu.utils import pad_string, get_widest
 
@@ -126,8 +127,7 @@ def _sort_results(results: dict) -> dict:
     return ordered_results
 
 
-def print_fpsvr_results():
-    result_dir = Path(r'C:\Users\tappe\Documents\rf2_settings_widget\benchmark_results')
+def print_fpsvr_results(result_dir: Path):
     results = dict()
 
     for file in result_dir.glob('*.csv'):
@@ -216,5 +216,16 @@ def print_fpsvr_results():
         print(f'*average frametimes [{num_datapoints[option]} datapoints]')
 
 
+def main(args: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description='Print fpsVR results of a result directory.')
+    parser.add_argument('result_dir', type=Path, help='Directory containing fpsVR result CSV files')
+    parsed = parser.parse_args(args)
+
+    if not parsed.result_dir.is_dir():
+        parser.error(f'Result directory does not exist: {parsed.result_dir}')
+
+    print_fpsvr_results(parsed.result_dir)
+
+
 if __name__ == '__main__':
-    print_fpsvr_results()
+    main()
@@ -0,0 +1,93 @@
+"""Frametime statistics for benchmark result captures
+
+Every statistic is derived from one sorted copy of the fps column and one sorted copy of the
+frame time column, so a capture is sorted twice in C instead of being walked once per statistic.
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Optional, Sequence, Union
+
+Number = Union[int, float]
+
+# -- Frames taking longer than STUTTER_FACTOR times the median frame time count as stutter
+STUTTER_FACTOR = 2.5
+
+# -- Frame time histogram bins in milliseconds, the last bin collects everything above
+HISTOGRAM_BIN_WIDTH_MS = 1.0
+HISTOGRAM_MAX_MS = 50.0
+
+# -- Statistics reported per result, keys as consumed by the FrontEnd
+STAT_KEYS = ("fps99", "fps98", "fps002", "fpsmean", "fpsmedian", "stutter", "frametimeHistogram")
+
+
+def fps_from_frametimes(frametimes: Sequence[Number]) -> array:
+    """Convert frame times in ms to frames per second, zero frame times result in 0.0 fps"""
+    return array("d", (1000.0 / ft if ft else 0.0 for ft in frametimes))
+
+
+def sorted_percentile(sorted_data: Sequence[Number], percent: Number) -> float:
+    """Same nearest-rank percentile as lmu.utils.percentile but safe for empty data"""
+    size = len(sorted_data)
+    if not size:
+        return 0.0
+    idx = max(0, int(math.ceil((size * percent) / 100)) - 1)
+    return float(sorted_data[min(idx, size - 1)])
+
+
+def sorted_median(sorted_data: Sequence[Number]) -> float:
+    size = len(sorted_data)
+    if not size:
+        return 0.0
+    mid = size // 2
+    if size % 2:
+        return float(sorted_data[mid])
+    return (sorted_data[mid - 1] + sorted_data[mid]) / 2.0
+
+
+def frametime_histogram(sorted_frametimes: Sequence[Number]) -> dict:
+    """Count frames per HISTOGRAM_BIN_WIDTH_MS bin by bisecting the sorted frame times at every bin edge"""
+    num_bins = int(HISTOGRAM_MAX_MS / HISTOGRAM_BIN_WIDTH_MS)
+    edges = [round(i * HISTOGRAM_BIN_WIDTH_MS, 3) for i in range(1, num_bins + 1)]
+
+    counts, previous = list(), 0
+    for edge in edges:
+        position = bisect_left(sorted_frametimes, edge)
+        counts.append(position - previous)
+        previous = position
+    # -- Overflow bin
+    counts.append(len(sorted_frametimes) - previous)
+
+    return {"binWidth": HISTOGRAM_BIN_WIDTH_MS, "edges": edges, "counts": counts}
+
+
+def frametime_statistics(fps: Sequence[Number], frametimes: Optional[Sequence[Number]] = None) -> dict:
+    """Calculate all benchmark result statistics in one batch
+
+    :param fps: frames per second column of a capture
+    :param frametimes: optional frame times in ms, derived from fps if not provided
+    :return: dictionary with the keys in STAT_KEYS
+    """
+    if frametimes is None:
+        # -- 1000 / x converts in both directions
+        frametimes = fps_from_frametimes(fps)
+
+    sorted_fps = sorted(fps)
+    sorted_frametimes = sorted(frametimes)
+
+    fps_mean = math.fsum(sorted_fps) / len(sorted_fps) if sorted_fps else 0.0
+
+    # -- Stutter: frames above STUTTER_FACTOR x median frame time
+    stutter_threshold = sorted_median(sorted_frametimes) * STUTTER_FACTOR
+    stutter = len(sorted_frametimes) - bisect_right(sorted_frametimes, stutter_threshold)
+
+    return {
+        "fps99": sorted_percentile(sorted_fps, 99),
+        "fps98": sorted_percentile(sorted_fps, 98),
+        "fps002": sorted_percentile(sorted_fps, 0.2),
+        "fpsmean": fps_mean,
+        "fpsmedian": sorted_median(sorted_fps),
+        "stutter": stutter if sorted_frametimes else 0,
+        "frametimeHistogram": frametime_histogram(sorted_frametimes),
+    }
@@ -0,0 +1,65 @@
+"""Rolling history of live PresentMon metrics"""
+
+import time
+from array import array
+from typing import Optional
+
+from lmu.benchmark.present_mon_wrapper import METRIC_CONFIGS, MetricData
+
+METRIC_HISTORY_FIELDS = tuple(name for _, _, name in METRIC_CONFIGS)
+# -- Number of samples kept, older samples are overwritten
+METRIC_HISTORY_CAPACITY = 1200
+
+
+class PerformanceMetricHistory:
+    """Fixed capacity ring buffer of timestamped MetricData samples
+
+    Every field is stored in its own preallocated array('d'). Samples are addressed by a cursor
+    that counts all samples ever appended, so clients can ask for everything newer than the
+    last cursor they received.
+    """
+
+    capacity = METRIC_HISTORY_CAPACITY
+
+    _time = array("d", bytes(8 * METRIC_HISTORY_CAPACITY))
+    _columns = {name: array("d", bytes(8 * METRIC_HISTORY_CAPACITY)) for name in METRIC_HISTORY_FIELDS}
+    _count = 0
+
+    @classmethod
+    def append(cls, metrics: MetricData, timestamp: Optional[float] = None):
+        idx = cls._count % cls.capacity
+        cls._time[idx] = time.time() if timestamp is None else timestamp
+        for name, column in cls._columns.items():
+            column[idx] = getattr(metrics, name)
+        cls._count += 1
+
+    @classmethod
+    def cursor(cls) -> int:
+        return cls._count
+
+    @classmethod
+    def since(cls, cursor: int = 0) -> dict:
+        """Samples appended after cursor in columnar form
+
+        :param cursor: cursor returned by the previous call, 0 for all available samples
+        :return: dict with the new cursor, the cursor of the first returned sample, the sample
+                 timestamps and one list per metric. start > cursor means samples were missed.
+        """
+        start = min(max(int(cursor or 0), cls._count - cls.capacity, 0), cls._count)
+        first, last = start % cls.capacity, cls._count % cls.capacity
+
+        def _slice(column: array) -> list:
+            if start == cls._count:
+                return list()
+            if first < last:
+                return column[first:last].tolist()
+            # -- Wrapped around the end of the buffer
+            return column[first:].tolist() + column[:last].tolist()
+
+        data = {name: _slice(column) for name, column in cls._columns.items()}
+        data.update({"cursor": cls._count, "start": start, "time": _slice(cls._time)})
+        return data
+
+    @classmethod
+    def reset(cls):
+        cls._count = 0
@@ -0,0 +1,100 @@
+import logging
+import time
+from pathlib import Path
+from typing import Optional, TextIO
+
+from lmu.benchmark.present_mon_wrapper import MetricData
+from lmu.benchmark.result import RESULT_SOURCE_PRESENT_MON_API, RESULT_SOURCE_TAG
+from lmu.globals import GAME_EXECUTABLE
+
+# -- Result CSV columns, named like the PresentMon CLI columns read by lmu.benchmark.result
+RECORDER_COLUMNS = (
+    "Application",
+    "TimeInSeconds",
+    "msBetweenPresents",
+    "msGPUActive",
+    "msUntilDisplayed",
+    "msBetweenDisplayChange",
+    "msCPUBusy",
+    "msCPUWait",
+)
+# -- Minimum time in seconds between two recorded samples
+RECORDER_SAMPLE_INTERVAL = 0.1
+
+
+class PresentMonApiRecorder:
+    """Write metrics polled from the PresentMon API session to a result CSV readable by read_results
+
+    The API reports averages over its metric window instead of single frames, so every row is
+    one polled sample and msBetweenPresents is the average frame time of that window.
+    The first line tags the file as RESULT_SOURCE_PRESENT_MON_API so per-frame statistics are not
+    calculated from these rows.
+    """
+
+    # -- Recorder currently writing, the PresentMon API session must not be stopped while set
+    active: Optional["PresentMonApiRecorder"] = None
+
+    def __init__(self, file: Path):
+        self.file = file
+        self.rows = 0
+        self.start_time = 0.0
+        self.last_sample_time = 0.0
+        self._f: Optional[TextIO] = None
+
+    @classmethod
+    def is_recording(cls) -> bool:
+        return cls.active is not None
+
+    def start(self) -> bool:
+        try:
+            self._f = open(self.file, "w", newline="")
+            self._f.write(f"{RESULT_SOURCE_TAG}{RESULT_SOURCE_PRESENT_MON_API}\n")
+            self._f.write(",".join(RECORDER_COLUMNS) + "\n")
+        except OSError as e:
+            logging.error("Could not create PresentMon API result file %s: %s", self.file.name, e)
+            return False
+
+        self.rows, self.start_time, self.last_sample_time = 0, time.perf_counter(), 0.0
+        PresentMonApiRecorder.active = self
+        logging.info("Recording PresentMon API metrics to %s", self.file.name)
+        return True
+
+    def add(self, metrics: Optional[MetricData], time_in_seconds: Optional[float] = None) -> bool:
+        """Append a polled sample, samples without frames or within RECORDER_SAMPLE_INTERVAL are skipped
+
+        :param metrics: polled metrics
+        :param time_in_seconds: sample time since start, defaults to now
+        """
+        if self._f is None or metrics is None or metrics.fps_avg <= 0.0:
+            return False
+
+        if time_in_seconds is None:
+            time_in_seconds = time.perf_counter() - self.start_time
+        if self.rows and time_in_seconds - self.last_sample_time < RECORDER_SAMPLE_INTERVAL:
+            return False
+        self.last_sample_time = time_in_seconds
+
+        values = (
+            1000.0 / metrics.fps_avg,
+            metrics.gpu_busy_avg,
+            metrics.display_latency_avg,
+            metrics.display_duration_avg,
+            metrics.cpu_busy_avg,
+            metrics.frame_pacing_stall_avg,
+        )
+        self._f.write(f"{GAME_EXECUTABLE},{time_in_seconds:.6f}," + ",".join(f"{v:.4f}" for v in values))
+        self._f.write("\n")
+        self.rows += 1
+        return True
+
+    def stop(self) -> bool:
+        """Close the result file, returns True if any samples were recorded"""
+        if PresentMonApiRecorder.active is self:
+            PresentMonApiRecorder.active = None
+        if self._f is None:
+            return False
+
+        self._f.close()
+        self._f = None
+        logging.info("Recorded %s PresentMon API samples to %s", self.rows, self.file.name)
+        return self.rows > 0
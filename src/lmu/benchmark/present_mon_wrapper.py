@@ -2,12 +2,85 @@ import ctypes
 import logging
 import struct
 from ctypes import c_void_p, c_uint32, byref, c_double, c_uint64
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Sequence, List
 
 from lmu.globals import get_present_mon_service_loader
 from lmu.utils import JsonRepr
 from lmu.benchmark import present_mon_const as const
 
+# Abgefragte Metriken: (Metrik, Statistik, MetricData-Attribut)
+# Query, Puffer und Struct werden aus dieser Tabelle erzeugt, neue Metriken nur hier eintragen.
+METRIC_CONFIGS = (
+    # FPS Metriken
+    (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_AVG, "fps_avg"),
+    (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_PERCENTILE_01, "fps_01"),
+    (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_PERCENTILE_95, "fps_95"),
+    (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_PERCENTILE_99, "fps_99"),
+    (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_MAX, "fps_max"),
+    (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_MIN, "fps_min"),
+    # Frametimes und Performance
+    (const.PM_METRIC_CPU_FRAME_TIME, const.PM_STAT_AVG, "frame_duration_avg"),
+    (const.PM_METRIC_CPU_BUSY, const.PM_STAT_AVG, "cpu_busy_avg"),
+    (const.PM_METRIC_CPU_WAIT, const.PM_STAT_AVG, "frame_pacing_stall_avg"),
+    (const.PM_METRIC_GPU_TIME, const.PM_STAT_AVG, "gpu_time_avg"),
+    (const.PM_METRIC_GPU_BUSY, const.PM_STAT_AVG, "gpu_busy_avg"),
+    # Latenz
+    (const.PM_METRIC_DISPLAY_LATENCY, const.PM_STAT_AVG, "display_latency_avg"),
+    (const.PM_METRIC_DISPLAYED_TIME, const.PM_STAT_AVG, "display_duration_avg"),
+    (const.PM_METRIC_CLICK_TO_PHOTON_LATENCY, const.PM_STAT_NON_ZERO_AVG, "input_latency_avg"),
+    # Hardware-Metriken
+    (const.PM_METRIC_GPU_POWER, const.PM_STAT_AVG, "gpu_power_avg"),
+    # CPU-Metriken
+    (const.PM_METRIC_CPU_UTILIZATION, const.PM_STAT_AVG, "cpu_utilization"),
+    (const.PM_METRIC_CPU_FREQUENCY, const.PM_STAT_AVG, "cpu_frequency"),
+)
+
+# Mindestgröße des Blob-Puffers in Bytes
+MIN_BLOB_SIZE = 256
+
+
+def create_query_elements(metric_configs: Sequence[tuple] = METRIC_CONFIGS) -> ctypes.Array:
+    """Erzeugt das PM_QUERY_ELEMENT-Array für pmRegisterDynamicQuery."""
+    elements = (const.PM_QUERY_ELEMENT * len(metric_configs))()
+    for i, (metric, stat, _) in enumerate(metric_configs):
+        elements[i].metric = metric
+        elements[i].stat = stat
+        elements[i].deviceId = 0  # Standardgerät
+        elements[i].arrayIndex = 0
+    return elements
+
+
+def create_blob_struct(
+    elements: Sequence[const.PM_QUERY_ELEMENT], metric_configs: Sequence[tuple] = METRIC_CONFIGS
+) -> Tuple[struct.Struct, List[str]]:
+    """
+    Erzeugt ein einzelnes Struct für den Blob einer registrierten Query.
+
+    pmRegisterDynamicQuery trägt dataOffset und dataSize jedes Elements ein. Fehlen die Offsets,
+    werden die Werte als aufeinander folgende doubles in Reihenfolge der Query angenommen.
+
+    Returns:
+        Das Struct und die MetricData-Attribute in Reihenfolge der entpackten Werte
+    """
+    has_offsets = any(e.dataOffset for e in elements)
+    layout = sorted(
+        (e.dataOffset if has_offsets else i * 8, e.dataSize or 8, name)
+        for i, (e, (_, _, name)) in enumerate(zip(elements, metric_configs))
+    )
+
+    fmt, names, position = "=", list(), 0
+    for offset, size, name in layout:
+        if size != 8:
+            logging.warning(f"Metrik {name} hat keine double-Größe ({size} Bytes) und wird übersprungen.")
+            continue
+        if offset > position:
+            fmt += f"{offset - position}x"
+        fmt += "d"
+        names.append(name)
+        position = offset + size
+
+    return struct.Struct(fmt), names
+
 
 class MetricData(JsonRepr):
     """
@@ -70,6 +143,13 @@ class PresentMon:
         self.pid = 0
         self.metrics = MetricData()
 
+        # Von start() passend zur registrierten Query angelegt
+        self._blob_struct: Optional[struct.Struct] = None
+        self._blob_fields: List[str] = list()
+        self._blob_buffer = None
+        self._blobs_written = c_uint32(1)
+        self._blobs_written_ref = byref(self._blobs_written)
+
         try:
             self.pm_dll = ctypes.WinDLL(str(get_present_mon_service_loader()))
             self._define_api_functions()
@@ -147,41 +227,9 @@ class PresentMon:
             self.pm_dll.pmCloseSession(self.session)
             return False
 
-        # Erstellen einer Liste von Query-Elementen für alle gewünschten Metriken
-        metric_configs = [
-            # FPS Metriken
-            (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_AVG),  # fps_avg
-            (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_PERCENTILE_01),  # fps_90
-            (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_PERCENTILE_95),  # fps_95
-            (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_PERCENTILE_99),  # fps_99
-            (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_MAX),  # fps_max
-            (const.PM_METRIC_PRESENTED_FPS, const.PM_STAT_MIN),  # fps_min
-            # Frametimes und Performance
-            (const.PM_METRIC_CPU_FRAME_TIME, const.PM_STAT_AVG),  # frame_duration_avg
-            (const.PM_METRIC_CPU_BUSY, const.PM_STAT_AVG),  # frame_pacing_stall_avg
-            (const.PM_METRIC_CPU_WAIT, const.PM_STAT_AVG),  # frame_pacing_stall_avg
-            (const.PM_METRIC_GPU_TIME, const.PM_STAT_AVG),  # gpu_time_avg
-            (const.PM_METRIC_GPU_BUSY, const.PM_STAT_AVG),  # gpu_busy_avg
-            # Latenz
-            (const.PM_METRIC_DISPLAY_LATENCY, const.PM_STAT_AVG),  # display_latency_avg
-            (const.PM_METRIC_DISPLAYED_TIME, const.PM_STAT_AVG),  # display_duration_avg
-            (const.PM_METRIC_CLICK_TO_PHOTON_LATENCY, const.PM_STAT_NON_ZERO_AVG),  # input_latency_avg
-            # Hardware-Metriken
-            (const.PM_METRIC_GPU_POWER, const.PM_STAT_AVG),  # gpu_power_avg
-            # CPU-Metriken
-            (const.PM_METRIC_CPU_UTILIZATION, const.PM_STAT_AVG),  # cpu_utilization
-            (const.PM_METRIC_CPU_FREQUENCY, const.PM_STAT_AVG),  # cpu_frequency
-        ]
-
-        num_elements = len(metric_configs)
-        elements = (const.PM_QUERY_ELEMENT * num_elements)()
-
-        # Elemente konfigurieren
-        for i, (metric, stat) in enumerate(metric_configs):
-            elements[i].metric = metric
-            elements[i].stat = stat
-            elements[i].deviceId = 0  # Standardgerät
-            elements[i].arrayIndex = 0
+        # Query-Elemente für alle gewünschten Metriken
+        num_elements = len(METRIC_CONFIGS)
+        elements = create_query_elements()
 
         # Abfrage registrieren
         status = self.pm_dll.pmRegisterDynamicQuery(
@@ -193,6 +241,12 @@ class PresentMon:
             self.pm_dll.pmCloseSession(self.session)
             return False
 
+        # Puffer und Struct einmalig anlegen, poll() alloziert danach keine Puffer mehr
+        self._blob_struct, self._blob_fields = create_blob_struct(elements)
+        self._blob_buffer = (ctypes.c_uint8 * max(MIN_BLOB_SIZE, self._blob_struct.size))()
+        self._blobs_written = c_uint32(1)
+        self._blobs_written_ref = byref(self._blobs_written)
+
         logging.info(f"PresentMon-Überwachung für PID {self.pid} mit {num_elements} Metriken gestartet.")
         return True
 
@@ -203,77 +257,18 @@ class PresentMon:
         Returns:
             MetricData: Aktuelle Metriken oder None bei Fehler
         """
-        if not self.query or not self.pm_dll:
+        if not self.query or not self.pm_dll or self._blob_buffer is None:
             return None
 
-        # 19 Metriken * 8 Bytes pro double + zusätzlich Platz für Strings
-        blob_size = 256  # Großzügiger Puffer für alle Daten inkl. Strings
-        data_buffer = (ctypes.c_uint8 * blob_size)()
-        blobs_written = c_uint32(1)
-
-        status = self.pm_dll.pmPollDynamicQuery(self.query, self.pid, data_buffer, byref(blobs_written))
+        # Kapazität in Blobs, wird von der API mit der Anzahl geschriebener Blobs überschrieben
+        self._blobs_written.value = 1
+        status = self.pm_dll.pmPollDynamicQuery(self.query, self.pid, self._blob_buffer, self._blobs_written_ref)
 
-        if status == const.PM_STATUS_SUCCESS and blobs_written.value > 0:
-            # Alle double-Werte (numerische Metriken) extrahieren
-            # Die Reihenfolge muss mit der in start() definierten Reihenfolge übereinstimmen
+        if status == const.PM_STATUS_SUCCESS and self._blobs_written.value > 0:
+            # Alle Metriken mit einem einzigen Struct entpacken
             try:
-                offset = 0
-                # FPS Metriken (6 doubles)
-                self.metrics.fps_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                self.metrics.fps_01 = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                self.metrics.fps_95 = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                self.metrics.fps_99 = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                self.metrics.fps_max = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                self.metrics.fps_min = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-
-                # Frametimes und Performance (4 doubles)
-                # const.PM_METRIC_CPU_FRAME_TIME
-                self.metrics.frame_duration_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                # const.PM_METRIC_CPU_BUSY
-                self.metrics.cpu_busy_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                # const.PM_METRIC_CPU_WAIT
-                self.metrics.frame_pacing_stall_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                # const.PM_METRIC_GPU_TIME
-                self.metrics.gpu_time_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                # const.PM_METRIC_GPU_BUSY
-                self.metrics.gpu_busy_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-
-                # Latenz (3 doubles)
-                # const.PM_METRIC_DISPLAY_LATENCY
-                self.metrics.display_latency_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                # const.PM_METRIC_DISPLAYED_TIME
-                self.metrics.display_duration_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                # const.PM_METRIC_CLICK_TO_PHOTON_LATENCY
-                self.metrics.input_latency_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-
-                # GPU Power (1 double)
-                self.metrics.gpu_power_avg = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-
-                # CPU-Metriken (2 doubles)
-                # const.PM_METRIC_CPU_UTILIZATION
-                self.metrics.cpu_utilization = struct.unpack_from("d", data_buffer, offset)[0]
-                offset += 8
-                # const.PM_METRIC_CPU_FREQUENCY
-                # CPU-Frequenz kommt in MHz, umrechnen in GHz und begrenzen auf sinnvolle Werte
-                cpu_freq_raw = struct.unpack_from("d", data_buffer, offset)[0]
-                # Überprüfen und konvertieren, falls nötig
-                self.metrics.cpu_frequency = cpu_freq_raw
-                offset += 8
+                for name, value in zip(self._blob_fields, self._blob_struct.unpack_from(self._blob_buffer)):
+                    setattr(self.metrics, name, value)
 
                 # CPU Frame Time für Abwärtskompatibilität (redundant, bereits in frame_duration_avg)
                 self.metrics.cpu_frame_time_avg = self.metrics.cpu_busy_avg
@@ -1,84 +1,220 @@
 import csv
 import json
 import logging
-import statistics
+import math
+from array import array
 from pathlib import Path
-from typing import Dict
+from itertools import islice
+from typing import Dict, Iterable, List
 
 from lmu.preset.preset import BasePreset, GraphicsPreset, SessionPreset
 from lmu.preset.preset_base import load_preset
 from lmu.benchmark.fpsvr_result import read_raw_frametimes_file_name, read_fps_vr_result
-from lmu.utils import percentile
-
-
-def read_results(file: Path, details: bool = False):
+from lmu.benchmark.downsample import downsample_columns
+from lmu.benchmark.frametime_stats import frametime_statistics, fps_from_frametimes
+from lmu.benchmark.result_sidecar import read_result_sidecar, write_result_sidecar
+
+PRESENT_MON_DETAIL_FIELDS = ('msUntilDisplayed', 'QPCTime', 'msUntilRenderComplete', 'msBetweenDisplayChange',
+                             'Dropped', 'msInPresentAPI', 'TimeInSeconds', 'msBetweenPresents', 'msGPUActive')
+PRESENT_MON_SUMMARY_FIELDS = ('msBetweenPresents', )
+# -- Values PresentMon writes for frames without a measurement, eg. msUntilDisplayed of dropped frames
+PRESENT_MON_MISSING_VALUES = {'NA', ''}
+PRESENT_MON_CHUNK_ROWS = 8192
+
+# -- Capture sources, PresentMon API results hold one row per metric window instead of one per frame
+RESULT_SOURCE_PRESENT_MON = 'presentmon'
+RESULT_SOURCE_PRESENT_MON_API = 'presentmon_api'
+RESULT_SOURCE_FPS_VR = 'fpsvr'
+# -- First line of recorded result CSVs naming their source, skipped like other PresentMon comments
+RESULT_SOURCE_TAG = '// source: '
+# -- Statistics that need single frames, not reported for results of window averages
+PER_FRAME_STAT_KEYS = ('fps99', 'fps98', 'fps002', 'stutter', 'frametimeHistogram')
+
+
+def read_results(file: Path, details: bool = False, max_points: int = 0):
+    """ Read a benchmark result and calculate its statistics
+
+    :param file: PresentMon or fpsVR result CSV
+    :param details: include the frame columns
+    :param max_points: reduce the frame columns to this many points, keeping frame time spikes. 0 keeps all frames.
+    """
     if not file.exists():
         return dict()
 
-    data = read_fps_vr_result(file)
+    data, source = read_fps_vr_result(file), RESULT_SOURCE_FPS_VR
     if not data:
-        data = read_present_mon_result(file, details)
+        data, source = read_present_mon_result(file, details), read_result_source(file)
 
     if 'fps' not in data:
-        data['fps'] = [1000 / i for i in data.get('msBetweenPresents')]
+        data['fps'] = fps_from_frametimes(data.get('msBetweenPresents', list()))
 
     # -- Add Statistics
-    sorted_fps = sorted(data['fps'])
-    data['fps99'] = percentile(sorted_fps, 99)
-    data['fps98'] = percentile(sorted_fps, 98)
-    data['fps002'] = percentile(sorted_fps, 0.2)
-    data['fpsmean'], data['fpsmedian'] = statistics.mean(sorted_fps), statistics.median(sorted_fps)
+    data.update(frametime_statistics(data['fps'], data.get('msBetweenPresents')))
+    if source == RESULT_SOURCE_PRESENT_MON_API:
+        # -- Percentiles and stutter of window averages are not comparable to the ones of single frames
+        data.update({key: None for key in PER_FRAME_STAT_KEYS})
+    data['source'] = source
 
     if not details:
-        data.pop('msBetweenPresents')
-        data.pop('fps')
-        data.pop('TimeInSeconds')
+        data.pop('msBetweenPresents', None)
+        data.pop('fps', None)
+        data.pop('TimeInSeconds', None)
+        return data
+
+    # -- Statistics are based on all frames, only the columns sent to the chart are reduced
+    if max_points:
+        downsample_columns(data, max_points, 'msBetweenPresents')
+
+    # -- Convert columns to JSON serializable lists
+    for key, values in data.items():
+        if isinstance(values, array):
+            data[key] = to_js_list(values)
 
     return data
 
 
-def read_present_mon_result(file: Path, details: bool = False):
-    required_fields = {'msUntilDisplayed', 'QPCTime', 'msUntilRenderComplete', 'msBetweenDisplayChange',
-                       'Dropped', 'msInPresentAPI', 'TimeInSeconds', 'msBetweenPresents', 'msGPUActive'}
-    non_detail_fields = {'msBetweenPresents', }
+def read_present_mon_result(file: Path, details: bool = False) -> Dict[str, array]:
+    fields = PRESENT_MON_DETAIL_FIELDS if details else PRESENT_MON_SUMMARY_FIELDS
+    data = read_result_sidecar(file, fields)
+    if data is not None:
+        return data
+
+    data = read_present_mon_columns(file, fields)
+
+    # -- Create missing sidecars of older captures so the next detail view is fast
+    if details and data:
+        write_result_sidecar(file, data)
+
+    return data
+
+
+def read_result_source(file: Path) -> str:
+    """ Capture source of a PresentMon result CSV, PresentMon CLI captures carry no source tag """
+    try:
+        with open(file, 'r') as f:
+            line = f.readline()
+    except OSError:
+        return RESULT_SOURCE_PRESENT_MON
+
+    if line.startswith(RESULT_SOURCE_TAG):
+        return line[len(RESULT_SOURCE_TAG):].strip()
+    return RESULT_SOURCE_PRESENT_MON
+
+
+def read_frametimes(file: Path) -> array:
+    """ Frame times in ms of a PresentMon or fpsVR result """
+    data = read_fps_vr_result(file) or read_present_mon_result(file)
+    return array('d', data.get('msBetweenPresents', ()))
+
+
+def create_present_mon_sidecar(file: Path) -> bool:
+    """ Parse a finished PresentMon capture once and store its detail columns in a binary sidecar """
+    data = read_present_mon_columns(file, PRESENT_MON_DETAIL_FIELDS)
+    if not data:
+        logging.info('No PresentMon data to create a result sidecar from: %s', file.name)
+        return False
+    return write_result_sidecar(file, data)
+
+
+def read_present_mon_columns(file: Path, columns: Iterable[str]) -> Dict[str, array]:
+    """ Stream a PresentMon CSV and collect only the requested columns as double arrays
+
+        The header is resolved once to column indices, rows are then split and converted in chunks
+        of PRESENT_MON_CHUNK_ROWS so memory stays bounded on very long captures. Reading stops at the end
+        of the file or the first malformed row eg. the truncated last line of an aborted capture.
+        Missing measurements are stored as NaN.
+
+    :param file: PresentMon CSV file
+    :param columns: names of the columns to read, columns not present in the file are skipped
+    :return: dictionary of column name to array('d')
+    """
+    wanted = set(columns)
 
-    data = dict()
     with open(file, newline='') as f:
-        csv_reader = csv.reader(f)
-        for row in csv_reader:
-            if row[0].startswith('//'):
-                # -- Skip comment rows
-                continue
-            if not data:
-                # -- Assume first line as Header with column names
-                for field_name in row:
-                    data[field_name] = list()
-                continue
-
-            # -- Collect data for every row
-            for field_value, field_name in zip(row, data.keys()):
-                if not details and field_name not in non_detail_fields:
-                    continue
-                if field_value.replace('.', '', 1).isdigit():
-                    field_value = float(field_value)
-                if field_name in required_fields:
-                    data[field_name].append(field_value)
-
-    # -- Remove unnecessary fields
-    for key in set(data.keys()):
-        if key not in required_fields:
-            data.pop(key)
+        # -- Assume first non-comment line as Header with column names
+        header = list()
+        for line in f:
+            if line.strip() and not line.startswith('//'):
+                header = next(csv.reader([line]))
+                break
+
+        projection = [(idx, name) for idx, name in enumerate(header) if name in wanted]
+        data: Dict[str, array] = {name: array('d') for _, name in projection}
+        if not projection:
+            return data
+
+        # -- Only split each line up to the last projected column
+        num_fields, num_read = max(idx for idx, _ in projection) + 1, 0
+        while True:
+            lines = list(islice(f, PRESENT_MON_CHUNK_ROWS))
+            if not lines:
+                break
+
+            rows = _split_rows(lines, num_fields)
+            num_rows = next((i for i, row in enumerate(rows) if len(row) < num_fields), len(rows))
+
+            # -- Convert every projected column of this chunk at once
+            for idx, name in projection:
+                num_rows = _extend_column(data[name], [row[idx] for row in rows[:num_rows]])
+
+            # -- Columns may have stopped at different rows, keep them aligned
+            num_read += num_rows
+            for column in data.values():
+                del column[num_read:]
+
+            if num_rows < len(rows):
+                logging.warning('Stopped reading %s at malformed data row %s', file.name, num_read + 1)
+                break
 
     return data
 
 
+def _split_rows(lines: List[str], num_fields: int) -> List[List[str]]:
+    lines = [line for line in lines if line.strip() and not line.startswith('//')]
+    # -- PresentMon does not quote its values, only use the csv module if we have to
+    if any('"' in line for line in lines):
+        return list(csv.reader(lines))
+    return [line.rstrip('\r\n').split(',', num_fields) for line in lines]
+
+
+def _extend_column(column: array, values: List[str]) -> int:
+    """ Append values to column and return the number of values up to the first malformed value """
+    try:
+        column.extend(array('d', map(float, values)))
+        return len(values)
+    except ValueError:
+        pass
+
+    # -- Slow path for chunks with missing or malformed values
+    converted = array('d')
+    for value in values:
+        try:
+            converted.append(_to_float(value))
+        except ValueError:
+            break
+    column.extend(converted)
+    return len(converted)
+
+
+def _to_float(value: str) -> float:
+    if value in PRESENT_MON_MISSING_VALUES:
+        return math.nan
+    return float(value)
+
+
+def to_js_list(values) -> list:
+    """ Convert a result column to a JSON serializable list with NaN as None """
+    return [None if v != v else v for v in values]
+
+
 def read_preset_result(result_file: Path) -> Dict[int, BasePreset]:
     presets = dict()
     gfx = (GraphicsPreset.preset_type, GraphicsPreset.prefix)
     ses = (SessionPreset.preset_type, SessionPreset.prefix)
 
     for preset_type, prefix in (gfx, ses):
-        for f in result_file.parent.glob(f'{result_file.stem}*{prefix}.json'):
+        # -- Exported presets are named {prefix}_{result stem}_{prefix}.json
+        for f in result_file.parent.glob(f'*{result_file.stem}*{prefix}.json'):
             logging.debug('Located result preset: %s', f.name)
             p = load_preset(f, preset_type)
             presets[preset_type] = None if not p else p.to_js()
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from lmu.globals import get_settings_dir
+
+BENCHMARK_RESULT_CACHE_FILE_NAME = "benchmark_results_cache.json"
+
+
+class BenchmarkResultCache:
+    """On-disk index of parsed benchmark result summaries
+
+    Entries are keyed by the absolute result file path and are only valid as long as the
+    size and modification time of the result file and its _settings.json match.
+    A warm lookup only stats the files and never opens the result CSVs.
+    """
+
+    # -- Increase to invalidate all cached summaries eg. after adding new statistics
+    version = 2
+
+    _entries: Optional[Dict[str, dict]] = None
+    _dirty = False
+
+    @staticmethod
+    def _get_cache_file() -> Path:
+        return get_settings_dir() / BENCHMARK_RESULT_CACHE_FILE_NAME
+
+    @staticmethod
+    def _file_signature(file: Path) -> list:
+        try:
+            stat = file.stat()
+        except OSError:
+            return [None, None]
+        return [stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def _signature(cls, result_file: Path) -> list:
+        settings_file = result_file.parent / f"{result_file.stem}_settings.json"
+        return cls._file_signature(result_file) + cls._file_signature(settings_file)
+
+    @classmethod
+    def _load(cls) -> Dict[str, dict]:
+        if cls._entries is not None:
+            return cls._entries
+
+        cls._entries, file = dict(), cls._get_cache_file()
+        try:
+            if file.exists():
+                with open(file, "r") as f:
+                    cache = json.load(f)
+                if cache.get("version") == cls.version:
+                    cls._entries = cache.get("entries", dict())
+        except Exception as e:
+            logging.error("Could not read benchmark result cache. Results will be re-read: %s", e)
+
+        return cls._entries
+
+    @classmethod
+    def get(cls, result_file: Path) -> Optional[dict]:
+        """Return the cached summary for result_file or None if missing or outdated"""
+        entry = cls._load().get(str(result_file))
+        if entry is None or entry.get("signature") != cls._signature(result_file):
+            return None
+        return entry.get("summary")
+
+    @classmethod
+    def put(cls, result_file: Path, summary: dict):
+        cls._load()[str(result_file)] = {"signature": cls._signature(result_file), "summary": summary}
+        cls._dirty = True
+
+    @classmethod
+    def evict(cls, result_file: Path):
+        if cls._load().pop(str(result_file), None) is not None:
+            cls._dirty = True
+
+    @classmethod
+    def prune(cls, existing_files: Iterable[Path]):
+        """Drop entries of result files that no longer exist"""
+        existing = {str(f) for f in existing_files}
+        entries = cls._load()
+        for key in [k for k in entries if k not in existing]:
+            entries.pop(key)
+            cls._dirty = True
+
+    @classmethod
+    def save(cls) -> bool:
+        if not cls._dirty or cls._entries is None:
+            return True
+
+        file = cls._get_cache_file()
+        tmp_file = file.with_name(f"{file.name}.tmp")
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump({"version": cls.version, "entries": cls._entries}, f)
+            os.replace(tmp_file, file)
+        except Exception as e:
+            logging.error("Could not write benchmark result cache: %s", e)
+            return False
+
+        cls._dirty = False
+        return True
+
+    @classmethod
+    def reset(cls):
+        """Forget the in-memory index, next access will re-read the cache file"""
+        cls._entries = None
+        cls._dirty = False
@@ -0,0 +1,82 @@
+"""Parallel ingestion of benchmark result files in worker processes"""
+
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import gevent
+
+from lmu.benchmark.result import read_results, read_result_settings
+
+
+def summarize_result(file: Path) -> dict:
+    """Read the summary of a single result file, executed inside the worker processes"""
+    return {"data": read_results(file, details=False), "settings": read_result_settings(file)}
+
+
+class BenchmarkResultPool:
+    """Fan out result parsing across cores without blocking the gevent loop
+
+    The pool is created on first use and re-used for later calls so worker start-up is only paid once.
+    """
+
+    # -- Leave one core to the App and the game
+    max_workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+    # -- Interval in which the waiting greenlet checks for finished results
+    poll_interval = 0.05
+
+    _executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            logging.debug("Starting benchmark result pool with %s workers", cls.max_workers)
+            cls._executor = ProcessPoolExecutor(max_workers=cls.max_workers)
+        return cls._executor
+
+    @classmethod
+    def summarize(cls, files: Iterable[Path]) -> Iterator[Tuple[Path, dict]]:
+        """Summarize result files in the worker processes and yield (file, summary) as soon as each finished
+
+        Waiting for the workers yields to other greenlets. Files a worker could not process
+        are read in this process instead.
+        """
+        files = list(files)
+        if not files:
+            return
+
+        try:
+            executor = cls._get_executor()
+            pending: Dict[Future, Path] = {executor.submit(summarize_result, f): f for f in files}
+        except Exception as e:
+            logging.error("Could not start benchmark result pool, reading results sequentially: %s", e)
+            cls.shutdown()
+            for f in files:
+                yield f, summarize_result(f)
+                gevent.sleep(0)
+            return
+
+        while pending:
+            for future in [f for f in pending if f.done()]:
+                file = pending.pop(future)
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    logging.error("Benchmark result worker failed for %s: %s", file.name, e)
+                    if isinstance(e, BrokenProcessPool):
+                        cls.shutdown()
+                    summary = summarize_result(file)
+                yield file, summary
+
+            if pending:
+                gevent.sleep(cls.poll_interval)
+
+    @classmethod
+    def shutdown(cls):
+        if cls._executor is None:
+            return
+        cls._executor.shutdown(wait=False, cancel_futures=True)
+        cls._executor = None
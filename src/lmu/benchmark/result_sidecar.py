@@ -0,0 +1,126 @@
+"""Binary columnar sidecar for benchmark result captures
+
+The sidecar stores the frame columns of a result CSV as contiguous little-endian doubles
+next to a small header, so detail views can be loaded through mmap instead of re-parsing text.
+The CSV stays the source of truth, a sidecar is ignored once its CSV changed.
+
+Layout:
+    header      RESULT_SIDECAR_HEADER, see below
+    names       per column: length byte + utf-8 name, zero padded to an 8 byte boundary
+    columns     num_columns x num_rows float64
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+RESULT_SIDECAR_SUFFIX = "_frames.bin"
+RESULT_SIDECAR_MAGIC = b"LMUFRM"
+RESULT_SIDECAR_VERSION = 1
+
+# -- magic, version, num_columns, num_rows, csv size, csv mtime_ns
+RESULT_SIDECAR_HEADER = struct.Struct("<6sHIqqq")
+
+
+def get_result_sidecar_file(result_file: Path) -> Path:
+    return result_file.parent / f"{result_file.stem}{RESULT_SIDECAR_SUFFIX}"
+
+
+def _csv_signature(result_file: Path):
+    stat = result_file.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _padding(size: int) -> bytes:
+    return b"\x00" * (-size % 8)
+
+
+def write_result_sidecar(result_file: Path, columns: Dict[str, array]) -> bool:
+    """Write the columns of result_file into its sidecar, all columns need to be of equal length"""
+    sidecar_file = get_result_sidecar_file(result_file)
+    num_rows = len(next(iter(columns.values()), ()))
+    if any(len(c) != num_rows for c in columns.values()):
+        logging.error("Can not write benchmark result sidecar with columns of unequal length: %s", sidecar_file.name)
+        return False
+
+    tmp_file = sidecar_file.with_name(f"{sidecar_file.name}.tmp")
+    try:
+        size, mtime_ns = _csv_signature(result_file)
+        names = b"".join(bytes((len(n),)) + n for n in (name.encode("utf-8") for name in columns))
+
+        with open(tmp_file, "wb") as f:
+            header = RESULT_SIDECAR_HEADER.pack(
+                RESULT_SIDECAR_MAGIC, RESULT_SIDECAR_VERSION, len(columns), num_rows, size, mtime_ns
+            )
+            f.write(header + _padding(len(header)))
+            f.write(names + _padding(len(names)))
+            for column in columns.values():
+                column = array("d", column)
+                if sys.byteorder == "big":
+                    column.byteswap()
+                column.tofile(f)
+        os.replace(tmp_file, sidecar_file)
+    except Exception as e:
+        logging.error("Could not write benchmark result sidecar %s: %s", sidecar_file.name, e)
+        return False
+
+    logging.debug("Wrote benchmark result sidecar %s with %s rows", sidecar_file.name, num_rows)
+    return True
+
+
+def read_result_sidecar(result_file: Path, columns: Optional[Iterable[str]] = None) -> Optional[Dict[str, array]]:
+    """Load columns of result_file from its sidecar
+
+    :param result_file: result CSV file the sidecar belongs to
+    :param columns: names of the columns to load, all columns if None
+    :return: dictionary of column name to array('d') or None if there is no up-to-date sidecar
+    """
+    sidecar_file = get_result_sidecar_file(result_file)
+    if not sidecar_file.exists() or not result_file.exists():
+        return None
+
+    try:
+        # -- Columns are copied out of the mapping so the file is not kept open, which would block
+        #    deleting the result on Windows
+        with open(sidecar_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, num_columns, num_rows, size, mtime_ns = RESULT_SIDECAR_HEADER.unpack_from(mm)
+            if magic != RESULT_SIDECAR_MAGIC or version != RESULT_SIDECAR_VERSION:
+                logging.info("Ignoring benchmark result sidecar of unknown format: %s", sidecar_file.name)
+                return None
+            if (size, mtime_ns) != _csv_signature(result_file):
+                logging.info("Ignoring outdated benchmark result sidecar: %s", sidecar_file.name)
+                return None
+
+            offset, names = RESULT_SIDECAR_HEADER.size, list()
+            offset += len(_padding(offset))
+            for _ in range(num_columns):
+                length = mm[offset]
+                names.append(mm[offset + 1 : offset + 1 + length].decode("utf-8"))
+                offset += 1 + length
+            offset += len(_padding(offset))
+
+            wanted, data, column_size = set(names if columns is None else columns), dict(), num_rows * 8
+            if offset + num_columns * column_size > len(mm):
+                logging.error("Benchmark result sidecar is truncated: %s", sidecar_file.name)
+                return None
+
+            with memoryview(mm) as view:
+                for idx, name in enumerate(names):
+                    if name not in wanted:
+                        continue
+                    start = offset + idx * column_size
+                    column = array("d")
+                    column.frombytes(view[start : start + column_size])
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    data[name] = column
+    except Exception as e:
+        logging.error("Could not read benchmark result sidecar %s: %s", sidecar_file.name, e)
+        return None
+
+    return data
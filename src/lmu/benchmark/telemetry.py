@@ -0,0 +1,255 @@
+"""Sample player telemetry from LMU shared memory while a benchmark is recorded
+
+Samples are stored per lap in preallocated array('d') columns and saved next to the benchmark
+result as a compact binary file, so frame time spikes can be matched with the track position.
+
+File layout:
+    header      TELEMETRY_FILE_HEADER: magic, version, rate, num_fields, num_laps
+    per lap     TELEMETRY_LAP_HEADER: lap number, num_samples
+                num_fields x num_samples float64 in TELEMETRY_FIELDS order
+"""
+
+import logging
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+import gevent
+import gevent.event
+
+from lmu.pylmusharedmemory.lmu_data import LMUConstants, LMUObjectOut
+from lmu.pylmusharedmemory.lmu_mmap import ACCESS_PARTIAL_COPY, MAX_VEHICLES, MMapControl
+
+TELEMETRY_FILE_SUFFIX = "_telemetry.bin"
+TELEMETRY_FILE_MAGIC = b"LMUTEL"
+TELEMETRY_FILE_VERSION = 1
+TELEMETRY_FILE_HEADER = struct.Struct("<6sHdII")
+TELEMETRY_LAP_HEADER = struct.Struct("<iI")
+
+# -- time: seconds since the frame capture started, same base as PresentMon TimeInSeconds,
+#    elapsed: game session time, lap_dist: meters into the lap
+TELEMETRY_FIELDS = (
+    "time",
+    "elapsed",
+    "lap_dist",
+    "speed",
+    "throttle",
+    "brake",
+    "rpm",
+    "gear",
+    "pos_x",
+    "pos_y",
+    "pos_z",
+)
+TELEMETRY_DEFAULT_RATE = 20.0
+# -- Samples preallocated per lap and per growth step
+TELEMETRY_LAP_CAPACITY = 4096
+
+
+class LapTrace:
+    """Telemetry samples of one lap in preallocated columns"""
+
+    def __init__(self, lap: int, capacity: int = TELEMETRY_LAP_CAPACITY):
+        self.lap = lap
+        self.size = 0
+        self.capacity = capacity
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in TELEMETRY_FIELDS}
+
+    def append(self, values: tuple):
+        if self.size == self.capacity:
+            for column in self.columns.values():
+                column.frombytes(bytes(8 * TELEMETRY_LAP_CAPACITY))
+            self.capacity += TELEMETRY_LAP_CAPACITY
+
+        idx = self.size
+        for column, value in zip(self.columns.values(), values):
+            column[idx] = value
+        self.size += 1
+
+    def to_dict(self) -> Dict[str, array]:
+        """Columns trimmed to the recorded samples"""
+        return {name: column[: self.size] for name, column in self.columns.items()}
+
+
+def get_telemetry_file(result_file: Path) -> Path:
+    return result_file.parent / f"{result_file.stem}{TELEMETRY_FILE_SUFFIX}"
+
+
+class TelemetrySampler:
+    """Greenlet copying player telemetry into LapTraces at a fixed rate
+
+    Shared memory is read through a MMapControl partial copy of the player vehicle, so every
+    sample comes from one consistent snapshot of a game update.
+
+    :param rate: samples per second
+    :param source: callable returning a LMUObjectOut to sample from, defaults to the LMU shared memory
+    """
+
+    def __init__(self, rate: float = TELEMETRY_DEFAULT_RATE, source: Optional[Callable[[], LMUObjectOut]] = None):
+        self.rate = rate
+        self.laps: Dict[int, LapTrace] = dict()
+        self._source = source or self._open_shared_memory
+        self._mmap: Optional[MMapControl] = None
+        self._vehicles: Set[int] = set()
+        self._data: Optional[LMUObjectOut] = None
+        self._capture_start = 0.0
+        self._stop_event = gevent.event.Event()
+        self._greenlet: Optional[gevent.Greenlet] = None
+
+    def _open_shared_memory(self) -> Optional[LMUObjectOut]:
+        self._mmap, self._vehicles = MMapControl(LMUConstants.LMU_SHARED_MEMORY_FILE, LMUObjectOut), set()
+        try:
+            # -- Partial copy, only the player vehicle is copied per sample
+            self._mmap.create(ACCESS_PARTIAL_COPY)
+        except Exception as e:
+            logging.error("Could not open LMU shared memory for telemetry sampling: %s", e)
+            self._mmap = None
+            return None
+        return self._mmap.data
+
+    def _update(self):
+        """Copy a consistent snapshot of the player vehicle from shared memory"""
+        if self._mmap is None:
+            return
+        self._mmap.update()
+        idx = self._data.telemetry.playerVehicleIdx % MAX_VEHICLES
+        if idx not in self._vehicles:
+            # -- Player vehicle slot not copied yet, copy again including the slot
+            self._vehicles.add(idx)
+            self._mmap.register_vehicle(idx)
+            self._mmap.update()
+
+    def start(self, capture_start: Optional[float] = None) -> bool:
+        """Start sampling
+
+        :param capture_start: time.perf_counter() when the frame capture started, sample times are
+                              written relative to it. Defaults to now.
+        """
+        self._data = self._source()
+        if self._data is None:
+            return False
+
+        self.laps = dict()
+        self._capture_start = time.perf_counter() if capture_start is None else capture_start
+        self._stop_event.clear()
+        self._greenlet = gevent.spawn(self._run)
+        logging.info("Telemetry sampler started at %s Hz", self.rate)
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self._greenlet is not None:
+            self._greenlet.join(timeout=2.0)
+            self._greenlet = None
+
+        self._data = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        logging.info("Telemetry sampler stopped with %s laps", len(self.laps))
+
+    def _run(self):
+        interval = 1.0 / max(1.0, self.rate)
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error("Error sampling telemetry: %s", e)
+            self._stop_event.wait(interval)
+
+    def sample(self, sample_time: Optional[float] = None) -> bool:
+        """Copy the current player telemetry, returns False if there is no player vehicle"""
+        self._update()
+        telemetry = self._data.telemetry
+        if not telemetry.playerHasVehicle:
+            return False
+
+        idx = telemetry.playerVehicleIdx % MAX_VEHICLES
+        telem = telemetry.telemInfo[idx]
+        scoring = self._data.scoring.vehScoringInfo[idx]
+        vel, pos = telem.mLocalVel, telem.mPos
+
+        lap_trace = self.laps.get(telem.mLapNumber)
+        if lap_trace is None:
+            lap_trace = self.laps[telem.mLapNumber] = LapTrace(telem.mLapNumber)
+
+        lap_trace.append(
+            (
+                time.perf_counter() - self._capture_start if sample_time is None else sample_time,
+                telem.mElapsedTime,
+                scoring.mLapDist if scoring.mID == telem.mID else math.nan,
+                math.sqrt(vel.x * vel.x + vel.y * vel.y + vel.z * vel.z),
+                telem.mFilteredThrottle,
+                telem.mFilteredBrake,
+                telem.mEngineRPM,
+                telem.mGear,
+                pos.x,
+                pos.y,
+                pos.z,
+            )
+        )
+        return True
+
+    def save(self, file: Path) -> bool:
+        return write_telemetry_file(file, {lap: trace.to_dict() for lap, trace in self.laps.items()}, self.rate)
+
+
+def write_telemetry_file(file: Path, laps: Dict[int, Dict[str, array]], rate: float) -> bool:
+    tmp_file = file.with_name(f"{file.name}.tmp")
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(
+                TELEMETRY_FILE_HEADER.pack(
+                    TELEMETRY_FILE_MAGIC, TELEMETRY_FILE_VERSION, rate, len(TELEMETRY_FIELDS), len(laps)
+                )
+            )
+            for lap, columns in sorted(laps.items()):
+                f.write(TELEMETRY_LAP_HEADER.pack(lap, len(columns["time"])))
+                for name in TELEMETRY_FIELDS:
+                    column = array("d", columns[name])
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    column.tofile(f)
+        os.replace(tmp_file, file)
+    except Exception as e:
+        logging.error("Could not write telemetry file %s: %s", file.name, e)
+        return False
+
+    logging.debug("Wrote telemetry of %s laps to %s", len(laps), file.name)
+    return True
+
+
+def read_telemetry_file(file: Path) -> Optional[Dict[int, Dict[str, array]]]:
+    """Load lap traces as {lap number: {field: array('d')}}"""
+    try:
+        with open(file, "rb") as f:
+            magic, version, _, num_fields, num_laps = TELEMETRY_FILE_HEADER.unpack(
+                f.read(TELEMETRY_FILE_HEADER.size)
+            )
+            if magic != TELEMETRY_FILE_MAGIC or version != TELEMETRY_FILE_VERSION:
+                logging.error("Unknown telemetry file format: %s", file.name)
+                return None
+
+            laps = dict()
+            for _ in range(num_laps):
+                lap, num_samples = TELEMETRY_LAP_HEADER.unpack(f.read(TELEMETRY_LAP_HEADER.size))
+                columns = dict()
+                for idx in range(num_fields):
+                    column = array("d")
+                    column.fromfile(f, num_samples)
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    # -- Fields of newer versions are skipped
+                    if idx < len(TELEMETRY_FIELDS):
+                        columns[TELEMETRY_FIELDS[idx]] = column
+                laps[lap] = columns
+    except Exception as e:
+        logging.error("Could not read telemetry file %s: %s", file.name, e)
+        return None
+
+    return laps
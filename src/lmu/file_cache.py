@@ -0,0 +1,66 @@
+"""Parsed contents of game config files, shared by all readers until a file changes on disk"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class _CachedFile(NamedTuple):
+    mtime_ns: int
+    size: int
+    data: Any
+
+
+class GameFileCache:
+    """Cache the result of parsing a file, keyed by the file's modification time and size
+
+    Cached results are shared between all callers and must be treated as read only.
+    Code that modifies and writes back the content of a file parses it without the cache.
+    """
+
+    _files: Dict[Path, _CachedFile] = dict()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(cls, file: Path, parse: Callable[[Path], Any]) -> Optional[Any]:
+        """Cached result of parse(file), parse is only called if the file changed
+
+        Results of None are not cached, so errors are reported by parse on every call.
+        """
+        try:
+            stat = file.stat()
+        except OSError:
+            cls._files.pop(file, None)
+            return parse(file)
+
+        entry = cls._files.get(file)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            cls.hits += 1
+            return entry.data
+
+        cls.misses += 1
+        data = parse(file)
+        if data is None:
+            cls._files.pop(file, None)
+        else:
+            cls._files[file] = _CachedFile(stat.st_mtime_ns, stat.st_size, data)
+            logging.debug("Parsed and cached %s", file.name)
+        return data
+
+    @classmethod
+    def set(cls, file: Path, data: Any):
+        """Store data just written to file, so the next read does not parse it again"""
+        try:
+            stat = file.stat()
+        except OSError:
+            cls._files.pop(file, None)
+            return
+        cls._files[file] = _CachedFile(stat.st_mtime_ns, stat.st_size, data)
+
+    @classmethod
+    def invalidate(cls, file: Optional[Path] = None):
+        if file is None:
+            cls._files = dict()
+        else:
+            cls._files.pop(file, None)
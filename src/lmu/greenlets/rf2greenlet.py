@@ -4,7 +4,6 @@ import logging
 import time
 
 import eel
-import gevent
 
 from lmu.app.app_main import CLOSE_EVENT
 from lmu.benchmark import RfactorBenchmark
@@ -20,7 +19,11 @@ from lmu.rf2events import (
     PresentMonVersionEvent,
     EnableRestAPIEvent,
 )
+from lmu.benchmark.metrics_history import PerformanceMetricHistory
+from lmu.benchmark.present_mon_recorder import PresentMonApiRecorder
 from lmu.benchmark.present_mon_wrapper import PresentMon
+from lmu.globals import GAME_EXECUTABLE
+from lmu.process_watch import ProcessWatch
 from lmu.utils import capture_app_exceptions
 
 ENABLE_METRICS = False
@@ -57,11 +60,16 @@ def _while_rfactor_is_live():
             metrics = RfactorConnect.present_mon.get_metrics()
             if metrics:
                 PerformanceMetricsEvent.set(metrics)
+                PerformanceMetricHistory.append(metrics)
         except Exception as e:
             logging.error(f"Error getting Performance-Metrics: {e}")
 
-    # -- Stop PresentMon Session if Metrics disabled
-    if not ENABLE_METRICS and RfactorConnect.present_mon.is_tracking_process:
+    # -- Stop PresentMon Session if Metrics disabled and no benchmark is recording it
+    if (
+        not ENABLE_METRICS
+        and not PresentMonApiRecorder.is_recording()
+        and RfactorConnect.present_mon.is_tracking_process
+    ):
         RfactorConnect.present_mon.stop()
 
 
@@ -161,9 +169,24 @@ def _rfactor_greenlet_loop():
     CommandQueue.run()
 
 
+def _is_busy(rfb: RfactorBenchmark) -> bool:
+    """Game present, benchmark or commands active, the loop runs at the busy interval"""
+    return (
+        rfb.running
+        or not CommandQueue.is_empty()
+        or CommandQueue.current_command is not None
+        or RfactorLiveEvent.was_live
+        or RfactorConnect.state != RfactorState.unavailable
+        or ProcessWatch.is_running(GAME_EXECUTABLE)
+    )
+
+
 @capture_app_exceptions
 def rfactor_greenlet():
     logging.info("rFactor Greenlet started.")
+    ProcessWatch.start()
+    ProcessWatch.add_listener(GAME_EXECUTABLE, RfactorConnect.game_process_changed)
+    CLOSE_EVENT.rawlink(lambda _: RfactorConnect.wake())
     RfactorConnect.start_request_thread()
     rfb = RfactorBenchmark()
     EnableRestAPIEvent.set(False)
@@ -178,7 +201,10 @@ def rfactor_greenlet():
             logging.info("rFactor Greenlet received CLOSE event.")
             break
 
-        gevent.sleep(RfactorConnect.active_timeout * 0.25)
+        # -- Sleep until the next loop or until woken by the front end, commands or a game process change
+        interval = RfactorConnect.next_loop_interval(_is_busy(rfb))
+        RfactorConnect.wake_event.wait(timeout=interval)
+        RfactorConnect.wake_event.clear()
 
     # PresentMon stoppen, falls noch aktiv
     if RfactorConnect.present_mon:
@@ -190,6 +216,8 @@ def rfactor_greenlet():
             logging.error(f"Fehler beim Stoppen von PresentMon: {e}")
 
     RfactorConnect.stop_request_thread()
+    ProcessWatch.remove_listener(GAME_EXECUTABLE, RfactorConnect.game_process_changed)
+    ProcessWatch.stop()
     logging.info("rFactor Greenlet exiting")
 
 
@@ -2,42 +2,83 @@ import json
 import logging
 import time
 from http import client as http_lib
-from threading import Lock
-from typing import Optional
+from threading import Lock, Semaphore
+from typing import Dict, List, NamedTuple, Optional, Sequence
 
 MAX_RETRIES = 3
 RETRY_DELAY = 0.1  # seconds
+POOL_SIZE = 4  # keep-alive connections per session
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class _CacheEntry(NamedTuple):
+    time: float
+    response: 'HTTPResponse'
+    etag: Optional[str]
 
 
 class HTTPSession:
     """Simple HTTP session class for connection pooling using http.client.
 
     Thread-safe implementation with retry logic and proper connection lifecycle management.
+    Keeps up to pool_size keep-alive connections, so requests from several threads run in parallel.
+
+    GET responses of paths listed in cache_ttl are cached for the configured seconds and
+    revalidated with If-None-Match if the server sent an ETag. Writes drop cached responses
+    below the same resource, ex. POST /rest/sessions/settings drops /rest/sessions, and writes
+    to paths starting with one of invalidate_all drop all cached responses.
     """
 
-    def __init__(self, host: str, port: int, timeout: float = 5.0):
+    def __init__(self, host: str, port: int, timeout: float = 5.0, pool_size: int = POOL_SIZE,
+                 cache_ttl: Optional[Dict[str, float]] = None, invalidate_all: Sequence[str] = ()):
         self.host = host
         self.port = port
         self.timeout = timeout
-        self._connection: Optional[http_lib.HTTPConnection] = None
+        self.pool_size = pool_size
+        self._idle: List[http_lib.HTTPConnection] = list()
+        self._available = Semaphore(pool_size)
         self._lock = Lock()
 
+        # -- Response cache, path prefix: seconds
+        self.cache_ttl = dict(cache_ttl or dict())
+        self.invalidate_all = tuple(invalidate_all)
+        self._cache: Dict[str, _CacheEntry] = dict()
+        self._cache_generation = 0
+        self._cache_lock = Lock()
+
     def _get_connection(self) -> http_lib.HTTPConnection:
-        """Get or create a persistent HTTP connection (thread-safe)."""
+        """Get an idle or new HTTP connection, waits while all pool connections are in use (thread-safe)."""
+        self._available.acquire()
         with self._lock:
-            if self._connection is None:
-                self._connection = http_lib.HTTPConnection(self.host, self.port, timeout=self.timeout)
-            return self._connection
-
-    def _reset_connection(self) -> None:
-        """Reset the connection (thread-safe)."""
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = http_lib.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        elif conn.timeout != self.timeout:
+            conn.timeout = self.timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(self.timeout)
+        return conn
+
+    def _release_connection(self, conn: http_lib.HTTPConnection) -> None:
+        """Return a connection to the pool for re-use (thread-safe)."""
         with self._lock:
-            if self._connection:
-                try:
-                    self._connection.close()
-                except Exception:
-                    pass
-            self._connection = None
+            self._idle.append(conn)
+        self._available.release()
+
+    def _reset_connection(self, conn: Optional[http_lib.HTTPConnection] = None) -> None:
+        """Close a failed connection, or all idle connections if none is given (thread-safe)."""
+        if conn is None:
+            with self._lock:
+                connections, self._idle = self._idle, list()
+        else:
+            connections = [conn]
+            self._available.release()
+
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
 
     def request(self, method: str, url: str, data: Optional[bytes] = None,
                 headers: Optional[dict] = None, retry_count: int = 0) -> 'HTTPResponse':
@@ -56,19 +97,25 @@ class HTTPSession:
         Raises:
             Exception: If all retry attempts fail
         """
+        if method in WRITE_METHODS and retry_count == 0:
+            self.invalidate(url)
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
-            with self._lock:
-                req_headers = headers or {}
-                if data:
-                    req_headers['Content-Type'] = 'application/json'
-                    req_headers['Content-Length'] = str(len(data))
-                conn.request(method, url, body=data, headers=req_headers)
-                response = conn.getresponse()
-                return HTTPResponse(response.status, response.read().decode('utf-8'), response.getheaders())
+            req_headers = headers or {}
+            if data:
+                req_headers['Content-Type'] = 'application/json'
+                req_headers['Content-Length'] = str(len(data))
+            conn.request(method, url, body=data, headers=req_headers)
+            response = conn.getresponse()
+            result = HTTPResponse(response.status, response.read().decode('utf-8'), response.getheaders())
+            self._release_connection(conn)
+            if method in WRITE_METHODS:
+                # -- Drop responses cached while the write was in flight
+                self.invalidate(url)
+            return result
         except (http_lib.HTTPException, ConnectionError, OSError, TimeoutError) as e:
             # Connection might be stale, recreate it and retry
-            self._reset_connection()
+            self._reset_connection(conn)
 
             if retry_count < MAX_RETRIES:
                 logging.warning(
@@ -84,17 +131,58 @@ class HTTPSession:
             )
             raise
         except Exception as e:
+            self._reset_connection(conn)
             logging.error(
                 "Unexpected error during HTTP request: %s %s://%s:%s%s - %s: %s",
                 method, "http", self.host, self.port, url, type(e).__name__, e
             )
             raise
 
-    def get(self, url: str, timeout: Optional[float] = None) -> 'HTTPResponse':
-        """Send a GET request."""
+    def get(self, url: str, timeout: Optional[float] = None, use_cache: bool = True) -> 'HTTPResponse':
+        """Send a GET request, answered from the response cache if url is cacheable and fresh."""
         if timeout:
             self.timeout = timeout
-        return self.request('GET', url)
+
+        ttl = self._get_ttl(url) if use_cache else 0.0
+        if not ttl:
+            return self.request('GET', url)
+
+        with self._cache_lock:
+            entry = self._cache.get(url)
+            generation = self._cache_generation
+        if entry is not None and time.monotonic() - entry.time < ttl:
+            return entry.response.copy()
+
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else None
+        response = self.request('GET', url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            response = entry.response
+        elif response.status_code != 200:
+            return response
+
+        with self._cache_lock:
+            # -- Do not cache responses that may predate a write sent meanwhile
+            if generation == self._cache_generation:
+                self._cache[url] = _CacheEntry(time.monotonic(), response, response.get_header('ETag'))
+        return response.copy()
+
+    def _get_ttl(self, url: str) -> float:
+        """Cache time of the longest cache_ttl prefix matching url"""
+        prefixes = [p for p in self.cache_ttl if url.startswith(p)]
+        return self.cache_ttl[max(prefixes, key=len)] if prefixes else 0.0
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Drop cached responses related to a written url, or all cached responses"""
+        if url is None or url.startswith(self.invalidate_all):
+            prefix = ''
+        else:
+            # -- Resource of the url, ex. /rest/sessions of /rest/sessions/settings
+            prefix = '/' + '/'.join(url.split('?')[0].strip('/').split('/')[:2])
+
+        with self._cache_lock:
+            self._cache_generation += 1
+            for cached_url in [u for u in self._cache if u.startswith(prefix)]:
+                self._cache.pop(cached_url)
 
     def post(self, url: str, data: Optional[bytes] = None,
              json_data: Optional[dict] = None, headers: Optional[dict] = None) -> 'HTTPResponse':
@@ -109,8 +197,9 @@ class HTTPSession:
         return self.request('PUT', url, data=body, headers=headers)
 
     def close(self) -> None:
-        """Close the persistent connection and release resources."""
+        """Close the idle persistent connections and release resources."""
         self._reset_connection()
+        self.invalidate()
 
 
 class HTTPResponse:
@@ -126,3 +215,12 @@ class HTTPResponse:
         if self._json is None:
             self._json = json.loads(self.text)
         return self._json
+
+    def get_header(self, name: str) -> Optional[str]:
+        """Header value by case-insensitive name"""
+        name = name.lower()
+        return next((v for k, v in self.headers.items() if k.lower() == name), None)
+
+    def copy(self) -> 'HTTPResponse':
+        """New response with the same content, callers may modify the parsed json of their copy"""
+        return HTTPResponse(self.status_code, self.text, list(self.headers.items()))
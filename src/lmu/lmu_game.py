@@ -1,12 +1,15 @@
+import io
 import json
 import logging
+import os
 import subprocess
 import sys
 import time
 from configparser import ConfigParser
 from pathlib import Path, WindowsPath
-from typing import Optional, Iterator, Union, Type
+from typing import Dict, Optional, Iterator, Tuple, Union, Type
 
+from lmu.file_cache import GameFileCache
 from lmu.globals import LMU_APPID, LAUNCH_EXECUTABLE, GAME_EXECUTABLE
 from lmu.lmu_location import RfactorLocation
 from lmu.preset.preset import BasePreset, PresetType
@@ -16,6 +19,21 @@ from lmu.valve.steam_utils import SteamApps
 from lmu.mods.vrtoolkit import VrToolKit
 
 
+# -- Marks settings not present in a settings file
+_MISSING = object()
+
+
+def _write_file_atomic(file: Path, content: str, encoding: Optional[str] = None):
+    """Write content to a temporary file next to file and replace file with it"""
+    tmp_file = file.with_name(f"{file.name}.tmp")
+    try:
+        with open(tmp_file, "w", encoding=encoding) as f:
+            f.write(content)
+        os.replace(tmp_file, file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+
 def get_launch_executable() -> str:
     from lmu.app_settings import AppSettings
 
@@ -63,7 +81,11 @@ class RfactorPlayer:
         self.get_current_rfactor_settings(only_version)
 
     def get_current_rfactor_settings(self, only_version: bool = True):
-        """Read all settings from the current Le Mans Ultimate installation"""
+        """Read all settings from the current Le Mans Ultimate installation
+
+        Files are parsed through the GameFileCache, so only files changed since the
+        last read are parsed again.
+        """
         self._get_location()
 
         if not self._read_version():
@@ -76,7 +98,7 @@ class RfactorPlayer:
             player_json = self.player_json_import_data
         else:
             # -- Read Player JSON
-            player_json = self.read_player_json_dict(self.player_file, encoding="utf-8")
+            player_json = self.read_player_json_dict(self.player_file, encoding="utf-8", cached=True)
 
         # -- Get Options from Player JSON
         r = self._read_options_from_target(OptionsTarget.player_json, player_json)
@@ -84,7 +106,7 @@ class RfactorPlayer:
 
         # -- Read Controller JSON
         controller_json = self.read_player_json_dict(
-            self.controller_file, encoding="cp1252"
+            self.controller_file, encoding="cp1252", cached=True
         )
         self.read_controller_devices(controller_json)
         r = (
@@ -97,7 +119,7 @@ class RfactorPlayer:
 
         # -- Read Keyboard JSON
         keyboard_json = self.read_player_json_dict(
-            self.keyboard_file, encoding="cp1252"
+            self.keyboard_file, encoding="cp1252", cached=True
         )
         self._read_options_from_target(OptionsTarget.keyboard_json, keyboard_json)
         del keyboard_json
@@ -107,7 +129,7 @@ class RfactorPlayer:
             return
 
         # -- Read dx_config
-        config = self.read_dx_ini()
+        config = self.read_dx_ini(cached=True)
         if not config:
             self.is_valid = False
             return
@@ -174,22 +196,24 @@ class RfactorPlayer:
         self.update_webui_settings(preset, OptionsTarget.webui_session)
         self.update_webui_settings(preset, OptionsTarget.webui_content)
 
-        # -- Update Player Json settings
+        # -- Collect Player Json settings that differ from the settings on disk
         player_json_dict = self.read_player_json_dict(
-            self.player_file, encoding="utf-8"
+            self.player_file, encoding="utf-8", cached=True
         )
+        player_json_changes = dict()
         update_result = self._write_to_target(
-            OptionsTarget.player_json, preset, player_json_dict
+            OptionsTarget.player_json, preset, player_json_dict, player_json_changes
         )
 
-        # -- Update Controller Json settings
+        # -- Collect Controller Json settings that differ from the settings on disk
         controller_json_dict = self.read_player_json_dict(
-            self.controller_file, encoding="cp1252"
+            self.controller_file, encoding="cp1252", cached=True
         )
         preset.additional_write_operations(controller_json=controller_json_dict)
+        controller_json_changes = dict()
         update_result = (
             self._write_to_target(
-                OptionsTarget.controller_json, preset, controller_json_dict
+                OptionsTarget.controller_json, preset, controller_json_dict, controller_json_changes
             )
             and update_result
         )
@@ -197,10 +221,10 @@ class RfactorPlayer:
         if not update_result:
             return False
 
-        # -- Write JSON files
-        r = self.write_json(player_json_dict, self.player_file, encoding="utf-8")
-        return r and self.write_json(
-            controller_json_dict, self.controller_file, encoding="cp1252"
+        # -- Write changed JSON files
+        r = self._write_json_changes(player_json_dict, player_json_changes, self.player_file, "utf-8")
+        return r and self._write_json_changes(
+            controller_json_dict, controller_json_changes, self.controller_file, "cp1252"
         )
 
     def update_webui_settings(self, preset, target):
@@ -211,63 +235,81 @@ class RfactorPlayer:
                 self.webui_content_selection = preset_options.to_webui_js()
 
     def write_json(self, json_dict: dict, file: Path, encoding: str = "UTF-8") -> bool:
+        """Write to a temporary file first and replace the file, so it is never left half written"""
         try:
-            with open(file, "w", encoding=encoding) as f:
-                json.dump(json_dict, f, indent=2, ensure_ascii=False)
+            _write_file_atomic(file, json.dumps(json_dict, indent=2, ensure_ascii=False), encoding)
         except Exception as e:
             self.error += f"Error while writing file! {e}\n"
             logging.fatal(self.error)
             return False
         return True
 
+    def _write_json_changes(
+        self, json_dict: dict, changes: Dict[str, dict], file: Path, encoding: str
+    ) -> bool:
+        """Write json_dict updated with changes by category, skip the write if nothing changed
+
+        json_dict is the shared cached file content, only the changed categories are copied.
+        """
+        if not changes:
+            logging.info("Found no changed settings in %s. Skipping write.", file.name)
+            return True
+
+        updated_dict = dict(json_dict)
+        for category, category_changes in changes.items():
+            updated_dict[category] = {**json_dict[category], **category_changes}
+
+        if not self.write_json(updated_dict, file, encoding=encoding):
+            return False
+        GameFileCache.set(file, updated_dict)
+        return True
+
     def _write_to_target(
-        self, target: OptionsTarget, preset: BasePreset, json_dict: dict
+        self, target: OptionsTarget, preset: BasePreset, json_dict: dict, changes: Dict[str, dict]
     ) -> bool:
         for preset_options in self._get_target_options(target, preset):
-            if not self._update_player_json(json_dict, preset_options):
+            if not self._update_player_json(json_dict, preset_options, changes):
                 return False
         return True
 
     def _write_video_config(self, preset: BasePreset, vr_ini=False):
         """Update the Config_DX11.ini with supported Video Settings"""
-        settings_updated = False
-        ini_config = self.read_dx_ini(vr_ini)
+        # -- Compare with the cached settings on disk
+        ini_config = self.read_dx_ini(vr_ini, cached=True)
         if not ini_config:
             logging.error(f"Could not read video settings ini file.")
             return
 
         ini_file = self.ini_vr_file if vr_ini else self.ini_file
+        section = ini_config[ini_config.default_section]
 
+        changes = dict()
         for preset_options in self._get_target_options(OptionsTarget.dx_config, preset):
             for option in preset_options.options:
-                if option.key not in ini_config[ini_config.default_section]:
+                if option.key not in section:
                     self.error += f"Could not locate settings key: {option.key} in CONFIG_DX11.ini\n"
                     logging.error(self.error)
                     continue
-                if option.value is not None:
-                    ini_config[ini_config.default_section][option.key] = str(
-                        option.value
-                    )
+                if option.value is not None and str(option.value) != section[option.key]:
+                    changes[option.key] = str(option.value)
                     logging.info("Updated Dx Setting: %s: %s", option.key, option.value)
-                    settings_updated = True
 
-        if not settings_updated:
+        if not changes:
             logging.info(
                 "Found no updated Video Settings. Skipping update of dx_config!"
             )
             return
 
-        # -- Write Video Config.ini
+        # -- Write Video Config.ini, the cached config is read only
+        ini_config = self.read_dx_ini(vr_ini)
+        if not ini_config:
+            return
+        ini_config[ini_config.default_section].update(changes)
         try:
-            if ini_file.exists():
-                # - Write config
-                with open(ini_file, "w") as f:
-                    ini_config.write(f, space_around_delimiters=False)
-
-            # - Restore first ini comment line
-            with open(ini_file, "r") as f:
-                f_lines = f.readlines()
-            f_lines = [self.ini_first_line] + f_lines
+            # - Write config and restore first ini comment line
+            config_str = io.StringIO()
+            ini_config.write(config_str, space_around_delimiters=False)
+            f_lines = [self.ini_first_line] + config_str.getvalue().splitlines(keepends=True)
 
             # - Remove trailing new line
             if f_lines[-1] == "\n":
@@ -276,14 +318,14 @@ class RfactorPlayer:
             f_lines[-1] = f_lines[-1].rstrip("\n")
 
             # - Write modified config
-            with open(ini_file, "w") as f:
-                f.writelines(f_lines)
+            _write_file_atomic(ini_file, "".join(f_lines))
         except Exception as e:
             self.error += f"Could not write CONFIG_DX11.ini file! {e}\n"
             logging.error(self.error)
             return False
 
-    def _update_player_json(self, player_json_dict, preset_options: BaseOptions):
+    def _update_player_json(self, player_json_dict, preset_options: BaseOptions, changes: Dict[str, dict]):
+        """Collect option values that differ from player_json_dict into changes by category"""
         if not player_json_dict:
             return False
 
@@ -292,13 +334,12 @@ class RfactorPlayer:
             logging.error(self.error)
             return False
 
+        category = player_json_dict[preset_options.key]
+        category_changes = changes.get(preset_options.key, dict())
         for option in preset_options.options:
             if option.key in preset_options.skip_keys:
                 continue
-            if (
-                option.key not in player_json_dict[preset_options.key]
-                and not option.create_in_json
-            ):
+            if option.key not in category and not option.create_in_json:
                 logging.warning(
                     "Skipping Setting: %s in <Settings>.JSON that could not be located!",
                     option.key,
@@ -308,17 +349,20 @@ class RfactorPlayer:
                 logging.debug("Skipping write of %s because value is None.", option.key)
                 continue
 
-            player_json_dict[preset_options.key][option.key] = option.value
-            logging.info("Updated Setting: %s: %s", option.key, option.value)
-
             # -- Write duplicate keys e.g. GPRIX RaceTime + CURNT RaceTime
             duplicates_list = option.dupl or list()
             if isinstance(option.dupl, str):
                 duplicates_list = [option.dupl]
-            for key in duplicates_list:
-                player_json_dict[preset_options.key][key] = option.value
-                logging.info("Updated duplicated Setting: %s: %s", key, option.value)
 
+            for key in [option.key, *duplicates_list]:
+                current_value = category_changes.get(key, category.get(key, _MISSING))
+                if current_value == option.value and type(current_value) is type(option.value):
+                    continue
+                category_changes[key] = option.value
+                logging.info("Updated Setting: %s: %s", key, option.value)
+
+        if category_changes:
+            changes[preset_options.key] = category_changes
         return True
 
     def write_mod(self, preset: BasePreset, mod_type: Union[Type[VrToolKit]]) -> bool:
@@ -382,8 +426,14 @@ class RfactorPlayer:
         return settings_updated
 
     def read_player_json_dict(
-        self, file: Path, encoding: Optional[str] = None
+        self, file: Path, encoding: Optional[str] = None, cached: bool = False
     ) -> Optional[dict]:
+        """Read a settings JSON file
+
+        :param cached: return the shared, read only result of the last read if the file did not change
+        """
+        if cached:
+            return GameFileCache.get(file, lambda f: self.read_player_json_dict(f, encoding))
         if not file.exists() or not file.is_file():
             return
 
@@ -413,15 +463,29 @@ class RfactorPlayer:
         if controller_json:
             self.controller_devices = controller_json.get("Devices", dict())
 
-    def read_dx_ini(self, vr_ini=False) -> Optional[ConfigParser]:
+    def read_dx_ini(self, vr_ini=False, cached: bool = False) -> Optional[ConfigParser]:
+        """Read the dx config ini
+
+        :param cached: return the shared, read only result of the last read if the file did not change
+        """
+        ini_file = self.ini_vr_file if vr_ini else self.ini_file
+        if cached:
+            result = GameFileCache.get(ini_file, self._parse_dx_ini)
+        else:
+            result = self._parse_dx_ini(ini_file)
+
+        if result:
+            self.ini_first_line, conf = result
+            return conf
+
+    def _parse_dx_ini(self, ini_file: Path) -> Optional[Tuple[str, ConfigParser]]:
         try:
             # TODO: check that file exists!
             conf = self._create_ini_config_parser()
-            ini_file = self.ini_vr_file if vr_ini else self.ini_file
             with open(ini_file, "r") as f:
-                self.ini_first_line = f.readline()
+                first_line = f.readline()
                 conf.read_file(f)
-                return conf
+                return first_line, conf
         except Exception as e:
             self.error += f"Could not read CONFIG_DX11.ini file! {e} {self.ini_file}\n"
             logging.fatal(self.error)
@@ -429,13 +493,19 @@ class RfactorPlayer:
     def _read_version(self) -> bool:
         if not self.version_file.exists() or not self.version_file.is_file():
             return False
-        try:
-            with open(self.version_file, "r") as f:
-                self.version = f.readline()
-        except Exception as e:
-            logging.error("Error reading version file: %s", e)
+
+        def _read_first_line(file: Path) -> Optional[str]:
+            try:
+                with open(file, "r") as f:
+                    return f.readline()
+            except Exception as e:
+                logging.error("Error reading version file: %s", e)
+
+        version = GameFileCache.get(self.version_file, _read_first_line)
+        if version is None:
             return False
 
+        self.version = version
         return True
 
     def _create_ini_config_parser(self):
@@ -3,16 +3,13 @@ import subprocess
 from pathlib import WindowsPath
 from typing import Optional
 
-import psutil
+from lmu.process_watch import ProcessWatch
 
 ARGS_MAPPING = {"kneeboard": None, "crew_chief": ["-game", "LMU", "-skip_updates"], "sim_hub": None}
 
 
 def is_application_running(app_executable_name: str) -> bool:
-    for proc in psutil.process_iter(["pid", "name"]):
-        if proc.info["name"].lower().startswith(app_executable_name.lower()):
-            return True
-    return False
+    return ProcessWatch.is_running(app_executable_name)
 
 
 def _start_application(app_bin_path: WindowsPath = None, args: Optional[list] = None):
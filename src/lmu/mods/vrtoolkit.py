@@ -13,11 +13,17 @@ except ImportError:
     WINREG_AVAIL = False
 
 from lmu.mods import openxr
+from lmu.file_cache import GameFileCache
 from lmu.globals import get_data_dir, GAME_EXECUTABLE
 from lmu.preset.settings_model import BaseOptions, ReshadeClaritySettings
 from lmu.settingsdef import graphics
 
 
+def _read_lines(file: Path) -> Tuple[str, ...]:
+    with open(file, "r") as f:
+        return tuple(f.readlines())
+
+
 class VrToolKit:
     RESHADE_ZIP = "VRToolkitReshadeUniversal_1.0.4_plus_Clarity.zip"
     RESHADE_PRESET_BASE_DIR = "reshade-shaders"
@@ -394,9 +400,8 @@ class VrToolKit:
 
         # TODO: Fix OpenXR detected as enabled although it's not
         try:
-            # - Read Preset Ini file
-            with open(reshade_preset, "r") as f:
-                preset_lines = f.readlines()
+            # - Read Preset Ini file, unchanged files are not read again
+            preset_lines = GameFileCache.get(reshade_preset, _read_lines)
 
             # - Read settings from Preset Ini file lines
             clarity_found = False
@@ -1,7 +1,7 @@
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Type, Optional
+from typing import Dict, List, NamedTuple, Type, Optional
 
 from . import preset
 from .settings_model import OptionsTarget
@@ -13,6 +13,79 @@ for name, preset_cls in find_subclasses(preset, preset.BasePreset):
 del preset_cls
 
 
+class _PresetFile(NamedTuple):
+    mtime_ns: int
+    size: int
+    preset_type: Optional[int]
+    name: Optional[str]
+    # -- Parsed preset JSON, None if the file is not a valid preset file
+    js_dict: Optional[dict]
+
+
+class PresetRepository:
+    """ Parsed preset files, a file is only read again once its modification time or size changed
+
+        Presets are indexed by directory, type and name. Every call creates new preset
+        instances from the parsed JSON so callers can modify them freely.
+    """
+    _files: Dict[Path, _PresetFile] = dict()
+
+    @classmethod
+    def _read(cls, file: Path) -> Optional[_PresetFile]:
+        try:
+            stat = file.stat()
+        except OSError as e:
+            logging.error('Could not access Preset file %s: %s', file.name, e)
+            cls._files.pop(file, None)
+            return
+
+        entry = cls._files.get(file)
+        if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry
+
+        js_dict, preset_type, name = _read_preset_dict(file), None, None
+        if js_dict is not None:
+            preset_type, name = js_dict['preset_type'], js_dict.get('name')
+        entry = _PresetFile(stat.st_mtime_ns, stat.st_size, preset_type, name, js_dict)
+        cls._files[file] = entry
+        return entry
+
+    @classmethod
+    def _read_dir(cls, preset_dir: Path) -> Dict[Path, _PresetFile]:
+        files = {f: cls._read(f) for f in preset_dir.glob('*.json')}
+
+        # -- Forget deleted files
+        for file in [f for f in cls._files if f.parent == preset_dir and f not in files]:
+            cls._files.pop(file)
+
+        return {f: e for f, e in files.items() if e and e.js_dict is not None}
+
+    @classmethod
+    def load(cls, file: Path, preset_type: Optional[int] = None) -> Optional[preset.BasePreset]:
+        entry = cls._read(file)
+        if not entry or entry.js_dict is None:
+            return
+        if preset_type is not None and preset_type != entry.preset_type:
+            return
+        return _create_preset(entry)
+
+    @classmethod
+    def presets(cls, preset_dir: Path, preset_type: int) -> List[preset.BasePreset]:
+        """ All presets of a type in a directory """
+        return [_create_preset(e) for e in cls._read_dir(preset_dir).values() if e.preset_type == preset_type]
+
+    @classmethod
+    def find(cls, preset_dir: Path, preset_type: int, name: str) -> Optional[preset.BasePreset]:
+        """ Only creates the preset of this type and name """
+        for entry in cls._read_dir(preset_dir).values():
+            if entry.preset_type == preset_type and entry.name == name:
+                return _create_preset(entry)
+
+    @classmethod
+    def clear(cls):
+        cls._files = dict()
+
+
 def load_presets_from_dir(preset_dir, preset_type: int, current_preset: Optional[preset.BasePreset]=None,
                           selected_preset_name=None):
     """ Load all Presets from a directory of a certain type
@@ -23,20 +96,23 @@ def load_presets_from_dir(preset_dir, preset_type: int, current_preset: Optional
     :param str selected_preset_name: optional currently selected preset name
     :return: Tuple[List[rf2settings.preset.BasePreset], Optional[rf2settings.preset.BasePreset]]
     """
+    if not current_preset:
+        # -- Only the selected preset is requested
+        if selected_preset_name is None:
+            return list(), None
+        return list(), PresetRepository.find(preset_dir, preset_type, selected_preset_name)
+
     preset_ls, selected_preset = list(), None
 
-    for preset_file in preset_dir.glob('*.json'):
-        preset_obj = load_preset(preset_file, preset_type)
-        if not preset_obj:
-            continue
+    for preset_obj in PresetRepository.presets(preset_dir, preset_type):
         if preset_obj.name == selected_preset_name:
             selected_preset = preset_obj
-        if current_preset and preset_obj and preset_obj.name != current_preset.name:
+        if preset_obj.name != current_preset.name:
             preset_ls.append(preset_obj)
 
         # -- Make sure we read WebUi Options for Current Preset from Preset file
         #    Because these options can not be read from the rF installation.
-        if current_preset and preset_obj and preset_obj.name == current_preset.name:
+        if preset_obj.name == current_preset.name:
             webui_opt = {k: o for k, o in preset_obj.iterate_options()
                          if o.target in (OptionsTarget.webui_session, OptionsTarget.webui_content)}
             if webui_opt:
@@ -53,6 +129,10 @@ def load_preset(file: Path, load_preset_type: int) -> Optional[preset.BasePreset
     :param load_preset_type:
     :return: Optional[rf2settings.preset.BasePreset]
     """
+    return PresetRepository.load(file, load_preset_type)
+
+
+def _read_preset_dict(file: Path) -> Optional[dict]:
     try:
         with open(file.as_posix(), 'r') as f:
             new_preset_dict: dict = json.loads(f.read())
@@ -71,22 +151,15 @@ def load_preset(file: Path, load_preset_type: int) -> Optional[preset.BasePreset
             return
 
         # -- Fallback to GraphicsPreset
-        preset_type = preset.PresetType.graphics
-
-    # -- Skip Presets that are not of the desired type
-    if load_preset_type is not None and load_preset_type != preset_type:
-        return
+        new_preset_dict['preset_type'] = preset.PresetType.graphics
 
-    # -- Create new preset instance based on type
-    new_preset = PRESET_TYPES.get(preset_type)()
+    return new_preset_dict
 
-    # -- Load preset options from json
-    new_preset.from_js_dict(new_preset_dict)
 
-    # - Make sure older Preset Versions contain all fields
-    for k, v in PRESET_TYPES.get(preset_type)().__dict__.items():
-        if k[:2] != '__' and not callable(v):
-            if k not in new_preset.__dict__:
-                setattr(new_preset, k, v)
+def _create_preset(entry: _PresetFile) -> preset.BasePreset:
+    # -- Create new preset instance based on type, all fields of older Preset Versions are set by its init
+    new_preset = PRESET_TYPES.get(entry.preset_type)()
 
+    # -- Load preset options from json
+    new_preset.from_js_dict(entry.js_dict)
     return new_preset
@@ -1,6 +1,7 @@
 import logging
+import sys
 from enum import Enum
-from typing import Union, List, Optional
+from typing import Dict, Iterable, Union, List, Optional, Tuple
 
 from lmu.settingsdef import graphics, generic, controls, headlights
 from lmu.utils import JsonRepr
@@ -20,7 +21,83 @@ class OptionsTarget(Enum):
     app_settings = 100
 
 
+class OptionSchema:
+    """Immutable definition of an Option, compiled once from a settingsdef entry
+
+    Shared by all Option instances of the same setting.
+    """
+
+    __slots__ = ("key", "name", "value", "desc", "hidden", "create_in_json", "ini_type", "dupl", "settings")
+
+    def __init__(self, key: str = "Player JSON key", detail_dict: Optional[dict] = None):
+        detail_dict = detail_dict or {"name": "Friendly Setting Name", "hidden": False}
+        for name, value in (
+            ("key", sys.intern(key)),
+            ("name", detail_dict.get("name", "Unknown")),
+            ("value", detail_dict.get("value")),
+            ("desc", detail_dict.get("desc")),
+            ("hidden", detail_dict.get("hidden")),
+            ("create_in_json", detail_dict.get("create_in_json", False)),
+            ("ini_type", detail_dict.get("_type")),
+            ("dupl", detail_dict.get("_dupl")),
+            ("settings", tuple(detail_dict.get("settings", list()))),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"OptionSchema is read only, can not set {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"OptionSchema is read only, can not delete {name}")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
+# -- Compiled schemas by id of the settingsdef dict, the dict is kept to keep its id valid
+_compiled_schemas: Dict[int, Tuple[dict, Tuple[OptionSchema, ...]]] = dict()
+
+
+def compile_option_schema(options_dict: dict) -> Tuple[OptionSchema, ...]:
+    """OptionSchemas of a settingsdef options dict, compiled on first use"""
+    compiled = _compiled_schemas.get(id(options_dict))
+    if compiled is None or compiled[0] is not options_dict:
+        compiled = options_dict, tuple(OptionSchema(key, detail_dict) for key, detail_dict in options_dict.items())
+        _compiled_schemas[id(options_dict)] = compiled
+    return compiled[1]
+
+
+_default_schema = OptionSchema()
+
+
 class Option(JsonRepr):
+    # -- Only per instance values, the definition is shared in the schema
+    __slots__ = ("schema", "value", "hidden", "exists_in_rf", "difference", "difference_value")
+    # Attributes in the order they are serialized
+    js_keys = (
+        "key",
+        "name",
+        "value",
+        "hidden",
+        "ini_type",
+        "exists_in_rf",
+        "difference",
+        "difference_value",
+        "create_in_json",
+        "dupl",
+        "settings",
+        "desc",
+    )
     # No need to save these internal attributes
     skip_keys = ["dupl", "hidden", "create_in_json"]
     # Entries we don't want to export or save
@@ -37,24 +114,38 @@ class Option(JsonRepr):
         "dupl",
     ]
 
-    def __init__(self):
-        self.key = "Player JSON key"
-        self.name = "Friendly Setting Name"
+    def __init__(self, schema: OptionSchema = _default_schema):
+        self.schema = schema
 
         # Current value
-        self.value: Union[_allowed_value_types] = None
+        self.value: Union[_allowed_value_types] = schema.value
 
         # Extra Attributes
-        self.hidden: bool = False
-        self.ini_type = None
+        self.hidden: bool = schema.hidden
         self.exists_in_rf = False  # Mark options not found on disk so we can ignore them during comparison and saving
         self.difference = False
         self.difference_value = None
-        self.create_in_json = False
-        self.dupl = None  # Mark options that need another value written eg. GPRIX Time + CURNT Time
 
-        # Possible settings
-        self.settings: tuple = tuple()
+    # -- Definition attributes
+    key = property(lambda self: self.schema.key)
+    name = property(lambda self: self.schema.name)
+    desc = property(lambda self: self.schema.desc)
+    ini_type = property(lambda self: self.schema.ini_type)
+    create_in_json = property(lambda self: self.schema.create_in_json)
+    # Mark options that need another value written eg. GPRIX Time + CURNT Time
+    dupl = property(lambda self: self.schema.dupl)
+    # Possible settings
+    settings = property(lambda self: self.schema.settings)
+
+    def to_js_object(self, export: bool = False) -> dict:
+        skip_keys = set(self.skip_keys).union(self.export_skip_keys) if export else self.skip_keys
+        js_dict = dict()
+        for k in self.js_keys:
+            v = getattr(self, k)
+            # -- Types like ini_type int are not serialized
+            if k not in skip_keys and not callable(v):
+                js_dict[k] = v
+        return js_dict
 
     def __eq__(self, other):
         """Report difference between options
@@ -91,6 +182,51 @@ class Option(JsonRepr):
         return True
 
 
+def _invalidates_index(method):
+    def modify(self, *args, **kwargs):
+        self._index = None
+        return method(self, *args, **kwargs)
+
+    modify.__name__ = method.__name__
+    return modify
+
+
+class OptionList(list):
+    """List of Options with a lookup index by Option key
+
+    Keeps the order and serializes like a plain list. The index is updated on append
+    and rebuilt on the next lookup after any other modification. If a key is present
+    more than once, the first Option is found, like a linear search would.
+    """
+
+    def __init__(self, options: Iterable[Option] = ()):
+        super().__init__(options)
+        self._index: Optional[Dict[str, Option]] = None
+
+    def get(self, key) -> Optional[Option]:
+        if self._index is None:
+            self._index = dict()
+            for option in self:
+                self._index.setdefault(option.key, option)
+        return self._index.get(key)
+
+    def append(self, option: Option):
+        super().append(option)
+        if self._index is not None:
+            self._index.setdefault(option.key, option)
+
+    extend = _invalidates_index(list.extend)
+    insert = _invalidates_index(list.insert)
+    pop = _invalidates_index(list.pop)
+    remove = _invalidates_index(list.remove)
+    clear = _invalidates_index(list.clear)
+    sort = _invalidates_index(list.sort)
+    reverse = _invalidates_index(list.reverse)
+    __setitem__ = _invalidates_index(list.__setitem__)
+    __delitem__ = _invalidates_index(list.__delitem__)
+    __iadd__ = _invalidates_index(list.__iadd__)
+
+
 class BaseOptions(JsonRepr):
     # Read only options we want to read but never write to rF/save or export eg. Driver Name
     skip_keys = ["title", "ignore_equal", "mandatory", "key"]
@@ -111,25 +247,10 @@ class BaseOptions(JsonRepr):
     ignore_equal = False
 
     def __init__(self, options: List[Option] = None):
-        if options is None:
-            options = []
-        self.options: List[Option] = options
+        self.options: OptionList = OptionList(options or ())
 
     def read_from_python_dict(self, options_dict: dict):
-        self.options = list()
-
-        for key, detail_dict in options_dict.items():
-            option = Option()
-            option.key = key
-            option.name = detail_dict.get("name", "Unknown")
-            option.settings = tuple(detail_dict.get("settings", list()))
-            option.value = detail_dict.get("value")
-            option.desc = detail_dict.get("desc")
-            option.hidden = detail_dict.get("hidden")
-            option.create_in_json = detail_dict.get("create_in_json", False)
-            option.ini_type = detail_dict.get("_type")
-            option.dupl = detail_dict.get("_dupl")
-            self.options.append(option)
+        self.options = OptionList(Option(schema) for schema in compile_option_schema(options_dict))
 
     def to_js(self, export: bool = False) -> dict:
         return {
@@ -146,9 +267,7 @@ class BaseOptions(JsonRepr):
         return webui_dict
 
     def get_option(self, key) -> Optional[Option]:
-        o = [o for o in self.options if o.key == key]
-        if o:
-            return o[0]
+        return self.options.get(key)
 
     def from_js_dict(self, json_dict):
         for k, v in json_dict.items():
@@ -179,22 +298,15 @@ class BaseOptions(JsonRepr):
             logging.info("Options key difference: %s != %s", other.key, self.key)
             return False
 
-        # -- Compare every Option
-        #    sort both .options by their keys
-        options = sorted(self.options, key=lambda k: k.key)
-        other_options = sorted(other.options, key=lambda k: k.key)
-
-        # - FrontEnd variant
-        #   Slower but will mark all settings differences for FrontEnd display
+        # -- Compare every Option with the Option of the same key
+        #    compares all options to mark every settings difference for FrontEnd display
         equals = True
-        for a, b in zip(options, other_options):
-            if a.key not in self.skip_keys and a.exists_in_rf:
-                if a != b:
-                    equals = False
-
-        # - Performance variant
-        #   Quicker as it exits as soon as it finds the first difference
-        # return all((a == b for a, b in zip(options, other_options) if a.key not in self.skip_keys and a.exists_in_rf))
+        for a in self.options:
+            if a.key in self.skip_keys or not a.exists_in_rf:
+                continue
+            b = other.get_option(a.key)
+            if b is not None and a != b:
+                equals = False
 
         return equals
 
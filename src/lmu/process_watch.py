@@ -0,0 +1,172 @@
+"""Indexed view of running processes, updated from process start/exit deltas in a background thread"""
+
+import logging
+import time
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import psutil
+
+
+def _get_process(pid: int) -> Optional[psutil.Process]:
+    try:
+        process = psutil.Process(pid)
+        process.name()
+        return process
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+class ProcessWatch:
+    """Answer "is this executable running" without enumerating processes on the caller
+
+    A scan only compares the current PID list against the previous one and looks up the names
+    of started processes, exited PIDs are dropped from the index. Scans run in a background
+    thread once started, callers only read the index: find_pid and is_running look up the
+    watched executable name and check liveness of the indexed process (PID and create time).
+    """
+
+    scan_interval = 2.0
+
+    # -- Immutable snapshots, replaced as a whole by every scan
+    _names: Dict[int, str] = dict()
+    _matches: Dict[str, Tuple[psutil.Process, ...]] = dict()
+    _watched: Set[str] = set()
+    _last_scan = 0.0
+    # -- Watched name: callbacks(running) called from the scan thread when processes start or exit
+    _listeners: Dict[str, List[Callable[[bool], None]]] = dict()
+
+    _scan_lock = Lock()
+    _close_event = Event()
+    _thread: Optional[Thread] = None
+
+    @classmethod
+    def start(cls):
+        """Start scanning in a background thread"""
+        if cls._thread is not None and cls._thread.is_alive():
+            return
+        cls._close_event.clear()
+        cls._thread = Thread(target=cls._scan_loop, daemon=True, name="ProcessWatch")
+        cls._thread.start()
+
+    @classmethod
+    def stop(cls):
+        cls._close_event.set()
+        if cls._thread is not None:
+            cls._thread.join(timeout=cls.scan_interval + 1.0)
+            cls._thread = None
+
+    @classmethod
+    def is_watching(cls) -> bool:
+        return cls._thread is not None and cls._thread.is_alive()
+
+    @classmethod
+    def _scan_loop(cls):
+        logging.debug("Process watch started.")
+        while not cls._close_event.is_set():
+            try:
+                cls.scan()
+            except Exception as e:
+                logging.error("Error scanning processes: %s", e)
+            cls._close_event.wait(cls.scan_interval)
+        logging.debug("Process watch stopped.")
+
+    @classmethod
+    def scan(cls):
+        """Update the index with processes started and exited since the last scan"""
+        with cls._scan_lock:
+            current_pids = set(psutil.pids())
+            previous = cls._names
+
+            names = {pid: name for pid, name in previous.items() if pid in current_pids}
+            started = dict()
+            for pid in current_pids.difference(previous):
+                process = _get_process(pid)
+                names[pid] = process.name().lower() if process else ""
+                if process:
+                    started[pid] = process
+
+            matches = dict()
+            for watched in set(cls._watched):
+                running = [p for p in cls._matches.get(watched, ()) if p.pid in current_pids]
+                running += [p for pid, p in started.items() if names[pid].startswith(watched)]
+                matches[watched] = tuple(running)
+
+            previous_matches = cls._matches
+            cls._names, cls._matches, cls._last_scan = names, matches, time.monotonic()
+
+        for watched, listeners in list(cls._listeners.items()):
+            previous_pids = {p.pid for p in previous_matches.get(watched, ())}
+            if previous_pids != {p.pid for p in matches.get(watched, ())}:
+                for listener in listeners:
+                    listener(bool(matches.get(watched)))
+
+    @classmethod
+    def add_listener(cls, name: str, callback: Callable[[bool], None]):
+        """Call callback(running) whenever a scan finds processes of name started or exited
+
+        Callbacks are called from the scan thread and should only set flags or events.
+        """
+        cls._index(name)
+        with cls._scan_lock:
+            cls._listeners.setdefault(name.lower(), list()).append(callback)
+
+    @classmethod
+    def remove_listener(cls, name: str, callback: Callable[[bool], None]):
+        with cls._scan_lock:
+            listeners = cls._listeners.get(name.lower(), list())
+            if callback in listeners:
+                listeners.remove(callback)
+
+    @classmethod
+    def _index(cls, name: str) -> Tuple[psutil.Process, ...]:
+        name = name.lower()
+        matches = cls._matches.get(name)
+        if matches is not None:
+            return matches
+
+        # -- Start watching a new name, match it against the already known processes once.
+        #    Hold the scan lock so a concurrent scan can not replace the index built here.
+        with cls._scan_lock:
+            matches = cls._matches.get(name)
+            if matches is not None:
+                return matches
+            cls._watched.add(name)
+            processes = (_get_process(pid) for pid, n in cls._names.items() if n.startswith(name))
+            matches = tuple(p for p in processes if p is not None)
+            cls._matches = {**cls._matches, name: matches}
+        return matches
+
+    @classmethod
+    def _refresh_unwatched(cls):
+        """Without the background thread scan on access, at most once per scan interval"""
+        if not cls.is_watching() and time.monotonic() - cls._last_scan > cls.scan_interval:
+            cls.scan()
+
+    @classmethod
+    def find_pid(cls, name: str, exact: bool = False) -> Optional[int]:
+        """PID of a running process whose executable name starts with name (case insensitive)
+
+        Args:
+            name: executable name or its prefix.
+            exact: only match processes whose executable name equals name.
+        """
+        cls._refresh_unwatched()
+        for process in cls._index(name):
+            if exact and cls._names.get(process.pid) != name.lower():
+                continue
+            if process.is_running():
+                return process.pid
+        return None
+
+    @classmethod
+    def is_running(cls, name: str, exact: bool = False) -> bool:
+        return cls.find_pid(name, exact) is not None
+
+    @classmethod
+    def is_pid_running(cls, pid: Optional[int], name: str) -> bool:
+        """PID belongs to a running process whose executable name starts with name"""
+        if not pid or pid < 0:
+            return False
+        cls._refresh_unwatched()
+        return any(p.pid == pid and p.is_running() for p in cls._index(name))
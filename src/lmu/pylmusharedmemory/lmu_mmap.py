@@ -10,6 +10,7 @@ import ctypes
 import logging
 import mmap
 import platform
+from typing import Callable, List, Tuple
 
 try:
     from . import lmu_data
@@ -22,6 +23,23 @@ PLATFORM = platform.system()
 MAX_VEHICLES = LMUConstants.MAX_MAPPED_VEHICLES
 INVALID_INDEX = -1
 
+# Access modes
+ACCESS_COPY = 0
+ACCESS_DIRECT = 1
+ACCESS_PARTIAL_COPY = 2
+
+# Fields always copied in partial copy mode, required to check for game updates
+PARTIAL_COPY_BASE_FIELDS = (
+    "generic",
+    "scoring.scoringInfo",
+    "telemetry.activeVehicles",
+    "telemetry.playerVehicleIdx",
+    "telemetry.playerHasVehicle",
+)
+
+# Copy attempts per update before giving up on a consistent snapshot
+SNAPSHOT_RETRIES = 3
+
 
 def get_root_logger_name():
     """Get root logger name"""
@@ -33,6 +51,45 @@ def get_root_logger_name():
 logger = logging.getLogger(get_root_logger_name())
 
 
+def field_range(data_struct: type, path: str) -> Tuple[int, int]:
+    """Byte range of a (nested) structure field
+
+    Args:
+        data_struct: ctypes structure type, ex. lmu_data.LMUObjectOut.
+        path: dotted field path, array elements by index, ex. "telemetry.telemInfo[0]".
+
+    Returns:
+        (start, end) byte offsets relative to the start of data_struct.
+    """
+    offset, current, size = 0, data_struct, ctypes.sizeof(data_struct)
+    for part in path.split("."):
+        name, _, index = part.partition("[")
+        field_types = dict((f[0], f[1]) for f in current._fields_)
+        if name not in field_types:
+            raise AttributeError(f"{current.__name__} has no field {name}")
+        field = getattr(current, name)
+        offset, current, size = offset + field.offset, field_types[name], field.size
+        if index:
+            idx = int(index.rstrip("]"))
+            if not 0 <= idx < current._length_:
+                raise IndexError(f"{path}: index out of range")
+            current = current._type_
+            size = ctypes.sizeof(current)
+            offset += idx * size
+    return offset, offset + size
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort byte ranges and merge overlapping or adjacent ones"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
 def platform_mmap(name: str, size: int) -> mmap.mmap:
     """Platform memory mapping"""
     if PLATFORM == "Windows":
@@ -54,6 +111,31 @@ def linux_mmap(name: str, size: int) -> mmap.mmap:
     return mmap.mmap(file.fileno(), size)
 
 
+class SnapshotStats:
+    """Torn read statistics of snapshot copies"""
+
+    __slots__ = ("copies", "torn", "failed", "skipped")
+
+    def __init__(self) -> None:
+        self.copies = 0  # updates that copied data
+        self.torn = 0  # copies the game changed while copying, retried
+        self.failed = 0  # updates without a consistent copy after all retries
+        self.skipped = 0  # updates between a scoring and a telemetry update, not copied
+
+    def reset(self) -> None:
+        self.copies = self.torn = self.failed = self.skipped = 0
+
+    def to_dict(self) -> dict:
+        attempts = self.copies + self.torn
+        return {
+            "copies": self.copies,
+            "torn": self.torn,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "tornRate": self.torn / attempts if attempts else 0.0,
+        }
+
+
 class MMapControl:
     """Memory map control"""
 
@@ -63,8 +145,11 @@ class MMapControl:
         "_struct",
         "_buffer",
         "_realtime",
+        "_ranges",
+        "_views",
         "update",
         "data",
+        "stats",
     )
 
     def __init__(self, mmap_name: str, data_struct: ctypes.Structure) -> None:
@@ -79,24 +164,54 @@ class MMapControl:
         self._struct = data_struct
         self._buffer = bytearray()
         self._realtime = None
+        self._ranges = None
+        self._views = None
         self.update = None
         self.data = None
+        self.stats = SnapshotStats()
 
     def __del__(self):
         logger.info("sharedmemory: GC: MMap %s", self._mmap_name)
 
-    def create(self, access_mode: int = 0) -> None:
+    def register_fields(self, *paths: str) -> None:
+        """Add fields to copy in partial copy mode
+
+        Args:
+            paths: dotted field paths, ex. "scoring.scoringInfo", "telemetry.telemInfo[0]".
+        """
+        ranges = self.__partial_copy_ranges() + [field_range(self._struct, path) for path in paths]
+        self._ranges = merge_ranges(ranges)
+
+    def register_vehicle(self, index: int) -> None:
+        """Add scoring & telemetry of a vehicle slot to copy in partial copy mode"""
+        self.register_fields(f"scoring.vehScoringInfo[{index}]", f"telemetry.telemInfo[{index}]")
+
+    def copy_size(self) -> int:
+        """Number of bytes copied per partial copy update"""
+        return sum(end - start for start, end in self.__partial_copy_ranges())
+
+    def __partial_copy_ranges(self) -> List[Tuple[int, int]]:
+        """Registered byte ranges, base fields are only resolved once partial copy is used
+
+        Structs without the base fields, ex. SharedMemoryEvent, can still use the other access modes.
+        """
+        if self._ranges is None:
+            self._ranges = merge_ranges([field_range(self._struct, f) for f in PARTIAL_COPY_BASE_FIELDS])
+        return self._ranges
+
+    def create(self, access_mode: int = ACCESS_COPY) -> None:
         """Create mmap instance & initial accessible copy
 
         Args:
-            access_mode: 0 = copy access, 1 = direct access.
+            access_mode: 0 = copy access, 1 = direct access,
+                2 = partial copy access, only registered fields are copied on update.
         """
         self._mmap_buffer = platform_mmap(
             name=self._mmap_name,
             size=ctypes.sizeof(self._struct),
         )
 
-        if access_mode:
+        if access_mode == ACCESS_DIRECT:
             self.data = self._struct.from_buffer(self._mmap_buffer)
             self.update = self.__buffer_share
         else:
@@ -105,7 +220,12 @@ class MMapControl:
             self.data = self._struct.from_buffer(self._buffer)
             self.update = self.__buffer_copy
 
-        mode = "Direct" if access_mode else "Copy"
+        if access_mode == ACCESS_PARTIAL_COPY:
+            self.__partial_copy_ranges()
+            self._views = (memoryview(self._buffer), memoryview(self._mmap_buffer))
+            self.update = self.__buffer_partial_copy
+
+        mode = {ACCESS_DIRECT: "Direct", ACCESS_PARTIAL_COPY: "Partial Copy"}.get(access_mode, "Copy")
         logger.info("sharedmemory: ACTIVE: %s (%s Access)", self._mmap_name, mode)
 
     def close(self) -> None:
@@ -115,11 +235,17 @@ class MMapControl:
         """
         self.data = self._struct.from_buffer_copy(self._mmap_buffer)
         self._realtime = None
+        if self._views is not None:
+            for view in self._views:
+                view.release()
+            self._views = None
         try:
             self._mmap_buffer.close()
             logger.info("sharedmemory: CLOSED: %s", self._mmap_name)
         except BufferError:
             logger.error("sharedmemory: buffer error while closing %s", self._mmap_name)
+        if self.stats.torn:
+            logger.info("sharedmemory: snapshot stats %s: %s", self._mmap_name, self.stats.to_dict())
         self.update = None  # unassign update method (for proper garbage collection)
 
     def __buffer_share(self) -> None:
@@ -127,15 +253,59 @@ class MMapControl:
 
     def __buffer_copy(self) -> None:
         """Copy buffer access, helps avoid data desync"""
+        self.__snapshot(self.__copy_all)
+
+    def __buffer_partial_copy(self) -> None:
+        """Copy only the registered byte ranges, helps avoid data desync"""
+        self.__snapshot(self.__copy_ranges)
+
+    def __copy_all(self) -> None:
+        self._buffer[:] = self._mmap_buffer
+
+    def __copy_ranges(self) -> None:
+        buffer_view, mmap_view = self._views
+        for start, end in self._ranges:
+            buffer_view[start:end] = mmap_view[start:end]
+
+    def __version(self) -> tuple:
+        """Update counters written by the game, read directly from shared memory
+
+        The game has no sequence counter, scoring and player telemetry session times
+        change with every scoring and telemetry update instead.
+        """
+        realtime = self._realtime
+        telemetry = realtime.telemetry
+        scoring_info = realtime.scoring.scoringInfo
+        return (
+            scoring_info.mCurrentET,
+            scoring_info.mNumVehicles,
+            telemetry.activeVehicles,
+            telemetry.playerVehicleIdx,
+            telemetry.telemInfo[telemetry.playerVehicleIdx % MAX_VEHICLES].mElapsedTime,
+        )
+
+    def __snapshot(self, copy: Callable[[], None]) -> None:
+        """Seqlock style copy, retry if the update counters changed while copying
+
+        If all retries are torn, data keeps the last (possibly torn) copy.
+        """
         # Check if game updating data
-        if (
-            self._realtime.generic.events.SME_UPDATE_SCORING
-            or self._realtime.generic.events.SME_UPDATE_TELEMETRY
-        ) and (
-            self._realtime.scoring.scoringInfo.mNumVehicles
-            == self._realtime.telemetry.activeVehicles
-        ):
-            self._buffer[:] = self._mmap_buffer
+        events = self._realtime.generic.events
+        if not (events.SME_UPDATE_SCORING or events.SME_UPDATE_TELEMETRY):
+            return
+
+        for _ in range(SNAPSHOT_RETRIES):
+            version = self.__version()
+            # Scoring and telemetry of different updates, keep the previous copy until both updated
+            if version[1] != version[2]:
+                self.stats.skipped += 1
+                return
+            copy()
+            if self.__version() == version:
+                self.stats.copies += 1
+                return
+            self.stats.torn += 1
+        self.stats.failed += 1
 
 
 def test_api():
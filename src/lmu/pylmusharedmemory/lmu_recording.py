@@ -0,0 +1,207 @@
+"""
+LMU Shared Memory Recording
+
+Record LMU_Data snapshots to a compressed file and play them back into shared memory,
+so shared memory consumers can be profiled without the game, ex. on Linux via /dev/shm.
+
+File layout:
+    header      RECORDING_HEADER: magic, version, snapshot size
+    per frame   RECORDING_FRAME: time in seconds since the first frame, compressed size
+                zlib compressed XOR delta to the previous snapshot (first frame: to zeros)
+
+Usage:
+    python -m lmu.pylmusharedmemory.lmu_recording record FILE [--duration 60] [--rate 50]
+    python -m lmu.pylmusharedmemory.lmu_recording play FILE [--speed 1.0] [--loop]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import logging
+import struct
+import time
+import zlib
+from typing import BinaryIO, Iterator, Tuple
+
+try:
+    from . import lmu_data
+    from .lmu_data import LMUConstants
+    from .lmu_mmap import platform_mmap
+except ImportError:  # standalone, not package
+    import lmu_data
+    from lmu_data import LMUConstants
+    from lmu_mmap import platform_mmap
+
+RECORDING_MAGIC = b"LMUREC"
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct("<6sHI")
+RECORDING_FRAME = struct.Struct("<dI")
+# Fast compression, deltas are mostly zeros
+RECORDING_COMPRESSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def xor_delta(data: bytes, previous: bytes) -> bytes:
+    """Byte wise XOR of two equally sized snapshots, unchanged bytes become zeros"""
+    size = len(data)
+    return (int.from_bytes(data, "little") ^ int.from_bytes(previous, "little")).to_bytes(size, "little")
+
+
+class SharedMemoryRecorder:
+    """Write snapshots as compressed deltas"""
+
+    __slots__ = ("_file", "_size", "_previous", "_start_time", "frames")
+
+    def __init__(self, file: BinaryIO, size: int = ctypes.sizeof(lmu_data.LMUObjectOut)) -> None:
+        """Initialize recorder
+
+        Args:
+            file: binary file object opened for writing.
+            size: snapshot size in bytes.
+        """
+        self._file = file
+        self._size = size
+        self._previous = bytes(size)
+        self._start_time = None
+        self.frames = 0
+        file.write(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, size))
+
+    def add(self, snapshot: bytes, timestamp: float | None = None) -> bool:
+        """Append a snapshot, unchanged snapshots are skipped
+
+        Args:
+            snapshot: raw shared memory bytes.
+            timestamp: capture time in seconds, defaults to now.
+        """
+        if len(snapshot) != self._size:
+            raise ValueError(f"Snapshot size {len(snapshot)} does not match recording size {self._size}")
+        if self.frames and snapshot == self._previous:
+            return False
+
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self._start_time is None:
+            self._start_time = timestamp
+
+        delta = zlib.compress(xor_delta(snapshot, self._previous), RECORDING_COMPRESSION)
+        self._file.write(RECORDING_FRAME.pack(timestamp - self._start_time, len(delta)))
+        self._file.write(delta)
+        self._previous = bytes(snapshot)
+        self.frames += 1
+        return True
+
+
+def read_frames(file: BinaryIO) -> Iterator[Tuple[float, bytes]]:
+    """Decode a recording to (time in seconds, snapshot) per frame"""
+    magic, version, size = RECORDING_HEADER.unpack(file.read(RECORDING_HEADER.size))
+    if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+        raise ValueError("Unknown shared memory recording format")
+
+    snapshot = bytes(size)
+    while True:
+        frame_header = file.read(RECORDING_FRAME.size)
+        if len(frame_header) < RECORDING_FRAME.size:
+            return
+        timestamp, compressed_size = RECORDING_FRAME.unpack(frame_header)
+        snapshot = xor_delta(zlib.decompress(file.read(compressed_size)), snapshot)
+        yield timestamp, snapshot
+
+
+def record(
+    filename: str,
+    duration: float,
+    rate: float = 50.0,
+    name: str = LMUConstants.LMU_SHARED_MEMORY_FILE,
+) -> int:
+    """Record the shared memory for duration seconds
+
+    Returns:
+        Number of recorded frames.
+    """
+    size = ctypes.sizeof(lmu_data.LMUObjectOut)
+    shared_memory = platform_mmap(name, size)
+    interval = 1.0 / max(1.0, rate)
+    try:
+        with open(filename, "wb") as f:
+            recorder = SharedMemoryRecorder(f, size)
+            end_time = time.perf_counter() + duration
+            while time.perf_counter() < end_time:
+                recorder.add(shared_memory[:])
+                time.sleep(interval)
+    finally:
+        shared_memory.close()
+
+    logger.info("Recorded %s frames of %s to %s", recorder.frames, name, filename)
+    return recorder.frames
+
+
+def play(
+    filename: str,
+    speed: float = 1.0,
+    loop: bool = False,
+    name: str = LMUConstants.LMU_SHARED_MEMORY_FILE,
+) -> int:
+    """Write a recording back into the shared memory
+
+    Args:
+        filename: recording file.
+        speed: playback speed factor, 0 = as fast as possible.
+        loop: restart playback at the end of the recording until interrupted.
+        name: shared memory name to write to.
+
+    Returns:
+        Number of played frames.
+    """
+    shared_memory = platform_mmap(name, ctypes.sizeof(lmu_data.LMUObjectOut))
+    played = 0
+    try:
+        while True:
+            with open(filename, "rb") as f:
+                start_time = time.perf_counter()
+                for timestamp, snapshot in read_frames(f):
+                    if speed > 0:
+                        wait = timestamp / speed - (time.perf_counter() - start_time)
+                        if wait > 0:
+                            time.sleep(wait)
+                    shared_memory[: len(snapshot)] = snapshot
+                    played += 1
+            if not loop:
+                break
+    finally:
+        shared_memory.close()
+
+    logger.info("Played %s frames of %s into %s", played, filename, name)
+    return played
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Record or play back LMU shared memory.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record shared memory snapshots")
+    record_parser.add_argument("file")
+    record_parser.add_argument("--duration", type=float, default=60.0, help="Seconds to record")
+    record_parser.add_argument("--rate", type=float, default=50.0, help="Snapshots per second")
+
+    play_parser = subparsers.add_parser("play", help="Play a recording into shared memory")
+    play_parser.add_argument("file")
+    play_parser.add_argument("--speed", type=float, default=1.0, help="Playback speed, 0 = as fast as possible")
+    play_parser.add_argument("--loop", action="store_true", help="Repeat until interrupted")
+
+    for sub_parser in (record_parser, play_parser):
+        sub_parser.add_argument("--name", default=LMUConstants.LMU_SHARED_MEMORY_FILE, help="Shared memory name")
+
+    parsed = parser.parse_args(args)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        if parsed.command == "record":
+            record(parsed.file, parsed.duration, parsed.rate, parsed.name)
+        else:
+            play(parsed.file, parsed.speed, parsed.loop, parsed.name)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
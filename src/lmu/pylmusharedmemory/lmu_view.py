@@ -0,0 +1,161 @@
+"""
+LMU Struct Array Views
+
+Read one field of every element of a mapped array, ex. mLapDist of all vehicles,
+with a single precompiled struct unpack instead of ctypes attribute access per element.
+Formats are generated from the "_fields_" definitions in lmu_data.py.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import struct
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+try:
+    from . import lmu_data
+    from .lmu_mmap import field_range
+except ImportError:  # standalone, not package
+    import lmu_data
+    from lmu_mmap import field_range
+
+
+# Standard size struct codes of integer ctypes by size, unsigned and signed
+_INTEGER_CODES = {1: ("B", "b"), 2: ("H", "h"), 4: ("I", "i"), 8: ("Q", "q")}
+
+
+def struct_code(ctype: type) -> str:
+    """Standard size struct format code of a scalar ctypes type
+
+    Derived from the size of the type, not its "_type_" code: native codes like "L" differ
+    in size between platforms, ex. ctypes.c_ulonglong is "L" (8 bytes) on LP64 Linux
+    but "L" is 4 bytes in standard size mode.
+    """
+    if ctype in (ctypes.c_float, ctypes.c_double):
+        code = ctype._type_
+    elif ctype is ctypes.c_bool:
+        code = "?"
+    elif ctype is ctypes.c_char:
+        code = "c"
+    else:
+        code = _INTEGER_CODES[ctypes.sizeof(ctype)][ctype(-1).value < 0]
+
+    if struct.calcsize(f"={code}") != ctypes.sizeof(ctype):
+        raise TypeError(f"No standard size struct code for {ctype.__name__}")
+    return code
+
+
+@lru_cache(maxsize=None)
+def field_layout(data_struct: type) -> Dict[str, Tuple[int, str]]:
+    """Flattened scalar fields of a ctypes structure
+
+    Nested structures are flattened to dotted names, ex. "mPos.x", arrays to indexed
+    names, ex. "mWheels[0].mBrakeTemp". Character arrays are kept as a single bytes field.
+
+    Args:
+        data_struct: ctypes structure type, ex. lmu_data.LMUVehicleScoring.
+
+    Returns:
+        Dict of field name: (byte offset, struct format code).
+    """
+    layout = {}
+
+    def _add(name: str, ctype: type, offset: int) -> None:
+        if issubclass(ctype, ctypes.Structure):
+            for field_name, field_ctype, *_ in ctype._fields_:
+                field_offset = offset + getattr(ctype, field_name).offset
+                _add(f"{name}.{field_name}" if name else field_name, field_ctype, field_offset)
+        elif issubclass(ctype, ctypes.Array):
+            if ctype._type_ is ctypes.c_char:
+                layout[name] = (offset, f"{ctype._length_}s")
+                return
+            size = ctypes.sizeof(ctype._type_)
+            for idx in range(ctype._length_):
+                _add(f"{name}[{idx}]", ctype._type_, offset + idx * size)
+        else:
+            layout[name] = (offset, struct_code(ctype))
+
+    _add("", data_struct, 0)
+    return layout
+
+
+def field_type(data_struct: type, path: str) -> type:
+    """ctypes type of a (nested) structure field, path as in lmu_mmap.field_range"""
+    current = data_struct
+    for part in path.split("."):
+        name, _, index = part.partition("[")
+        current = dict((f[0], f[1]) for f in current._fields_)[name]
+        if index:
+            current = current._type_
+    return current
+
+
+class StructArrayView:
+    """Columnar reads from an array of structures inside a mapped buffer
+
+    The buffer can be anything exporting the buffer protocol: the mmap, the copy buffer
+    or a ctypes structure instance of data_struct, ex. MMapControl.data.
+    """
+
+    __slots__ = ("_offset", "_stride", "_length", "_layout", "_structs")
+
+    def __init__(self, array_path: str, data_struct: type = lmu_data.LMUObjectOut) -> None:
+        """Initialize view
+
+        Args:
+            array_path: dotted path of the array field, ex. "scoring.vehScoringInfo".
+            data_struct: ctypes structure type containing the array.
+        """
+        array_type = field_type(data_struct, array_path)
+        if not issubclass(array_type, ctypes.Array):
+            raise TypeError(f"{array_path} is not an array field")
+        self._offset = field_range(data_struct, array_path)[0]
+        self._stride = ctypes.sizeof(array_type._type_)
+        self._length = array_type._length_
+        self._layout = field_layout(array_type._type_)
+        self._structs = {}
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, buffer, field: str, count: int | None = None) -> tuple:
+        """Values of one field of the first count elements
+
+        Args:
+            buffer: mapped data, see class description.
+            field: flattened field name, ex. "mLapDist" or "mPos.x".
+            count: number of elements to read, defaults to all.
+        """
+        return self.columns(buffer, (field,), count)[field]
+
+    def columns(self, buffer, fields: Sequence[str], count: int | None = None) -> Dict[str, tuple]:
+        """Values of several fields of the first count elements, read in a single unpack
+
+        Returns:
+            Dict of field name: tuple of values, one per element.
+        """
+        count = self._length if count is None else max(0, min(count, self._length))
+        fields = tuple(fields)
+        compiled, ordered = self._compile(fields, count)
+        values = compiled.unpack_from(buffer, self._offset)
+        step = len(ordered)
+        return {field: values[idx::step] for idx, field in enumerate(ordered)}
+
+    def _compile(self, fields: Tuple[str, ...], count: int) -> Tuple[struct.Struct, Tuple[str, ...]]:
+        """Precompiled struct reading fields of count elements, cached per selection"""
+        key = (fields, count)
+        if key not in self._structs:
+            ordered = tuple(sorted(set(fields), key=lambda f: self._layout[f][0]))
+            element, position = [], 0
+            for field in ordered:
+                offset, code = self._layout[field]
+                if offset < position:
+                    raise ValueError(f"Field {field} overlaps a previous field")
+                element.append(f"{offset - position}x{code}" if offset > position else code)
+                position = offset + struct.calcsize(f"={code}")
+            # Skip to the same position in the next element
+            padding = f"{self._stride - position}x" if self._stride > position else ""
+            fmt = (("".join(element) + padding) * count).removesuffix(padding)
+            self._structs[key] = struct.Struct(f"={fmt}"), ordered
+        return self._structs[key]
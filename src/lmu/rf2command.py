@@ -1,6 +1,6 @@
 import logging
 import time
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import gevent
 
@@ -29,7 +29,12 @@ class CommandUrls:
 
 
 class Command:
-    """A command to be held in the CommandQueue and to be send to rF2 if it is in the desired state"""
+    """A command to be held in the CommandQueue and to be send to rF2 if it is in the desired state
+
+    :param after: commands that have to be done before this command starts. Defaults to the
+                  previously appended command, pass an empty tuple for a command without prerequisites.
+    :param state: RfactorState rF2 needs to be in before this command starts
+    """
 
     wait_for_state = 0
     play_replay = 1
@@ -77,28 +82,62 @@ class Command:
 
     default_timeout = 480.0  # Seconds
 
-    def __init__(self, command: int, data: Any = None, timeout: float = None):
+    def __init__(
+        self,
+        command: int,
+        data: Any = None,
+        timeout: float = None,
+        after: Optional[Sequence["Command"]] = None,
+        state: Optional[int] = None,
+    ):
         self.command = command
         self.data = data
         self.timeout = timeout or self.default_timeout
+        self.after = None if after is None else tuple(after)
+        self.state = state
 
         self.finished = False
         self.reset_queue = False
         self.created = time.time()
 
+        # -- Timing
+        self.appended = self.created
+        self.activated: Optional[float] = None
+        self.done_time: Optional[float] = None
+        self.greenlet: Optional[gevent.Greenlet] = None
+
         self.method = getattr(self, f"{self.names.get(command)}_method")
 
+    @property
+    def name(self) -> str:
+        return self.names.get(self.command, str(self.command))
+
     def execute(self):
         if callable(self.method):
-            self.method()
+            try:
+                self.method()
+            except Exception as e:
+                logging.exception("Error executing command %s: %s", self.name, e)
         else:
-            logging.error(
-                "Could not find method to execute for command: %s %s", self.command, self.names.get(self.command)
-            )
+            logging.error("Could not find method to execute for command: %s %s", self.command, self.name)
+
+    @property
+    def is_executing(self) -> bool:
+        return self.greenlet is not None and not self.greenlet.dead
 
     def activate(self):
-        self.created = time.time()
-        logging.debug("rFactor command activated: %s, Timeout: %s", Command.names.get(self.command), self.timeout)
+        self.created = self.activated = time.time()
+        logging.debug("rFactor command activated: %s, Timeout: %s", self.name, self.timeout)
+
+    def timing(self) -> dict:
+        """Seconds waited for prerequisites and seconds from activation until done"""
+        activated = self.activated or self.done_time or time.time()
+        return {
+            "name": self.name,
+            "waited": activated - self.appended,
+            "duration": (self.done_time or time.time()) - activated,
+            "finished": self.finished,
+        }
 
     @property
     def timed_out(self) -> bool:
@@ -227,6 +266,8 @@ class Command:
             return
         current_settings = r.json()
 
+        # -- Steps of one setting are sent in order, different settings are updated in parallel
+        key_greenlets = list()
         for key, target_value in self.data.items():
             current_value = current_settings.get(key, dict()).get("currentValue")
 
@@ -238,31 +279,38 @@ class Command:
                 logging.info("Skipping session setting %s that already has desired value %s", key, target_value)
                 continue
 
-            high = int(max(target_value, current_value))
-            low = int(min(target_value, current_value))
-            direction = 1 if (target_value - current_value) > 0 else 0
-            num_sends = high - low
-
-            while (num_sends := num_sends - 1) >= 0:
-                retries, result = 3, None
-                while (retries := retries - 1) >= 0:
-                    logging.debug("Updating setting %s in direction %s", key, direction)
-                    s = RfactorConnect.post_request(
-                        "/rest/sessions/settings", json={"sessionSetting": key, "value": direction}
-                    )
-                    if self._check_request(s):
-                        result = s.json()
-                        break
-                    else:
-                        logging.info("Re-trying failed set session settings request #%s", retries)
-                        gevent.sleep(0.1)
-
-                if result and str(result.get("currentValue")) == str(target_value):
-                    break
+            key_greenlets.append(gevent.spawn(self._step_session_setting, key, current_value, target_value))
 
+        gevent.joinall(key_greenlets)
         AppAudioFx.play_audio(AppAudioFx.switch)
         self.finished = True
 
+    def _step_session_setting(self, key: str, current_value, target_value):
+        """Send step requests moving a setting by one until the setting reports the target value
+
+        A step does not always move the value by exactly one, so every step result is checked.
+        """
+        high = int(max(target_value, current_value))
+        low = int(min(target_value, current_value))
+        direction = 1 if (target_value - current_value) > 0 else 0
+        num_sends = high - low
+        step = ("POST", "/rest/sessions/settings", {"sessionSetting": key, "value": direction})
+
+        while (num_sends := num_sends - 1) >= 0:
+            retries, result = 3, None
+            while (retries := retries - 1) >= 0:
+                logging.debug("Updating setting %s in direction %s", key, direction)
+                s = RfactorConnect.request_many((step,))[0]
+                if self._check_request(s):
+                    result = s.json()
+                    break
+                else:
+                    logging.info("Re-trying failed set session settings request #%s", retries)
+                    gevent.sleep(0.1)
+
+            if result and str(result.get("currentValue")) == str(target_value):
+                break
+
     def start_race_method(self):
         logging.debug("Executing command start race")
         RfactorStatusEvent.set("Starting Race Session")
@@ -394,66 +442,97 @@ class Command:
 
 
 class CommandQueue:
-    """Queue commands to send to rF2"""
+    """Queue commands to send to rF2
+
+    Commands form a dependency graph: a command starts once all commands it runs after are done
+    and rF2 is in the command's state. Started commands are executed in their own greenlets, so
+    commands without dependencies between each other run concurrently. Unfinished commands are
+    executed again every run until they finished or timed out.
+    """
 
     queue: List[Command] = list()
     current_command: Optional[Command] = None
+    # -- Timing of the recently done commands
+    timings: List[Dict[str, Any]] = list()
+    max_timings = 50
 
     # Seconds after last executed command to switch into idle timeouts
     idle_timeout = 30.0
     last_command_time = 0.0
 
     @classmethod
-    def append(cls, command: Command):
+    def append(cls, command: Command) -> Command:
+        if command.after is None:
+            # -- Run after the previously appended command
+            command.after = (cls.queue[-1],) if cls.queue else tuple()
         cls.queue.append(command)
+        RfactorConnect.wake()
+        return command
 
     @classmethod
     def reset(cls):
         logging.debug("Resetting rF2 Web Ui Command Queue")
+        # -- Stop commands still executing, they must not act on rF2 after the reset
+        current = gevent.getcurrent()
+        gevent.killall([c.greenlet for c in cls.queue if c.is_executing and c.greenlet is not current], block=False)
         cls.queue = list()
+        cls.current_command = None
 
     @classmethod
     def is_empty(cls):
         return len(cls.queue) == 0
 
     @classmethod
-    def _get_next(cls) -> Optional[Command]:
-        cls.current_command = None
-
-        if not cls.is_empty():
-            cmd = cls.queue.pop(0)
-            cmd.activate()
-            cls.current_command = cmd
-            return cmd
+    def _done(cls, command: Command):
+        command.done_time = time.time()
+        timing = command.timing()
+        logging.debug(
+            "rFactor command %s %s after waiting %.2fs, active %.2fs",
+            timing["name"], "finished" if command.finished else "timed out", timing["waited"], timing["duration"],
+        )
+        cls.timings = (cls.timings + [timing])[-cls.max_timings:]
 
     @classmethod
-    def next(cls) -> Optional[Command]:
-        if cls.current_command:
-            # -- Check if we should reset the queue
-            if cls.current_command.reset_queue:
+    def _collect_done(cls) -> bool:
+        """Remove finished and timed out commands, returns False if the queue was reset"""
+        for command in list(cls.queue):
+            if command.activated is None:
+                continue
+            if command.is_executing:
+                if not command.timed_out:
+                    continue
+                # -- Hung command, stop its greenlet so it can not stall the commands after it
+                command.greenlet.kill(block=False)
+                command.finished = False
+                cls.queue.remove(command)
+                cls._done(command)
+                continue
+            if command.reset_queue:
+                cls._done(command)
                 cls.reset()
-                return cls._get_next()
+                return False
+            if command.finished or command.timed_out:
+                cls.queue.remove(command)
+                cls._done(command)
 
-            # -- Check current Command for timeout
-            if cls.current_command.timed_out:
-                return cls._get_next()
-
-            # -- Move to next command in queue if the current command was finished
-            if cls.current_command.finished:
-                return cls._get_next()
-            else:
-                return cls.current_command
+        if not cls.queue:
+            cls.current_command = None
+        return True
 
-        return cls._get_next()
+    @classmethod
+    def ready(cls) -> List[Command]:
+        """Commands whose prerequisite commands are done"""
+        pending = set(id(c) for c in cls.queue)
+        return [c for c in cls.queue if not any(id(after) in pending for after in c.after or ())]
 
     @classmethod
     def run(cls):
         # ---------------------------
         # -- COMMAND QUEUE
         # ---------------------------
-        command = cls.next()
+        cls._collect_done()
 
-        if not command and (time.time() - cls.last_command_time) > cls.idle_timeout:
+        if cls.is_empty() and (time.time() - cls.last_command_time) > cls.idle_timeout:
             # -- Reset rF2 FrontEnd status message
             if not RfactorStatusEvent.empty:
                 RfactorStatusEvent.set("")
@@ -471,7 +550,15 @@ class CommandQueue:
         # -- Require to track loading state when checking connection
         RfactorConnect.check_connection()
 
-        # -- Execute command
-        if command:
-            command.execute()
+        # -- Execute ready commands, each in its own greenlet
+        for command in cls.ready():
+            if command.is_executing:
+                continue
+            # -- Timeout counts from here, also while waiting for the command state
+            if command.activated is None:
+                command.activate()
+            if command.state is not None and command.state != RfactorConnect.state:
+                continue
+            cls.current_command = command
+            command.greenlet = gevent.spawn(command.execute)
             cls.last_command_time = time.time()
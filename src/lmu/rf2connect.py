@@ -1,17 +1,19 @@
 import logging
 import time
+from itertools import count
 from queue import Queue, Empty
-from threading import Event, Thread
-from typing import Optional, Union
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import gevent
-import psutil
+import gevent.event
 
 from lmu.directInputKeySend import PressReleaseKey
 from lmu.globals import GAME_EXECUTABLE
 from lmu.http_client import HTTPSession, HTTPResponse
 from lmu.sim_info_api import SimInfoAPI
 from lmu.lmu_game import RfactorPlayer
+from lmu.process_watch import ProcessWatch
 from lmu.utils import rfactor_process_with_id_exists
 
 CONNECTION_DEBUG = False
@@ -54,16 +56,21 @@ class RfactorState:
 
 
 class _RfactorConnectRequestThread:
-    # -- Threaded requests
+    # -- Threaded requests, served by num_threads threads in parallel
+    num_threads = 4
     request_queue = Queue()
-    response_queue = Queue()
+    # -- Responses by request id, failed requests store False
+    responses: Dict[int, Union[HTTPResponse, bool]] = dict()
+    # -- Ids of requests nobody waits for anymore
+    abandoned: Set[int] = set()
+    # -- Guards storing responses against abandoning requests
+    response_lock = Lock()
     close_event = Event()
-    request_thread: Optional[Thread] = None
+    request_threads: List[Thread] = list()
+    _request_ids = count(1)
 
     @staticmethod
-    def _request_thread_loop(
-        request_queue: Queue, response_queue: Queue, close_event: Event
-    ):
+    def _request_thread_loop(request_queue: Queue, responses: dict, close_event: Event):
         logging.debug("RfactorConnect request thread started.")
 
         while not close_event.is_set():
@@ -74,78 +81,86 @@ class _RfactorConnectRequestThread:
                 continue
 
             # -- Fulfill request
-            if r.get("method") == "GET":
-                try:
-                    response = RfactorConnect.get_request(r.get("url"))
-                except WindowsError:
-                    continue
-                except Exception as e:
-                    logging.error("Error during GET request: %s", e)
-                    continue
+            request_method = {
+                "GET": RfactorConnect.get_request,
+                "POST": RfactorConnect.post_request,
+                "PUT": RfactorConnect.put_request,
+            }.get(r.get("method"))
 
-                response_json = False
-                if response:
-                    if response.status_code in (200, 201, 202, 203, 204):
-                        response_json = response.json()
-                        response_json["status_code"] = response.status_code
-                    else:
-                        logging.debug(
-                            "Request Thread received error response for GET request to %s %s %s",
-                            r.get("url"),
-                            response.status_code,
-                            response.text,
-                        )
-                        response_json = {"status_code": response.status_code}
-
-                response_queue.put(response_json)
-            elif r.get("method") == "POST":
-                try:
-                    response = RfactorConnect.post_request(r.get("url"), r.get("data"))
-                except Exception as e:
-                    logging.error("Error during POST request: %s", e)
+            response = None
+            try:
+                if r.get("method") == "GET":
+                    response = request_method(r.get("url"))
+                elif request_method is not None:
+                    response = request_method(r.get("url"), json=r.get("json"))
+            except Exception as e:
+                logging.error("Error during %s request: %s", r.get("method"), e)
+
+            if response is not None and response.status_code not in (200, 201, 202, 203, 204):
+                logging.debug(
+                    "Request Thread received error response for %s request to %s %s %s",
+                    r.get("method"),
+                    r.get("url"),
+                    response.status_code,
+                    response.text,
+                )
+            with _RfactorConnectRequestThread.response_lock:
+                if r["id"] in _RfactorConnectRequestThread.abandoned:
+                    _RfactorConnectRequestThread.abandoned.discard(r["id"])
                     continue
-
-                if response.status_code not in (200, 201, 202, 203, 204):
-                    logging.debug(
-                        "Request Thread received error response for POST request to %s %s %s",
-                        r.get("url"),
-                        response.status_code,
-                        response.text,
-                    )
-                response_queue.put(
-                    response or False
-                )  # Make sure we do not put None in the queue
+                # -- Make sure we do not store None, it marks pending requests
+                responses[r["id"]] = response or False
 
         logging.debug("RfactorConnect request thread exiting.")
 
     @classmethod
-    def check_response(cls) -> Optional[dict]:
-        response = None
-        # Make sure to collect all responses
-        while cls.response_queue.qsize() > 0:
-            try:
-                response = cls.response_queue.get_nowait()
-            except Empty:
-                break
-        return response
+    def submit(cls, method: str, url: str, json: Optional[dict] = None) -> int:
+        """Queue a request for the request threads, returns the request id to collect the response"""
+        request_id = next(cls._request_ids)
+        cls.request_queue.put({"id": request_id, "method": method, "url": url, "json": json})
+        return request_id
+
+    @classmethod
+    def pop_response(cls, request_id: int) -> Union[HTTPResponse, bool, None]:
+        """Response of the request, None while the request is pending"""
+        return cls.responses.pop(request_id, None)
+
+    @classmethod
+    def abandon(cls, request_ids: Sequence[int]) -> None:
+        """Drop responses of requests nobody waits for anymore"""
+        with cls.response_lock:
+            for request_id in request_ids:
+                if cls.responses.pop(request_id, None) is None:
+                    cls.abandoned.add(request_id)
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return any(t.is_alive() for t in cls.request_threads)
 
     @classmethod
     def start_request_thread(cls):
-        cls.request_thread = Thread(
-            target=cls._request_thread_loop,
-            args=(cls.request_queue, cls.response_queue, cls.close_event),
-        )
-        cls.request_thread.start()
+        cls.close_event.clear()
+        cls.request_threads = [
+            Thread(
+                target=cls._request_thread_loop,
+                args=(cls.request_queue, cls.responses, cls.close_event),
+                daemon=True,
+            )
+            for _ in range(cls.num_threads)
+        ]
+        for request_thread in cls.request_threads:
+            request_thread.start()
 
     @classmethod
     def stop_request_thread(cls) -> None:
-        logging.debug("Stopping RfactorConnect request thread.")
+        logging.debug("Stopping RfactorConnect request threads.")
         cls.close_event.set()
-        if cls.request_thread is not None:
-            if cls.request_thread.is_alive():
+        for request_thread in cls.request_threads:
+            if request_thread.is_alive():
                 logging.debug("Joining RfactorConnect request thread.")
-                cls.request_thread.join(timeout=5.0)
+                request_thread.join(timeout=5.0)
                 logging.debug("RfactorConnect request thread joined.")
+        cls.request_threads = list()
 
 
 class RfactorConnect:
@@ -165,6 +180,14 @@ class RfactorConnect:
     idle_timeout = 15.0  # Start with this time out after an active connection
     active_timeout = 1.0  # Check connection timeout while eg. loading
 
+    # -- rFactor greenlet loop interval, backs off while the game is absent and nothing is queued
+    busy_loop_interval = active_timeout * 0.25
+    max_loop_interval = 5.0
+    loop_backoff = 1.5
+    loop_interval = busy_loop_interval
+    # -- Set to wake the rFactor greenlet immediately, may be set from other threads
+    wake_event = gevent.event.Event()
+
     last_connection_check = time.time()
     connection_check_interval = (
         idle_timeout  # Revalidate connection every float seconds
@@ -185,6 +208,15 @@ class RfactorConnect:
 
     # -- HTTP Session for persistent connections (connection pooling)
     _session: Optional[HTTPSession] = None
+    _session_lock = Lock()
+    # -- Seconds to cache responses of Web UI GET endpoints polled repeatedly by commands
+    web_ui_cache_ttl = {"/rest/watch/standings": 0.5, "/rest/sessions": 0.5, "/rest/watch/replays": 5.0}
+    # -- Writes changing the game state beyond their own resource drop all cached responses
+    web_ui_cache_invalidate_all = ("/navigation/", "/rest/race/", "/rest/garage/")
+    # -- Pending navigation state request id
+    _nav_state_request: Optional[int] = None
+    # -- Interval in which request_many checks for finished requests
+    request_poll_interval = 0.01
 
     @staticmethod
     def start_request_thread():
@@ -197,13 +229,16 @@ class RfactorConnect:
     @classmethod
     def _get_session(cls) -> HTTPSession:
         """Get or create a persistent HTTPSession for connection pooling."""
-        if cls._session is None or cls._session.port != cls.web_ui_port:
-            if cls._session:
-                cls._session.close()
-            cls._session = HTTPSession(
-                cls.host, cls.web_ui_port, timeout=cls.get_request_time
-            )
-        return cls._session
+        with cls._session_lock:
+            if cls._session is None or cls._session.port != cls.web_ui_port:
+                if cls._session:
+                    cls._session.close()
+                cls._session = HTTPSession(
+                    cls.host, cls.web_ui_port, timeout=cls.get_request_time,
+                    pool_size=_RfactorConnectRequestThread.num_threads,
+                    cache_ttl=cls.web_ui_cache_ttl, invalidate_all=cls.web_ui_cache_invalidate_all,
+                )
+            return cls._session
 
     @classmethod
     def close_session(cls) -> None:
@@ -223,23 +258,12 @@ class RfactorConnect:
 
     @classmethod
     def get_pid(cls) -> int:
-        shared_mem_last_known_pid = cls.shared_memory_obj.get_last_known_pid()
-        if shared_mem_last_known_pid is not None:
-            try:
-                p = psutil.Process(shared_mem_last_known_pid)
-                if p.name().lower() == GAME_EXECUTABLE.lower():
-                    cls.set_pid(shared_mem_last_known_pid)
-                    return shared_mem_last_known_pid
-            except psutil.NoSuchProcess:
-                pass
-
-        for proc in psutil.process_iter(["pid", "name"]):
-            if proc.info["name"].lower().startswith(GAME_EXECUTABLE.lower()):
-                cls.set_pid(proc.info.get("pid"))
-                logging.info(
-                    "process_iter found Game Executable Process ID: %s", cls.rf2_pid
-                )
-                return cls.rf2_pid
+        pid = ProcessWatch.find_pid(GAME_EXECUTABLE)
+        if pid is not None:
+            if pid != cls.rf2_pid:
+                logging.info("Process watch found Game Executable Process ID: %s", pid)
+            cls.set_pid(pid)
+            return pid
         logging.debug("Could not find Game Executable with Process ID: %s", cls.rf2_pid)
         return -1
 
@@ -268,11 +292,14 @@ class RfactorConnect:
         or use shared memory if reported to be available.
         """
         # - Check request -queue- for responses (this does not trigger a request)
-        response = _RfactorConnectRequestThread.check_response()
-        if response is not None:
-            logging.info(f"Updating rf2 state from response: {response}")
-            cls.set_state(response)
-            return
+        if cls._nav_state_request is not None:
+            response = _RfactorConnectRequestThread.pop_response(cls._nav_state_request)
+            if response is not None:
+                cls._nav_state_request = None
+                nav_state = cls.navigation_state(response)
+                logging.info(f"Updating rf2 state from response: {nav_state}")
+                cls.set_state(nav_state)
+                return
 
         # - Only check every connection_check_interval
         timeout = min(cls.long_timeout, cls.connection_check_interval)
@@ -306,15 +333,66 @@ class RfactorConnect:
             return
 
         # -- Check navigation state in the http request thread
-        if _RfactorConnectRequestThread.request_queue.empty() and cls.rest_api_enabled:
+        if cls._nav_state_request is None and cls.rest_api_enabled:
             logging.debug(
                 'Checking for rFactor 2 http connection. State: %s Interval: %.2f',
                 RfactorState.names.get(RfactorConnect.state), timeout
             )
             cls.last_connection_check = time.time()  # Update TimeOut
-            _RfactorConnectRequestThread.request_queue.put(
-                {"method": "GET", "url": "/navigation/state"}
-            )
+            cls._nav_state_request = _RfactorConnectRequestThread.submit("GET", "/navigation/state")
+
+    @staticmethod
+    def navigation_state(response: Union[HTTPResponse, bool]) -> Union[dict, bool]:
+        """Navigation state dict with the response status_code, False if the request failed"""
+        if not response:
+            return False
+        if response.status_code not in (200, 201, 202, 203, 204):
+            return {"status_code": response.status_code}
+        try:
+            nav_state = response.json()
+        except ValueError:
+            nav_state = dict()
+        if not isinstance(nav_state, dict):
+            nav_state = dict()
+        nav_state["status_code"] = response.status_code
+        return nav_state
+
+    @classmethod
+    def request_many(
+        cls, requests: Sequence[Tuple[str, str, Optional[dict]]], timeout: float = 30.0
+    ) -> List[Optional[HTTPResponse]]:
+        """Send requests in parallel in the request threads and wait for all responses
+
+        Waiting yields to other greenlets. Without running request threads the requests
+        are sent one after another.
+
+        :param requests: (method, url, json) per request
+        :param timeout: seconds to wait for all responses
+        :return: responses in the order of requests, None for failed or timed out requests
+        """
+        if not _RfactorConnectRequestThread.is_running():
+            methods = {"GET": cls.get_request, "POST": cls.post_request, "PUT": cls.put_request}
+            return [
+                methods[m](url) if m == "GET" else methods[m](url, json=json) for m, url, json in requests
+            ]
+
+        request_ids = [_RfactorConnectRequestThread.submit(m, url, json) for m, url, json in requests]
+        responses = dict()
+        start_time = time.time()
+        while len(responses) < len(request_ids) and time.time() - start_time < timeout:
+            for request_id in request_ids:
+                if request_id not in responses:
+                    response = _RfactorConnectRequestThread.pop_response(request_id)
+                    if response is not None:
+                        responses[request_id] = response
+            if len(responses) < len(request_ids):
+                gevent.sleep(cls.request_poll_interval)
+
+        pending = [request_id for request_id in request_ids if request_id not in responses]
+        if pending:
+            logging.error("Timed out waiting for %s of %s requests", len(pending), len(requests))
+            _RfactorConnectRequestThread.abandon(pending)
+        return [responses.get(request_id) or None for request_id in request_ids]
 
     @classmethod
     def set_state(cls, nav_state: Union[bool, dict]) -> None:
@@ -376,6 +454,8 @@ class RfactorConnect:
             return False
 
         r = cls.get_request(f"/rest/watch/play/{replay_id}")
+        # -- Starting a replay is a GET request but changes standings and sessions
+        cls._get_session().invalidate()
         status = r.status_code if r is not None else None
         if status not in (200, 204):
             logging.debug(f"Request to play Replay #{replay_id} failed.")
@@ -447,6 +527,29 @@ class RfactorConnect:
 
         return True if r and r.status_code in (200, 201, 202, 203, 204) else False
 
+    @classmethod
+    def next_loop_interval(cls, busy: bool) -> float:
+        """Seconds the rFactor greenlet may sleep, grows exponentially while not busy"""
+        if busy:
+            cls.loop_interval = cls.busy_loop_interval
+        else:
+            cls.loop_interval = min(cls.max_loop_interval, cls.loop_interval * cls.loop_backoff)
+        return cls.loop_interval
+
+    @classmethod
+    def wake(cls):
+        """Run the rFactor greenlet loop now and return to the busy loop interval"""
+        cls.loop_interval = cls.busy_loop_interval
+        cls.wake_event.set()
+
+    @classmethod
+    def game_process_changed(cls, running: bool):
+        """ProcessWatch listener, check the connection right away when the game starts or exits"""
+        logging.debug("Game Executable %s.", "started" if running else "exited")
+        cls.last_connection_check = 0.0
+        cls.set_to_active_timeout()
+        cls.wake()
+
     @classmethod
     def set_to_active_timeout(cls):
         """Track state changes more frequently"""
@@ -60,6 +60,7 @@ class RfactorQuitEvent(RfactorBaseEvent):
     def set(cls, value):
         cls.result.set(value)
         cls.event.set()
+        RfactorConnect.wake()
         # -- Reset async result
         cls.quit_result = gevent.event.AsyncResult()
 
@@ -141,6 +142,7 @@ class ReplayPlayEvent(RfactorBaseEvent):
     def set(cls, value):
         cls.result.set(value)
         cls.event.set()
+        RfactorConnect.wake()
 
 
 class StartBenchmarkEvent(RfactorBaseEvent):
@@ -151,6 +153,7 @@ class StartBenchmarkEvent(RfactorBaseEvent):
     def set(cls, value):
         cls.result.set(value)
         cls.event.set()
+        RfactorConnect.wake()
 
 
 class RecordBenchmarkEvent(RfactorBaseEvent):
@@ -161,6 +164,7 @@ class RecordBenchmarkEvent(RfactorBaseEvent):
     def set(cls, value):
         cls.result.set(value)
         cls.event.set()
+        RfactorConnect.wake()
 
 
 class BenchmarkProgressEvent(RfactorBaseEvent):
@@ -181,6 +185,7 @@ class EnableMetricsEvent(RfactorBaseEvent):
     def set(cls, value):
         cls.result.set(value)
         cls.event.set()
+        RfactorConnect.wake()
 
 
 class HardwareStatusEvent(RfactorBaseEvent):
@@ -223,3 +228,4 @@ class EnableRestAPIEvent(RfactorBaseEvent):
     def set(cls, value):
         cls.result.set(value)
         cls.event.set()
+        RfactorConnect.wake()
@@ -185,6 +185,28 @@ benchmark_settings = {
         "value": False,
         "settings": ({"value": True, "name": "On"}, {"value": False, "name": "Off"}),
     },
+    "use_present_mon_api": {
+        "name": "Record via PresentMon API",
+        "value": False,
+        "desc": "Record the live PresentMon API metrics instead of starting the PresentMon process. "
+        "Samples are averages over one second windows instead of single frames.",
+        "settings": ({"value": True, "name": "On"}, {"value": False, "name": "Off"}),
+    },
+    "telemetry_rate": {
+        "key": "TelemetryRate",
+        "name": "Telemetry Sample Rate",
+        "value": 20,
+        "settings": (
+            {
+                "settingType": "range",
+                "min": 0,
+                "max": 100,
+                "step": 1,
+                "desc": "Player telemetry samples per second recorded alongside the frame times. "
+                "0 records no telemetry.",
+            },
+        ),
+    },
 }
 
 # Settings set via WebUI
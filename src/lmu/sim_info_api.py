@@ -8,9 +8,8 @@ import ctypes
 import logging
 from typing import Optional
 
-import psutil
-
 from lmu.globals import GAME_EXECUTABLE
+from lmu.process_watch import ProcessWatch
 from lmu.pylmusharedmemory.lmu_data import LMUConstants
 
 
@@ -52,35 +51,16 @@ class SimInfoAPI:
     @classmethod
     def is_game_running(cls):
         """
-        Check if the game is currently running by enumerating processes.
+        Check if the game is currently running.
 
-        First checks the last known PID (fast), then falls back to full
-        process enumeration (expensive) only if needed.
+        Looks up the game executable in the ProcessWatch index, processes
+        are enumerated in the ProcessWatch background thread, not here.
 
         Returns:
             bool: True if the game process is found, False otherwise.
         """
-        # Fast path: check if last known PID is still valid
-        if cls._last_known_pid is not None:
-            try:
-                p = psutil.Process(cls._last_known_pid)
-                if p.name().lower() == GAME_EXECUTABLE.lower():
-                    return True
-            except psutil.NoSuchProcess:
-                cls._last_known_pid = None
-
-        # Slow path: enumerate all processes
-        for pid in psutil.pids():
-            try:
-                p = psutil.Process(pid)
-                if p.name().lower() == GAME_EXECUTABLE.lower():
-                    cls._last_known_pid = pid
-                    return True
-            except psutil.NoSuchProcess:
-                continue
-
-        cls._last_known_pid = None
-        return False
+        cls._last_known_pid = ProcessWatch.find_pid(GAME_EXECUTABLE, exact=True)
+        return cls._last_known_pid is not None
 
     ###########################################################
     # Access functions
@@ -99,8 +79,7 @@ class SimInfoAPI:
         is_lmu_running()
           ├─ Shared Memory Check (Windows API, ~0ms)
           └─ is_game_running()
-              ├─ Last Known PID Check (fast, ~1ms)
-              └─ Full Process Enumeration (slow, ~50-100ms)
+              └─ ProcessWatch index lookup & PID liveness check (fast, ~1ms)
 
         Returns:
             bool: True if LMU is running, False otherwise.
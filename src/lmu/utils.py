@@ -14,9 +14,9 @@ import ctypes
 
 import eel
 import gevent
-import psutil
 
 from .globals import get_settings_dir, FROZEN, GAME_EXECUTABLE
+from .process_watch import ProcessWatch
 
 try:
     import winreg as registry
@@ -59,6 +59,7 @@ def get_registry_values_as_dict(key: "registry.HKEYType") -> dict[str, dict[str,
 
 
 class JsonRepr:
+    __slots__ = ()
     skip_keys = list()
     export_skip_keys = list()
     after_load_callback: Optional[callable] = None
@@ -387,16 +388,7 @@ def convert_unit(size_in_bytes, unit):
 
 
 def rfactor_process_with_id_exists(pid: Optional[int]) -> bool:
-    if not pid or pid < 0:
-        return False
-
-    try:
-        p = psutil.Process(pid)
-        if p.name().lower().startswith(GAME_EXECUTABLE.lower()):
-            return True
-    except psutil.NoSuchProcess:
-        pass
-    return False
+    return ProcessWatch.is_pid_running(pid, GAME_EXECUTABLE)
 
 
 def get_widest(str_list, space=3):
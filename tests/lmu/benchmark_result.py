@@ -0,0 +1,291 @@
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from array import array
+from pathlib import Path
+
+import eel
+import gevent
+import pytest
+
+from lmu.app import app_benchmark_fn
+from lmu.app_settings import AppSettings
+from lmu.benchmark.compare import compare_results, format_report
+from lmu.benchmark.downsample import downsample_columns
+from lmu.benchmark.frametime_stats import frametime_statistics, fps_from_frametimes, STUTTER_FACTOR
+from lmu.benchmark.result import create_present_mon_sidecar, read_present_mon_columns, read_results
+from lmu.benchmark.result_cache import BenchmarkResultCache
+from lmu.benchmark.result_pool import BenchmarkResultPool
+from lmu.benchmark.result_sidecar import read_result_sidecar
+from lmu.benchmark.telemetry import TELEMETRY_LAP_CAPACITY, TelemetrySampler, get_telemetry_file, read_telemetry_file
+from lmu.preset.preset import GraphicsPreset
+from lmu.pylmusharedmemory.lmu_data import LMUConstants, LMUObjectOut
+from lmu.pylmusharedmemory.lmu_mmap import ACCESS_DIRECT, PLATFORM, MMapControl
+from lmu.utils import percentile
+
+
+def _create_frametimes(num_frames: int = 40000, seed: int = 287) -> list:
+    rnd = random.Random(seed)
+    frametimes = [rnd.uniform(2.8, 4.2) for _ in range(num_frames)]
+    # -- Add a few spikes
+    for idx in range(0, num_frames, 997):
+        frametimes[idx] = rnd.uniform(20.0, 80.0)
+    return frametimes
+
+
+def test_frametime_statistics_match_previous_results():
+    frametimes = _create_frametimes()
+    fps = fps_from_frametimes(frametimes).tolist()
+    sorted_fps = sorted(fps)
+
+    stats = frametime_statistics(fps, frametimes)
+
+    assert stats["fps99"] == percentile(sorted_fps, 99)
+    assert stats["fps98"] == percentile(sorted_fps, 98)
+    assert stats["fps002"] == percentile(sorted_fps, 0.2)
+    assert abs(stats["fpsmean"] - statistics.mean(sorted_fps)) < 1e-9
+    assert stats["fpsmedian"] == statistics.median(sorted_fps)
+
+
+def test_frametime_statistics_stutter_and_histogram():
+    frametimes = _create_frametimes()
+    stats = frametime_statistics(fps_from_frametimes(frametimes), frametimes)
+
+    threshold = statistics.median(frametimes) * STUTTER_FACTOR
+    assert stats["stutter"] == len([ft for ft in frametimes if ft > threshold])
+    assert sum(stats["frametimeHistogram"]["counts"]) == len(frametimes)
+
+
+def test_frametime_statistics_empty_capture():
+    stats = frametime_statistics([])
+    assert stats["fpsmean"] == 0.0
+    assert stats["stutter"] == 0
+
+
+@pytest.fixture
+def result_cache_file(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.setattr(BenchmarkResultCache, "_get_cache_file", staticmethod(lambda: cache_file))
+    BenchmarkResultCache.reset()
+    yield cache_file
+    BenchmarkResultCache.reset()
+
+
+def test_benchmark_result_cache(tmp_path, result_cache_file):
+
+    result_file = tmp_path / "20250101-10-00_rF2_benchmark.csv"
+    result_file.write_text("TimeInSeconds,msBetweenPresents\n0.1,4.0\n")
+    summary = {"data": {"fpsmean": 250.0}, "settings": list()}
+
+    BenchmarkResultCache.put(result_file, summary)
+    assert BenchmarkResultCache.save() is True
+
+    # -- Warm start reads the index from disk
+    BenchmarkResultCache.reset()
+    assert BenchmarkResultCache.get(result_file) == summary
+
+    # -- Changed result files invalidate their entry
+    stat = result_file.stat()
+    os.utime(result_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert BenchmarkResultCache.get(result_file) is None
+
+    BenchmarkResultCache.put(result_file, summary)
+    BenchmarkResultCache.evict(result_file)
+    BenchmarkResultCache.save()
+    BenchmarkResultCache.reset()
+    assert BenchmarkResultCache.get(result_file) is None
+
+
+def test_read_present_mon_columns(tmp_path):
+    result_file = tmp_path / "20250101-10-00_rF2_benchmark.csv"
+    result_file.write_text(
+        "// PresentMon capture\n"
+        "Application,TimeInSeconds,msBetweenPresents,msUntilDisplayed\n"
+        "LMU.exe,0.004,4.0,NA\n"
+        "LMU.exe,0.009,5.0,1.5\n"
+        "LMU.exe,0.0"
+    )
+
+    columns = read_present_mon_columns(result_file, ["msBetweenPresents", "msUntilDisplayed", "NotAColumn"])
+    assert set(columns) == {"msBetweenPresents", "msUntilDisplayed"}
+    # -- Truncated last row is dropped
+    assert columns["msBetweenPresents"].tolist() == [4.0, 5.0]
+
+    details = read_results(result_file, details=True)
+    assert details["msUntilDisplayed"] == [None, 1.5]
+    assert details["fps"] == [250.0, 200.0]
+
+
+def test_result_sidecar(tmp_path):
+    result_file = tmp_path / "20250101-10-00_rF2_benchmark.csv"
+    result_file.write_text("TimeInSeconds,msBetweenPresents,msUntilDisplayed\n0.004,4.0,NA\n0.009,5.0,1.5\n")
+
+    assert create_present_mon_sidecar(result_file) is True
+    columns = read_result_sidecar(result_file, ["msBetweenPresents", "msUntilDisplayed"])
+    assert columns["msBetweenPresents"].tolist() == [4.0, 5.0]
+    assert math.isnan(columns["msUntilDisplayed"][0])
+    assert "TimeInSeconds" not in columns
+    assert read_result_sidecar(result_file)["TimeInSeconds"].tolist() == [0.004, 0.009]
+
+    # -- Sidecars of changed captures are ignored
+    with open(result_file, "a") as f:
+        f.write("0.012,3.0,1.5\n")
+    assert read_result_sidecar(result_file) is None
+    assert read_results(result_file, details=True)["msBetweenPresents"] == [4.0, 5.0, 3.0]
+
+
+def test_downsample_keeps_frametime_spikes():
+    frametimes = array("d", _create_frametimes(num_frames=100000))
+    columns = {"msBetweenPresents": frametimes, "fps": fps_from_frametimes(frametimes), "fpsmean": 250.0}
+
+    downsample_columns(columns, 1000, "msBetweenPresents")
+
+    assert len(columns["msBetweenPresents"]) <= 1000
+    assert len(columns["fps"]) == len(columns["msBetweenPresents"])
+    assert max(columns["msBetweenPresents"]) == max(frametimes)
+    assert min(columns["msBetweenPresents"]) == min(frametimes)
+    assert columns["msBetweenPresents"][-1] == frametimes[-1]
+    assert columns["fpsmean"] == 250.0
+
+
+def test_result_pool_summarizes_in_workers(tmp_path):
+    files = list()
+    for idx in range(3):
+        result_file = tmp_path / f"2025010{idx}-10-00_rF2_benchmark.csv"
+        result_file.write_text("TimeInSeconds,msBetweenPresents\n0.004,4.0\n0.009,5.0\n")
+        files.append(result_file)
+
+    try:
+        summaries = dict(BenchmarkResultPool.summarize(files))
+    finally:
+        BenchmarkResultPool.shutdown()
+
+    assert set(summaries) == set(files)
+    assert all(s["data"]["fpsmean"] == 225.0 for s in summaries.values())
+
+
+def test_get_benchmark_results_pushes_summaries(tmp_path, result_cache_file, monkeypatch):
+    result_dir = tmp_path / "results"
+    result_dir.mkdir()
+    for idx in range(3):
+        (result_dir / f"2025010{idx}-10-00_rF2_benchmark.csv").write_text(
+            "TimeInSeconds,msBetweenPresents\n0.004,4.0\n0.009,5.0\n"
+        )
+    monkeypatch.setattr(AppSettings, "present_mon_result_dir", result_dir)
+    pushed = list()
+    monkeypatch.setattr(eel, "benchmark_result", lambda result: pushed.append(json.loads(result)), raising=False)
+
+    try:
+        results = json.loads(app_benchmark_fn.get_benchmark_results())
+    finally:
+        BenchmarkResultPool.shutdown()
+    # -- Every parsed summary was pushed before the list of all results was returned
+    assert sorted(r["name"] for r in pushed) == sorted(r["name"] for r in results) and len(results) == 3
+
+    # -- Cached results are only returned
+    pushed.clear()
+    assert json.loads(app_benchmark_fn.get_benchmark_results()) == results and not pushed
+
+
+def test_app_script_is_light_in_workers():
+    # -- Spawned workers run the App script as __mp_main__ before they unpickle their task
+    app_script = Path(__file__).parents[2] / "scripts" / "app.py"
+    code = (
+        "import runpy, sys; "
+        f"runpy.run_path({str(app_script)!r}, run_name='__mp_main__'); "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('eel', 'lmu', 'pygame', 'gevent')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_compare_results(tmp_path):
+    rnd = random.Random(287)
+    files = list()
+    runs = ((4.0, False, 5), (5.0, True, 5), (4.0, False, 5), (8.0, True, 0))
+    for idx, (frametime, aa, sharpening) in enumerate(runs):
+        result_file = tmp_path / f"2025010{idx}-10-00_rF2_benchmark.csv"
+        lines = [f"{rnd.uniform(frametime - 0.2, frametime + 0.2):.3f}" for _ in range(2000)]
+        result_file.write_text("msBetweenPresents\n" + "\n".join(lines) + "\n")
+        files.append(result_file)
+
+        preset = GraphicsPreset()
+        preset.advanced_graphic_options.get_option("Transparency AA").value = aa
+        preset.advanced_graphic_options.get_option("Texture Sharpening").value = sharpening
+        preset.export(f"{result_file.stem}_{preset.prefix}", tmp_path, keep_export_data=True)
+
+    report = compare_results(files)
+    assert report["baseline"] == files[0].name
+    assert report["runRanking"] == [files[3].name, files[1].name, files[2].name]
+
+    costly, unchanged = report["comparisons"][0], report["comparisons"][1]
+    assert costly["significant"] and costly["ci"][0] < costly["deltaMs"] < costly["ci"][1]
+    assert [o["key"] for o in costly["changedOptions"]] == ["Transparency AA"]
+    assert not unchanged["changedOptions"]
+
+    # -- Settings are ranked by the frame time deltas attributed to them
+    sharpening, aa = report["ranking"]
+    assert (sharpening["key"], sharpening["value"], sharpening["isolated"]) == ("Texture Sharpening", 0, False)
+    assert (aa["key"], aa["value"], aa["isolated"]) == ("Transparency AA", True, True)
+    assert aa["runs"] == [files[1].name, files[3].name] and sharpening["runs"] == [files[3].name]
+    # -- 4ms / 2 and (1ms + 4ms / 2) / 2
+    assert 1.9 < sharpening["deltaMs"] < 2.1 and 1.4 < aa["deltaMs"] < 1.6
+    assert "Frame time cost ranking of settings" in format_report(report)
+
+
+def test_telemetry_sampler_laps(tmp_path):
+    data = LMUObjectOut()
+    data.telemetry.playerHasVehicle, data.telemetry.playerVehicleIdx = True, 2
+    telem = data.telemetry.telemInfo[2]
+    telem.mID = data.scoring.vehScoringInfo[2].mID = 7
+
+    sampler = TelemetrySampler(source=lambda: data)
+    assert sampler.start()
+    for idx in range(TELEMETRY_LAP_CAPACITY + 10):
+        telem.mLapNumber = 1 if idx < 10 else 2
+        telem.mLocalVel.x, telem.mLocalVel.z, telem.mGear = 3.0, 4.0, idx % 6
+        data.scoring.vehScoringInfo[2].mLapDist = float(idx)
+        sampler.sample(sample_time=idx * 0.05)
+    sampler.stop()
+
+    assert sampler.laps[1].size == 10 and sampler.laps[2].size == TELEMETRY_LAP_CAPACITY
+
+    telemetry_file = get_telemetry_file(tmp_path / "20250101-10-00_rF2_benchmark.csv")
+    assert sampler.save(telemetry_file)
+    laps = read_telemetry_file(telemetry_file)
+    assert set(laps) == {1, 2}
+    assert laps[1]["speed"].tolist() == [5.0] * 10
+    assert laps[2]["lap_dist"][0] == 10.0 and laps[2]["gear"][-1] == (TELEMETRY_LAP_CAPACITY + 9) % 6
+
+
+def test_telemetry_sampler_shared_memory(monkeypatch):
+    name = f"LMU_Data_Test_{uuid.uuid4().hex[:8]}"
+    monkeypatch.setattr(LMUConstants, "LMU_SHARED_MEMORY_FILE", name)
+    writer = MMapControl(name, LMUObjectOut)
+    sampler = TelemetrySampler(rate=1.0)
+    try:
+        writer.create(ACCESS_DIRECT)
+        shared = writer.data
+        shared.generic.events.SME_UPDATE_TELEMETRY = 1
+        shared.telemetry.playerHasVehicle, shared.telemetry.playerVehicleIdx = True, 3
+        shared.telemetry.activeVehicles = shared.scoring.scoringInfo.mNumVehicles = 4
+        shared.telemetry.telemInfo[3].mEngineRPM = 6500.0
+        shared.telemetry.telemInfo[3].mLapNumber = 1
+
+        # -- Frame capture started 10s before the sampler
+        assert sampler.start(capture_start=time.perf_counter() - 10.0)
+        gevent.sleep(0.05)
+    finally:
+        sampler.stop()
+        writer.close()
+        if PLATFORM != "Windows" and os.path.exists(f"/dev/shm/{name}"):
+            os.remove(f"/dev/shm/{name}")
+
+    lap = sampler.laps[1].to_dict()
+    assert lap["rpm"].tolist() == [6500.0] and lap["time"][0] >= 10.0
@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lmu.http_client import HTTPSession
+from lmu.rf2command import Command
+from lmu.rf2connect import RfactorConnect, _RfactorConnectRequestThread
+from lmu.utils import AppAudioFx
+
+
+class _WebUiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    session_settings = {"RaceTimeScale": {"currentValue": 1}, "Weather": {"currentValue": 5}, "Fuel": {"currentValue": 0}}
+    # -- Settings that move by more than one per step request
+    step_sizes = {"Fuel": 2}
+    settings_lock = threading.Lock()
+    standings_requests = list()
+
+    def _send(self, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/slow/"):
+            time.sleep(0.2)
+            self._send({"id": int(self.path.rsplit("/", 1)[-1])})
+        elif self.path == "/rest/watch/standings":
+            self.standings_requests.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"standings-1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = json.dumps([{"driverName": "Driver", "slotID": 1}]).encode("utf-8")
+            self.send_response(200)
+            self.send_header("ETag", '"standings-1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/rest/sessions":
+            with self.settings_lock:
+                self._send(self.session_settings)
+        else:
+            self._send({"error": "not found"}, 404)
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.settings_lock:
+            setting = self.session_settings[data["sessionSetting"]]
+            step = self.step_sizes.get(data["sessionSetting"], 1)
+            setting["currentValue"] += step if data["value"] else -step
+            self._send(setting)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def web_ui():
+    server = ThreadingHTTPServer(("localhost", 0), _WebUiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    previous_port, RfactorConnect.web_ui_port = RfactorConnect.web_ui_port, server.server_address[1]
+    RfactorConnect.start_request_thread()
+    yield server
+    RfactorConnect.stop_request_thread()
+    RfactorConnect.close_session()
+    RfactorConnect.web_ui_port = previous_port
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_parallel_requests(web_ui):
+    session = HTTPSession("localhost", web_ui.server_address[1], pool_size=4)
+    results = dict()
+
+    def _get(idx):
+        results[idx] = session.get(f"/slow/{idx}").json()["id"]
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=_get, args=(idx,)) for idx in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {idx: idx for idx in range(4)}
+    assert time.perf_counter() - start < 0.6
+    # -- Keep-alive connections are returned to the pool
+    assert len(session._idle) == 4
+    session.close()
+
+
+def test_request_many_correlates_responses(web_ui):
+    start = time.perf_counter()
+    responses = RfactorConnect.request_many([("GET", f"/slow/{idx}", None) for idx in range(4)] + [("GET", "/x", None)])
+    assert time.perf_counter() - start < 0.6
+    assert [r.json()["id"] for r in responses[:4]] == [0, 1, 2, 3]
+    assert responses[4].status_code == 404
+    assert RfactorConnect.navigation_state(responses[4]) == {"status_code": 404}
+    assert RfactorConnect.navigation_state(False) is False
+
+
+def test_set_session_settings(web_ui, monkeypatch):
+    # -- No front end to play the confirmation sound
+    monkeypatch.setattr(AppAudioFx, "play_audio", lambda audio_fx_id: None)
+    data = {"RaceTimeScale": 10, "Weather": 2, "Fuel": 4, "Unknown": 1}
+    command = Command(Command.set_session_settings, data=data)
+    command.execute()
+    assert command.finished
+    # -- Stepping stops once a setting reports the target value, Fuel would overshoot otherwise
+    assert _WebUiHandler.session_settings == {
+        "RaceTimeScale": {"currentValue": 10},
+        "Weather": {"currentValue": 2},
+        "Fuel": {"currentValue": 4},
+    }
+
+
+def test_abandon_pending_response(web_ui):
+    request_id = _RfactorConnectRequestThread.submit("GET", "/slow/0")
+    _RfactorConnectRequestThread.abandon([request_id])
+    time.sleep(0.4)
+    # -- The late response is dropped instead of staying in the response store
+    assert request_id not in _RfactorConnectRequestThread.responses
+    assert request_id not in _RfactorConnectRequestThread.abandoned
+
+
+def test_session_response_cache(web_ui):
+    session = HTTPSession("localhost", web_ui.server_address[1], cache_ttl={"/rest/sessions": 10.0})
+    first = session.get("/rest/sessions")
+    # -- Callers get their own copy of the cached response
+    first.json()["RaceTimeScale"]["currentValue"] = -1
+    cached = session.get("/rest/sessions")
+    assert cached is not first and cached.json()["RaceTimeScale"]["currentValue"] != -1
+    assert list(session._cache) == ["/rest/sessions"]
+
+    # -- Writes below the same resource drop the cached response
+    value = cached.json()["Weather"]["currentValue"]
+    session.post("/rest/sessions/settings", json_data={"sessionSetting": "Weather", "value": 1})
+    assert not session._cache
+    assert session.get("/rest/sessions").json()["Weather"]["currentValue"] == value + 1
+
+    # -- Paths without a cache time and non 200 responses are not cached
+    session.get("/rest/other")
+    session.get("/slow/1", use_cache=False)
+    assert list(session._cache) == ["/rest/sessions"]
+    session.close()
+    assert not session._cache
+
+
+def test_session_cache_revalidates_etag(web_ui):
+    session = HTTPSession("localhost", web_ui.server_address[1], cache_ttl={"/rest/watch/standings": 0.05})
+    _WebUiHandler.standings_requests.clear()
+    assert session.get("/rest/watch/standings").json()[0]["slotID"] == 1
+    assert session.get("/rest/watch/standings").status_code == 200
+    time.sleep(0.1)
+    # -- Expired response is revalidated, the server answers 304 Not Modified
+    assert session.get("/rest/watch/standings").json()[0]["driverName"] == "Driver"
+    assert _WebUiHandler.standings_requests == [None, '"standings-1"']
+    session.close()
@@ -0,0 +1,173 @@
+import io
+import os
+import uuid
+
+from lmu.pylmusharedmemory.lmu_data import LMUEvent, LMUObjectOut
+from lmu.pylmusharedmemory.lmu_mmap import (
+    ACCESS_COPY,
+    ACCESS_DIRECT,
+    ACCESS_PARTIAL_COPY,
+    MMapControl,
+    PLATFORM,
+    field_range,
+)
+from lmu.pylmusharedmemory.lmu_recording import SharedMemoryRecorder, play, read_frames
+from lmu.pylmusharedmemory.lmu_view import StructArrayView
+
+
+def test_field_range():
+    telem_start, telem_end = field_range(LMUObjectOut, "telemetry.telemInfo[3]")
+    assert telem_start == LMUObjectOut.telemetry.offset + 4 + 3 * (telem_end - telem_start)
+    assert field_range(LMUObjectOut, "generic") == (0, LMUObjectOut.generic.size)
+
+
+def test_partial_copy():
+    name = f"LMU_Data_Test_{uuid.uuid4().hex[:8]}"
+    writer, reader = MMapControl(name, LMUObjectOut), MMapControl(name, LMUObjectOut)
+    try:
+        writer.create(ACCESS_DIRECT)
+        reader.register_vehicle(2)
+        reader.create(ACCESS_PARTIAL_COPY)
+        assert reader.copy_size() < len(writer.data.telemetry.telemInfo) * 1000
+
+        shared = writer.data
+        shared.generic.events.SME_UPDATE_TELEMETRY = 1
+        shared.scoring.scoringInfo.mNumVehicles = shared.telemetry.activeVehicles = 3
+        shared.telemetry.playerVehicleIdx = 2
+        shared.telemetry.telemInfo[2].mEngineRPM = 7000.0
+        shared.scoring.vehScoringInfo[2].mLapDist = 1234.0
+        shared.telemetry.telemInfo[1].mEngineRPM = 5000.0
+        reader.update()
+
+        data = reader.data
+        assert data.telemetry.playerVehicleIdx == 2 and data.scoring.scoringInfo.mNumVehicles == 3
+        assert data.telemetry.telemInfo[2].mEngineRPM == 7000.0
+        assert data.scoring.vehScoringInfo[2].mLapDist == 1234.0
+        # -- Vehicles not registered are not copied
+        assert data.telemetry.telemInfo[1].mEngineRPM == 0.0
+
+        # -- No update flagged, previous copy is kept
+        shared.generic.events.SME_UPDATE_TELEMETRY = 0
+        shared.telemetry.telemInfo[2].mEngineRPM = 8000.0
+        reader.update()
+        assert reader.data.telemetry.telemInfo[2].mEngineRPM == 7000.0
+    finally:
+        reader.close()
+        writer.close()
+        if PLATFORM != "Windows" and os.path.exists(f"/dev/shm/{name}"):
+            os.remove(f"/dev/shm/{name}")
+
+
+def test_struct_without_base_fields():
+    # -- Partial copy base fields are only resolved if partial copy access is used
+    name = f"LMU_Data_Test_{uuid.uuid4().hex[:8]}"
+    control = MMapControl(name, LMUEvent)
+    try:
+        control.create(ACCESS_DIRECT)
+        control.data.SME_ENTER = 1
+        assert control.data.SME_ENTER == 1
+    finally:
+        control.close()
+        if PLATFORM != "Windows" and os.path.exists(f"/dev/shm/{name}"):
+            os.remove(f"/dev/shm/{name}")
+
+
+def test_snapshot_torn_reads():
+    name = f"LMU_Data_Test_{uuid.uuid4().hex[:8]}"
+    writer = MMapControl(name, LMUObjectOut)
+
+    class TornReadMMap(MMapControl):
+        """Game writes a scoring update during the first copies"""
+
+        torn_copies = 2
+
+        def _MMapControl__copy_all(self):
+            super()._MMapControl__copy_all()
+            if self.torn_copies:
+                self.torn_copies -= 1
+                writer.data.scoring.scoringInfo.mCurrentET += 0.2
+
+    reader = TornReadMMap(name, LMUObjectOut)
+    try:
+        writer.create(ACCESS_DIRECT)
+        reader.create(ACCESS_COPY)
+        shared = writer.data
+        shared.generic.events.SME_UPDATE_SCORING = 1
+        shared.scoring.scoringInfo.mNumVehicles = shared.telemetry.activeVehicles = 2
+
+        reader.update()
+        assert reader.data.scoring.scoringInfo.mCurrentET == shared.scoring.scoringInfo.mCurrentET
+        assert reader.stats.to_dict() == {"copies": 1, "torn": 2, "failed": 0, "skipped": 0, "tornRate": 2 / 3}
+
+        # -- Vehicle counts of different updates are skipped, not counted as torn reads
+        shared.telemetry.activeVehicles = 3
+        shared.scoring.scoringInfo.mCurrentET += 1.0
+        reader.update()
+        assert reader.stats.to_dict() == {"copies": 1, "torn": 2, "failed": 0, "skipped": 1, "tornRate": 2 / 3}
+        assert reader.data.scoring.scoringInfo.mCurrentET != shared.scoring.scoringInfo.mCurrentET
+    finally:
+        reader.close()
+        writer.close()
+        if PLATFORM != "Windows" and os.path.exists(f"/dev/shm/{name}"):
+            os.remove(f"/dev/shm/{name}")
+
+
+def test_struct_array_view():
+    data = LMUObjectOut()
+    for idx, vehicle in enumerate(data.scoring.vehScoringInfo):
+        vehicle.mID, vehicle.mLapDist, vehicle.mPos.z = idx, idx * 10.5, -idx
+    data.scoring.vehScoringInfo[1].mDriverName = b"Driver"
+    data.telemetry.telemInfo[2].mWheels[3].mBrakeTemp = 600.0
+
+    vehicles = StructArrayView("scoring.vehScoringInfo")
+    assert len(vehicles) == len(data.scoring.vehScoringInfo)
+    assert vehicles.column(data, "mLapDist") == tuple(v.mLapDist for v in data.scoring.vehScoringInfo)
+
+    columns = vehicles.columns(data, ("mPos.z", "mDriverName", "mID"), count=3)
+    assert columns["mID"] == (0, 1, 2) and columns["mPos.z"] == (0.0, -1.0, -2.0)
+    assert columns["mDriverName"][1].rstrip(b"\0") == b"Driver"
+
+    # -- 8 byte unsigned field, native "L" code on LP64 Linux, and the field after it
+    data.scoring.vehScoringInfo[2].mSteamID = 15309753342058306312
+    data.scoring.vehScoringInfo[2].mAttackMode = -3
+    steam_columns = vehicles.columns(data, ("mSteamID", "mAttackMode", "mID"), count=3)
+    assert steam_columns["mSteamID"][2] == 15309753342058306312 and steam_columns["mAttackMode"][2] == -3
+    assert steam_columns["mID"] == (0, 1, 2)
+
+    # -- Reads the same layout from the raw shared memory bytes
+    telemetry = StructArrayView("telemetry.telemInfo")
+    assert telemetry.column(bytes(data), "mWheels[3].mBrakeTemp", count=3) == (0.0, 0.0, 600.0)
+
+
+def test_recording_playback(tmp_path):
+    data, snapshots = LMUObjectOut(), list()
+    for idx in range(20):
+        data.scoring.scoringInfo.mCurrentET = idx * 0.02
+        data.telemetry.telemInfo[0].mEngineRPM = 5000.0 + idx
+        snapshots.append(bytes(data))
+
+    f = io.BytesIO()
+    recorder = SharedMemoryRecorder(f)
+    for idx, snapshot in enumerate(snapshots):
+        assert recorder.add(snapshot, timestamp=10.0 + idx * 0.02)
+    assert not recorder.add(snapshots[-1])
+    # -- Deltas of a few changed fields compress to a fraction of the snapshot size
+    assert f.tell() < len(snapshots[0])
+
+    f.seek(0)
+    frames = list(read_frames(f))
+    assert [snapshot for _, snapshot in frames] == snapshots
+    assert frames[0][0] == 0.0 and abs(frames[-1][0] - 0.38) < 1e-9
+
+    recording_file = tmp_path / "recording.bin"
+    recording_file.write_bytes(f.getvalue())
+    name = f"LMU_Data_Test_{uuid.uuid4().hex[:8]}"
+    reader = MMapControl(name, LMUObjectOut)
+    try:
+        assert play(str(recording_file), speed=0, name=name) == len(snapshots)
+        reader.create(ACCESS_DIRECT)
+        assert reader.data.telemetry.telemInfo[0].mEngineRPM == 5019.0
+    finally:
+        reader.close()
+        if PLATFORM != "Windows" and os.path.exists(f"/dev/shm/{name}"):
+            os.remove(f"/dev/shm/{name}")
@@ -1,3 +1,11 @@
+import struct
+
+from lmu.benchmark.compare import compare_results
+from lmu.benchmark.metrics_history import PerformanceMetricHistory
+from lmu.benchmark.present_mon_recorder import PresentMonApiRecorder
+from lmu.benchmark.present_mon_wrapper import create_blob_struct, create_query_elements, METRIC_CONFIGS, MIN_BLOB_SIZE
+from lmu.benchmark.present_mon_wrapper import MetricData
+from lmu.benchmark.result import read_results
 from lmu.lmu_game import RfactorPlayer
 from lmu.log import setup_logging
 
@@ -7,3 +15,69 @@ setup_logging()
 def test_watch_game_bin():
     ply = RfactorPlayer()
     ply.run_rfactor_with_present_mon(2)
+
+
+def test_blob_struct_from_query_offsets():
+    elements = create_query_elements()
+    # -- Offsets as written by pmRegisterDynamicQuery, with a gap after the first metric
+    for idx, element in enumerate(elements):
+        element.dataOffset, element.dataSize = 16 + idx * 8 if idx else 0, 8
+
+    blob_struct, fields = create_blob_struct(elements)
+    assert fields == [name for _, _, name in METRIC_CONFIGS]
+
+    values = [float(i) for i in range(len(METRIC_CONFIGS))]
+    buffer = bytearray(max(MIN_BLOB_SIZE, blob_struct.size))
+    for element, value in zip(elements, values):
+        struct.pack_into("=d", buffer, element.dataOffset, value)
+    assert list(blob_struct.unpack_from(buffer)) == values
+
+
+def test_metric_history_since_cursor():
+    PerformanceMetricHistory.reset()
+    metrics = MetricData()
+    for idx in range(PerformanceMetricHistory.capacity + 10):
+        metrics.fps_avg = float(idx)
+        PerformanceMetricHistory.append(metrics, timestamp=float(idx))
+
+    latest = PerformanceMetricHistory.since(PerformanceMetricHistory.cursor() - 3)
+    assert latest["fps_avg"] == [float(i) for i in range(PerformanceMetricHistory.capacity + 7, latest["cursor"])]
+
+    # -- Overwritten samples are skipped, start reports where the data begins
+    everything = PerformanceMetricHistory.since(0)
+    assert everything["start"] == 10
+    assert len(everything["time"]) == PerformanceMetricHistory.capacity
+    assert everything["time"][0] == 10.0 and everything["time"][-1] == everything["cursor"] - 1
+
+    assert PerformanceMetricHistory.since(everything["cursor"])["time"] == []
+    PerformanceMetricHistory.reset()
+
+
+def test_present_mon_api_recorder(tmp_path):
+    result_file = tmp_path / "20250101-10-00_rF2_benchmark.csv"
+    recorder = PresentMonApiRecorder(result_file)
+    assert recorder.start() and PresentMonApiRecorder.is_recording()
+
+    metrics = MetricData()
+    for idx, fps in enumerate((200.0, 250.0, 0.0, 250.0)):
+        metrics.fps_avg, metrics.gpu_busy_avg = fps, 3.0
+        recorder.add(metrics, time_in_seconds=idx * 0.25)
+    # -- Too close to the previous sample
+    recorder.add(metrics, time_in_seconds=0.8)
+
+    assert recorder.stop() is True and not PresentMonApiRecorder.is_recording()
+
+    result = read_results(result_file, details=True)
+    assert result["msBetweenPresents"] == [5.0, 4.0, 4.0]
+    assert result["TimeInSeconds"] == [0.0, 0.25, 0.75]
+    assert result["msGPUActive"] == [3.0, 3.0, 3.0]
+    # -- Rows are window averages, no per-frame statistics
+    assert result["source"] == "presentmon_api" and result["fpsmean"] > 0.0
+    assert result["fps99"] is None and result["stutter"] is None
+
+    # -- Only results of single frames are compared
+    cli_file = tmp_path / "20250102-10-00_rF2_benchmark.csv"
+    cli_file.write_text("TimeInSeconds,msBetweenPresents\n0.004,4.0\n0.009,5.0\n")
+    assert read_results(cli_file)["source"] == "presentmon"
+    report = compare_results([result_file, cli_file])
+    assert report["excluded"] == [result_file.name] and report["baseline"] == cli_file.name
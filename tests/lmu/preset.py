@@ -1,10 +1,15 @@
 from pathlib import Path
 
+import pytest
+
 from lmu.app_settings import AppSettings
+from lmu.file_cache import GameFileCache
 from lmu.lmu_game import RfactorPlayer
-from lmu.preset.preset import GraphicsPreset, BasePreset, ControlsSettingsPreset
-from lmu.preset.preset_base import PRESET_TYPES, load_presets_from_dir
+from lmu.preset.preset import AdvancedSettingsPreset, GraphicsPreset, BasePreset, ControlsSettingsPreset
+from lmu.preset import preset_base
+from lmu.preset.preset_base import PRESET_TYPES, PresetRepository, load_presets_from_dir
 from lmu.preset.presets_dir import get_user_presets_dir
+from lmu.preset.settings_model import GraphicOptions
 from lmu.log import setup_logging
 
 setup_logging()
@@ -75,3 +80,100 @@ def test_read_current_gfx_preset(set_test_install_location):
 
     if rf.is_valid:
         current_preset.update(rf)
+
+
+def test_graphic_options_lookup():
+    options, other = GraphicOptions(), GraphicOptions()
+    keys = [o.key for o in options.options]
+    assert all(options.get_option(k) is options.options[keys.index(k)] for k in keys)
+    assert options.get_option("Not a setting") is None
+
+    # -- Load options by key, serializes to the same ordered list
+    js = options.to_js()
+    js["options"][-1]["value"] = "changed"
+    other.from_js_dict(js)
+    assert other.get_option(keys[-1]).value == "changed"
+    assert [o["key"] for o in other.to_js()["options"]] == keys
+
+    # -- Compare by key, independent of the option order
+    for o in options.options + other.options:
+        o.exists_in_rf = True
+    other.options.reverse()
+    assert other != options and other.get_option(keys[-1]).difference
+
+    # -- Index follows list modifications
+    removed = other.options.pop(0)
+    assert other.get_option(removed.key) is None
+
+
+def test_option_schema():
+    options, other = GraphicOptions(), GraphicOptions()
+    option, other_option = options.options[0], other.options[0]
+
+    # -- Definitions are compiled once and shared, values are per instance
+    assert option.schema is other_option.schema and isinstance(option.settings, tuple)
+    option.value = "changed"
+    assert other_option.value == option.schema.value != "changed"
+    with pytest.raises(AttributeError):
+        option.schema.name = "changed"
+    with pytest.raises(AttributeError):
+        option.name = "changed"
+
+
+def test_preset_repository(tmp_path, monkeypatch):
+    reads = list()
+    read_preset_dict = preset_base._read_preset_dict
+    monkeypatch.setattr(preset_base, "_read_preset_dict", lambda f: reads.append(f.name) or read_preset_dict(f))
+
+    for name in ("Current", "Low", "High"):
+        GraphicsPreset(name).export(name, tmp_path)
+    ControlsSettingsPreset("Controls").export("Controls", tmp_path)
+    current_preset = GraphicsPreset("Current")
+
+    presets, selected = load_presets_from_dir(tmp_path, GraphicsPreset.preset_type, current_preset, "Low")
+    assert sorted(p.name for p in presets) == ["High", "Low"] and selected.name == "Low"
+    assert len(reads) == 4
+
+    # -- Unchanged files are not read again, every call returns new instances
+    _, selected_again = load_presets_from_dir(tmp_path, GraphicsPreset.preset_type, selected_preset_name="Low")
+    assert len(reads) == 4 and selected_again is not selected
+
+    # -- Modified and deleted files
+    high = GraphicsPreset("High")
+    high.desc = "Modified description"
+    high.export("High", tmp_path)
+    next(tmp_path.glob("*Low.json")).unlink()
+    presets, selected = load_presets_from_dir(tmp_path, GraphicsPreset.preset_type, current_preset, "Low")
+    assert [p.desc for p in presets] == ["Modified description"] and selected is None
+    assert len(reads) == 5
+    PresetRepository.clear()
+
+
+def test_rfactor_player_file_cache(set_test_install_location):
+    GameFileCache.invalidate()
+    rf = RfactorPlayer()
+    misses = GameFileCache.misses
+
+    # -- Unchanged files are shared and not parsed again
+    rf_again = RfactorPlayer()
+    assert GameFileCache.misses == misses and rf_again.version == rf.version
+    assert rf_again.options.graphic_options is not rf.options.graphic_options
+
+    # -- Only changed settings are written, the writer caches the written Settings.JSON
+    current_preset = AdvancedSettingsPreset()
+    current_preset.update(rf)
+    option = current_preset.game_options.get_option("Auto-change Opponent List")
+    option.value = not option.value
+    controller_mtime = rf.controller_file.stat().st_mtime_ns
+    assert rf.write_settings(current_preset)
+    assert rf.controller_file.stat().st_mtime_ns == controller_mtime
+    assert not list(rf.player_file.parent.glob("*.tmp"))
+
+    rf_written = RfactorPlayer()
+    assert rf_written.options.game_options.get_option("Auto-change Opponent List").value == option.value
+    # -- Config_DX11_VR.ini is only parsed to compare video settings on write
+    assert GameFileCache.misses == misses + 1
+
+    player_mtime = rf.player_file.stat().st_mtime_ns
+    assert rf_written.write_settings(current_preset)
+    assert rf.player_file.stat().st_mtime_ns == player_mtime
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+from lmu.process_watch import ProcessWatch
+
+
+def test_process_watch_deltas():
+    name = psutil.Process().name()
+    assert ProcessWatch.is_pid_running(os.getpid(), name)
+    assert not ProcessWatch.is_pid_running(-1, name)
+
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        ProcessWatch.scan()
+        assert ProcessWatch.is_pid_running(child.pid, name)
+    finally:
+        child.kill()
+        child.wait()
+
+    # -- Exited processes are detected without a new scan
+    assert not ProcessWatch.is_pid_running(child.pid, name)
+    ProcessWatch.scan()
+    assert child.pid not in ProcessWatch._names
+    assert ProcessWatch.find_pid("no_such_executable.exe") is None
+
+
+def test_process_watch_thread():
+    ProcessWatch.scan_interval = 0.05
+    try:
+        ProcessWatch.start()
+        assert ProcessWatch.is_watching()
+        time.sleep(0.2)
+        assert ProcessWatch.is_running(psutil.Process().name())
+    finally:
+        ProcessWatch.stop()
+        ProcessWatch.scan_interval = 2.0
+    assert not ProcessWatch.is_watching()
+
+
+def test_process_watch_listener():
+    name = psutil.Process().name()
+    changes = list()
+    ProcessWatch.add_listener(name, changes.append)
+    ProcessWatch.scan()
+
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        ProcessWatch.scan()
+        assert changes == [True]
+    finally:
+        child.kill()
+        child.wait()
+        ProcessWatch.remove_listener(name, changes.append)
+
+    ProcessWatch.scan()
+    assert changes == [True]
+
+
+def test_process_watch_exact_name():
+    name = psutil.Process().name()
+    assert ProcessWatch.find_pid(name[:-1]) is not None
+    assert ProcessWatch.find_pid(name[:-1], exact=True) is None
+    assert ProcessWatch.find_pid(name.upper(), exact=True) is not None
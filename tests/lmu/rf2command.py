@@ -0,0 +1,88 @@
+import time
+
+import gevent
+
+from lmu.benchmark.benchmark_utils import create_benchmark_commands
+from lmu.rf2command import Command, CommandQueue
+from lmu.rf2connect import RfactorConnect, RfactorState
+
+
+def _run_queue(timeout: float = 5.0):
+    end_time = time.time() + timeout
+    while not CommandQueue.is_empty() and time.time() < end_time:
+        CommandQueue.run()
+        gevent.sleep(0.01)
+
+
+def test_command_graph(monkeypatch):
+    monkeypatch.setattr(RfactorConnect, "check_connection", classmethod(lambda cls: None))
+    monkeypatch.setattr(RfactorConnect, "state", RfactorState.ready)
+    CommandQueue.reset()
+
+    first = CommandQueue.append(Command(Command.timeout_command, data=0.3, after=()))
+    second = CommandQueue.append(Command(Command.timeout_command, data=0.3, after=()))
+    last = CommandQueue.append(Command(Command.timeout_command, data=0.0, after=(first, second)))
+    assert last.after == (first, second) and CommandQueue.ready() == [first, second]
+
+    start = time.time()
+    _run_queue()
+    # -- Independent commands ran concurrently
+    assert time.time() - start < 0.55
+    assert all(c.finished for c in (first, second, last)) and last.activated >= second.done_time
+    assert [t["name"] for t in CommandQueue.timings[-3:]] == ["timeout_command"] * 3
+    assert CommandQueue.current_command is None
+
+
+def test_command_state(monkeypatch):
+    monkeypatch.setattr(RfactorConnect, "check_connection", classmethod(lambda cls: None))
+    monkeypatch.setattr(RfactorConnect, "state", RfactorState.loading)
+    CommandQueue.reset()
+
+    command = CommandQueue.append(Command(Command.timeout_command, data=0.0, state=RfactorState.ready))
+    CommandQueue.run()
+    gevent.sleep(0.01)
+    # -- Activated, waiting for rF2 to reach the command state
+    assert command.activated is not None and not command.finished
+
+    monkeypatch.setattr(RfactorConnect, "state", RfactorState.ready)
+    _run_queue()
+    assert command.finished and CommandQueue.is_empty()
+
+
+def test_command_timeout_kills_hung_command(monkeypatch):
+    monkeypatch.setattr(RfactorConnect, "check_connection", classmethod(lambda cls: None))
+    monkeypatch.setattr(RfactorConnect, "state", RfactorState.ready)
+    CommandQueue.reset()
+
+    hung = CommandQueue.append(Command(Command.timeout_command, data=30.0, timeout=0.2, after=()))
+    last = CommandQueue.append(Command(Command.timeout_command, data=0.0, after=(hung,)))
+    _run_queue(timeout=2.0)
+    # -- The hung command was stopped at its timeout and the commands after it ran
+    assert CommandQueue.is_empty() and last.finished
+    assert not hung.finished and hung.greenlet.dead
+    assert CommandQueue.timings[-2]["name"] == "timeout_command" and not CommandQueue.timings[-2]["finished"]
+
+
+def test_command_queue_reset_kills_commands(monkeypatch):
+    monkeypatch.setattr(RfactorConnect, "check_connection", classmethod(lambda cls: None))
+    monkeypatch.setattr(RfactorConnect, "state", RfactorState.ready)
+    CommandQueue.reset()
+
+    commands = [CommandQueue.append(Command(Command.timeout_command, data=30.0, after=())) for _ in range(2)]
+    CommandQueue.run()
+    gevent.sleep(0.01)
+    assert all(c.is_executing for c in commands)
+
+    CommandQueue.reset()
+    gevent.sleep(0.01)
+    assert CommandQueue.is_empty() and not any(c.is_executing for c in commands)
+
+
+def test_benchmark_commands_order():
+    CommandQueue.reset()
+    create_benchmark_commands("DIK_I", "DIK_F", 10)
+    commands = {c.name: c for c in CommandQueue.queue if c.name in ("set_content", "set_session_settings", "start_race")}
+    CommandQueue.reset()
+    # -- Session settings are applied after the content selection that may reset them
+    assert commands["set_session_settings"].after == (commands["set_content"],)
+    assert commands["start_race"].after == (commands["set_session_settings"],)
@@ -25,3 +25,15 @@ def test_get_request():
         "ve": 0.0,
     }
     print(response.text)
+
+
+def test_loop_interval_backoff():
+    rfc = rf2connect.RfactorConnect
+    intervals = [rfc.next_loop_interval(busy=False) for _ in range(20)]
+    assert intervals == sorted(intervals) and intervals[-1] == rfc.max_loop_interval
+
+    rfc.game_process_changed(True)
+    assert rfc.wake_event.is_set() and rfc.last_connection_check == 0.0
+    assert rfc.loop_interval == rfc.busy_loop_interval
+    assert rfc.next_loop_interval(busy=True) == rfc.busy_loop_interval
+    rfc.wake_event.clear()